@@ -16,6 +16,10 @@ app = Flask(__name__,
 )
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
 
+# Stage timings, /metrics and (in debug mode) Server-Timing headers
+from utils import metrics
+metrics.init_app(app)
+
 # --- PostHog Initialization (Server-side - not used for client-side tracking) ---
 # posthog = Posthog(
 #     project_api_key=os.getenv('POSTHOG_API_KEY'),
@@ -57,6 +61,23 @@ app.register_blueprint(admin_bp)
 app.register_blueprint(recruiter_bp)
 app.register_blueprint(candidate_bp)
 
+# Load candidates into the in-memory search indexes in the background. The indexes are
+# per process, so each worker starts its own warm-up on its first request; a thread
+# started here would stay behind in the master under gunicorn --preload.
+if os.getenv('CANDIDATE_INDEX_WARMUP', 'true').lower() == 'true':
+    from utils.supabase_client import start_index_warmup
+
+    @app.before_request
+    def warm_candidate_indexes():
+        start_index_warmup()
+
+# Keep the stored candidate background scores fresh. Off by default: a thread started
+# here runs in every gunicorn worker (and dies in the master under --preload), so
+# production runs `python -m utils.score_refresher` as a separate process instead.
+from utils.score_refresher import BACKGROUND_SCORE_REFRESH, start_score_refresher
+if BACKGROUND_SCORE_REFRESH:
+    start_score_refresher()
+
 @app.route('/')
 def index():
     return render_template('index.html')
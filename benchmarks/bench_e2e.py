@@ -0,0 +1,297 @@
+"""
+End-to-end latency and throughput of recruiter search and resume ingestion.
+
+The app is served by a local threaded server. External services are
+replaced with in-process stand-ins, each with configurable latency:
+- Gemini is a FakeGeminiClient.
+- The GitHub API is a stub HTTP server.
+- Supabase is a SQLite candidate store filled with synthetic candidates.
+
+Requests are sent at each concurrency level in turn:
+- POST /recruiter/
+- POST /candidate/, then polling the ingestion job with a backoff until it finishes.
+
+For every level it reports p50/p95/p99 latency, throughput and a per-stage
+breakdown. Results are written as JSON so runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_e2e [--concurrency 1 4 16] [--requests 60] [--candidates 20000]
+        [--llm-latency 0.4] [--github-latency 0.05] [--db-latency 0.01] [--unscored] [--output results.json]
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+QUERIES = [
+    'python developers in berlin with 5 years experience',
+    'senior react engineer in london',
+    'machine learning engineer with pytorch and 3+ years',
+    'golang kubernetes engineer remote',
+    'java spring developer in bangalore with 7 years',
+    'someone great at building scalable backends',
+    'a person who can lead our data platform work',
+    'frontend folks who care about accessibility',
+]
+
+WORDS = ['Python', 'Flask', 'Django', 'React', 'Docker', 'Kubernetes', 'AWS', 'SQL', 'Go', 'Rust',
+         'built', 'led', 'designed', 'shipped', 'scaled', 'migrated', 'services', 'pipelines', 'teams',
+         'platform', 'latency', 'customers', 'reliability', 'analytics', 'mentored', 'owned', 'Berlin']
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(seconds: List[float]) -> Dict:
+    """Count, mean and p50/p95/p99 in milliseconds."""
+    values = sorted(s * 1000 for s in seconds)
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+    }
+
+
+class StageTimer:
+    """Collects the duration of every call to the wrapped module functions, per stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+
+    def wrap(self, module, name: str, stage: str):
+        """Replace module.name with a wrapper that records each call under `stage`."""
+        fn = getattr(module, name)
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._samples[stage].append(elapsed)
+
+        setattr(module, name, timed)
+
+    def drain(self) -> Dict[str, List[float]]:
+        """Return and reset the samples collected so far."""
+        with self._lock:
+            samples, self._samples = self._samples, defaultdict(list)
+        return samples
+
+
+def resume_pdf(run_id: str, i: int) -> bytes:
+    """A distinct one-page resume, so neither fingerprinting nor the response cache short-circuits the parse."""
+    from benchmarks.bench_pdf_extract import build_pdf
+    rng = random.Random(f'{run_id}-{i}')
+
+    def line_text(page, line):
+        if line == 0:
+            return b'Bench Candidate %d' % i
+        if line == 1:
+            return f'Email: bench-{run_id}-{i}@example.com'.encode()
+        return ' '.join(rng.choice(WORDS) for _ in range(12)).encode()
+
+    return build_pdf(1, 40, line_text)
+
+
+def run_level(call: Callable[[int], None], total: int, concurrency: int) -> Dict:
+    """Issue `total` calls with `concurrency` client threads; return latency and throughput."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            call(i)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        'latency': summarize(latencies),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='Client concurrency levels')
+    parser.add_argument('--requests', type=int, default=60, help='Search requests per level')
+    parser.add_argument('--ingest-requests', type=int, default=None, help='Uploads per level (default: --requests)')
+    parser.add_argument('--candidates', type=int, default=20000, help='Synthetic candidates in the store')
+    parser.add_argument('--llm-latency', type=float, default=0.4, help='Seconds added to every Gemini call')
+    parser.add_argument('--github-latency', type=float, default=0.05, help='Seconds added to every GitHub call')
+    parser.add_argument('--db-latency', type=float, default=0.01, help='Seconds added to every store call')
+    parser.add_argument('--ingest-workers', type=int, default=4, help='Resume ingestion worker threads')
+    parser.add_argument('--no-index', action='store_true', help="Don't warm the in-memory candidate index")
+    parser.add_argument('--unscored', action='store_true',
+                        help='Store candidates without background scores, so searches score them inline')
+    parser.add_argument('--only', choices=['search', 'ingest'], help='Run one endpoint only')
+    parser.add_argument('--output', help='Write the JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    # Point the app at the stand-ins before anything reads its configuration
+    workdir = tempfile.mkdtemp(prefix='hireai-bench-')
+    os.environ.update({
+        'CACHE_DIR': workdir,
+        'CANDIDATE_STORE': 'sqlite',
+        'CANDIDATE_STORE_PATH': os.path.join(workdir, 'candidates.sqlite3'),
+        'CANDIDATE_INDEX_WARMUP': 'false',
+        'BACKGROUND_SCORE_REFRESH': 'false',
+        'INGEST_WORKERS': str(args.ingest_workers),
+        'INGEST_QUEUE_DEPTH': str(max(100, max(args.concurrency) * 4)),
+    })
+    from benchmarks.stubs import FakeGeminiClient, GitHubStubHandler, LatencyRepository, start_stub_server
+    github_handler = type('GitHubHandler', (GitHubStubHandler,), {'latency': args.github_latency})
+    github_server, github_url = start_stub_server(github_handler)
+    os.environ['GITHUB_API_URL'] = github_url
+
+    from benchmarks.synthetic_candidates import fill_repository
+    from utils import gemini
+    from utils.candidate_repository import SQLiteCandidateRepository, set_repository
+    from utils.http_session import create_session
+
+    store = SQLiteCandidateRepository(os.environ['CANDIDATE_STORE_PATH'])
+    print(f"Filling the store with {args.candidates} synthetic candidates...", file=sys.stderr)
+    fill_repository(store, args.candidates, scored=not args.unscored)
+    set_repository(LatencyRepository(store, args.db_latency))
+    gemini.set_client(FakeGeminiClient(args.llm_latency))
+
+    import app as app_module
+    import routes.candidate
+    import routes.recruiter
+    from utils.supabase_client import warm_candidate_indexes
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    if not args.no_index:
+        warm_candidate_indexes()
+
+    timer = StageTimer()
+    for module, name, stage in (
+        (routes.recruiter, 'interpret_search_query', 'query_interpretation'),
+        (routes.recruiter, 'find_matching_candidates', 'db_fetch'),
+        (routes.recruiter, 'score_search_results', 'background_scoring'),
+        (routes.recruiter, 'rank_candidates', 'ranking'),
+        (routes.recruiter, 'render_template', 'template_render'),
+        (routes.candidate, 'render_template', 'template_render'),
+        (routes.candidate, 'extract_text_from_pdf_path', 'pdf_extraction'),
+        (routes.candidate, 'compute_fingerprint', 'fingerprint'),
+        (routes.candidate, 'parse_resume_with_gemini', 'llm_parse'),
+    ):
+        timer.wrap(module, name, stage)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    session = create_session(pool_size=max(args.concurrency), max_retries=0)
+    run_id = f'{int(time.time())}'
+
+    def search(i):
+        response = session.post(f'{base_url}/recruiter/', data={'search_query': QUERIES[i % len(QUERIES)]})
+        if response.status_code != 200 or 'Error searching' in response.text:
+            raise RuntimeError(f'search failed with status {response.status_code}')
+
+    def ingest(i):
+        response = session.post(f'{base_url}/candidate/', data={
+            'full_name': f'Bench Candidate {i}',
+            'email': f'bench-{run_id}-{i}@example.com',
+            'github': f'https://github.com/bench{i}',
+            'linkedin': f'https://linkedin.com/in/bench{i}',
+        }, files={'resume': (f'resume-{i}.pdf', resume_pdf(run_id, i), 'application/pdf')})
+        match = re.search(r'jobs/([0-9a-f]{32})', response.text)
+        if response.status_code != 200 or not match:
+            raise RuntimeError(f'upload failed with status {response.status_code}')
+        # Poll like the processing page does, backing off up to 5 seconds
+        delay = 0.5
+        while True:
+            job = session.get(f'{base_url}/candidate/jobs/{match.group(1)}').json()
+            if job['status'] == 'failed':
+                raise RuntimeError(job['error'] or 'ingestion failed')
+            if job['status'] == 'done':
+                return
+            time.sleep(delay)
+            delay = min(delay * 1.5, 5.0)
+
+    endpoints = [('POST /recruiter/', search, args.requests),
+                 ('POST /candidate/', ingest, args.ingest_requests or args.requests)]
+    if args.only:
+        endpoints = [endpoints[0 if args.only == 'search' else 1]]
+
+    results = []
+    for label, call, total in endpoints:
+        prefix = label.split()[1]
+        for concurrency in args.concurrency:
+            timer.drain()
+            # Distinct uploads per level so later levels aren't answered from earlier parses
+            result = run_level(lambda i: call(concurrency * 100000 + i) if prefix == '/candidate/' else call(i),
+                               total, concurrency)
+            result['endpoint'] = label
+            result['stages'] = {stage: summarize(samples) for stage, samples in sorted(timer.drain().items())}
+            results.append(result)
+            latency = result['latency']
+            print(f"{label:<18} c={concurrency:<3} {result['throughput_rps']:8.2f} req/s   "
+                  f"p50 {latency['p50_ms']:8.1f} ms   p95 {latency['p95_ms']:8.1f} ms   "
+                  f"p99 {latency['p99_ms']:8.1f} ms   errors {result['errors']}", file=sys.stderr)
+
+    server.shutdown()
+    github_server.shutdown()
+    report = {
+        'benchmark': 'e2e',
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': vars(args),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
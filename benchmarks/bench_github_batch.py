@@ -0,0 +1,71 @@
+"""
+Compare per-user GitHub REST lookups with batched GraphQL lookups for a page of candidates.
+
+Both paths score the same candidates against the local GitHub stub, starting
+from an empty profile cache:
+- REST sends one request per candidate, 8 at a time, like searches did
+  before batching.
+- GraphQL sends one query per GITHUB_GRAPHQL_BATCH_SIZE candidates.
+A few candidates don't exist on the stub, to exercise the NOT_FOUND handling.
+
+It reports the round trips the stub served, the wall time per page and
+whether the two paths produced the same scores.
+
+Usage:
+    python -m benchmarks.bench_github_batch [--candidates 120] [--latency 0.05] [--pages 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, default=120, help='Candidates per page')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency in seconds')
+    parser.add_argument('--pages', type=int, default=3, help='Pages scored per path')
+    args = parser.parse_args()
+
+    # Point the app at the stub before anything reads its configuration
+    from benchmarks.stubs import GitHubStubHandler, start_stub_server
+    handler = type('GitHub', (GitHubStubHandler,), {'latency': args.latency})
+    server, url = start_stub_server(handler)
+    os.environ.update({'CACHE_DIR': tempfile.mkdtemp(prefix='hireai-bench-'), 'GITHUB_API_URL': url,
+                       'GITHUB_TOKENS': 'bench-token'})
+    from utils import background_quality
+    from utils.background_quality import score_github_background_api, score_github_backgrounds_api
+
+    def page_urls(page):
+        return [f'https://github.com/{"missing" if i % 25 == 0 else "user"}-{page}-{i}'
+                for i in range(args.candidates)]
+
+    def rest(urls):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            return list(pool.map(score_github_background_api, urls))
+
+    def graphql(urls):
+        return score_github_backgrounds_api(urls)
+
+    results = {}
+    try:
+        for label, score_page in (('REST', rest), ('GraphQL', graphql)):
+            background_quality._github_cache.clear()
+            server.requests = {}
+            elapsed, scores = [], []
+            for page in range(args.pages):
+                start = time.perf_counter()
+                scores.append(score_page(page_urls(page)))
+                elapsed.append(time.perf_counter() - start)
+            results[label] = scores
+            round_trips = sum(server.requests.values()) / args.pages
+            print(f"{label:<8} {round_trips:6.1f} round trips/page   "
+                  f"{sum(elapsed) / len(elapsed) * 1000:8.1f} ms/page   requests {server.requests}")
+    finally:
+        server.shutdown()
+    print(f"Same scores: {results['REST'] == results['GraphQL']}")
+
+
+if __name__ == '__main__':
+    main()
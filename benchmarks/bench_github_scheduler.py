@@ -0,0 +1,99 @@
+"""
+Exercise the GitHub request scheduler against a rate-limited GitHub stub.
+
+A flood of background lookups (score refreshes) runs while interactive
+lookups (searches) arrive. With a small per-token quota this shows:
+- how the token pool is shared
+- that interactive lookups keep the reserved part of the quota and skip the queue
+- that lookups over budget are deferred rather than sent and rejected with a 403
+
+The direct run sends the same lookups with one token and no scheduler, like
+the code before the scheduler, and counts the 403s (each of them used to
+score a candidate 0).
+
+Usage:
+    python -m benchmarks.bench_github_scheduler [--tokens 2] [--rate-limit 100] [--background 300]
+        [--interactive 60] [--latency 0.02] [--max-concurrency 8]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stubs import GitHubStubHandler, start_stub_server
+from utils.github_client import GitHubDeferred, GitHubScheduler, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from utils.http_session import http_get
+
+
+def run_scheduled(url: str, args) -> dict:
+    """Background and interactive lookups through a fresh scheduler; latency and outcome per priority."""
+    scheduler = GitHubScheduler([f'token-{i}' for i in range(args.tokens)], max_concurrency=args.max_concurrency)
+    results = {PRIORITY_INTERACTIVE: [], PRIORITY_BACKGROUND: []}
+
+    def lookup(priority, i):
+        start = time.perf_counter()
+        try:
+            status = scheduler.get(f'{url}/users/user{priority}-{i}', priority=priority).status_code
+        except GitHubDeferred:
+            status = 'deferred'
+        results[priority].append((status, time.perf_counter() - start))
+
+    with ThreadPoolExecutor(max_workers=16) as background, ThreadPoolExecutor(max_workers=4) as interactive:
+        for i in range(args.background):
+            background.submit(lookup, PRIORITY_BACKGROUND, i)
+        # Searches arrive while the refresh backlog is queued
+        for i in range(args.interactive):
+            interactive.submit(lookup, PRIORITY_INTERACTIVE, i)
+            time.sleep(0.005)
+    return {'results': results, 'stats': scheduler.stats()}
+
+
+def run_direct(url: str, args) -> list:
+    """The same lookups with one token and no scheduler."""
+    def lookup(i):
+        return http_get(f'{url}/users/direct-{i}', headers={'Authorization': 'token direct'}).status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        return list(pool.map(lookup, range(args.background + args.interactive)))
+
+
+def report(label: str, outcomes: list):
+    served = [seconds for status, seconds in outcomes if status == 200]
+    deferred = sum(1 for status, _ in outcomes if status == 'deferred')
+    rejected = sum(1 for status, _ in outcomes if status not in (200, 'deferred'))
+    latency = ''
+    if served:
+        served.sort()
+        latency = (f"   p50 {statistics.median(served) * 1000:7.1f} ms"
+                   f"   p95 {served[max(int(len(served) * 0.95) - 1, 0)] * 1000:7.1f} ms")
+    print(f"{label:<12} served {len(served):5d}   deferred {deferred:5d}   rejected {rejected:5d}{latency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=2, help='Tokens in the pool')
+    parser.add_argument('--rate-limit', type=int, default=100, help='Stub requests per token per window')
+    parser.add_argument('--background', type=int, default=300, help='Background lookups')
+    parser.add_argument('--interactive', type=int, default=60, help='Interactive lookups')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub latency in seconds')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Scheduler request slots')
+    args = parser.parse_args()
+
+    handler = type('RateLimitedGitHub', (GitHubStubHandler,), {'latency': args.latency, 'rate_limit': args.rate_limit})
+    server, url = start_stub_server(handler)
+    try:
+        scheduled = run_scheduled(url, args)
+        print(f"Scheduled: {args.tokens} tokens x {args.rate_limit} requests, "
+              f"{args.background} background + {args.interactive} interactive lookups")
+        report('interactive', scheduled['results'][PRIORITY_INTERACTIVE])
+        report('background', scheduled['results'][PRIORITY_BACKGROUND])
+        print(f"403s from the stub: {server.rejected}   scheduler: {scheduled['stats']}")
+
+        server.rejected = 0
+        statuses = run_direct(url, args)
+        print(f"\nDirect, one token: {statuses.count(200)} served, {server.rejected} rejected with 403 (scored 0)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
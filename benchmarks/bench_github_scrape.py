@@ -0,0 +1,157 @@
+"""
+Compare the BeautifulSoup parse of a GitHub profile page with the streaming field extractor.
+
+Each fixture is parsed both ways:
+- soup: BeautifulSoup(html.parser) over the whole decoded page, as
+  score_github_background did before
+- streaming: utils.github_scraper over 16 KiB chunks of the body, stopping
+  once every field is found
+
+For each fixture it reports CPU time per parse, peak traced allocations, the
+share of the body the streaming path read, and whether both paths extracted
+the same fields.
+
+Fixtures are saved profile pages passed with --html (e.g.
+`curl -s https://github.com/<user> > user.html`). Without --html, generated
+pages with the structure of GitHub's profile page are used: a large head,
+the repository tab counter, the avatar, followers and achievements in the
+sidebar, pinned repositories, the contribution calendar and the activity
+feed.
+
+Usage:
+    python -m benchmarks.bench_github_scrape [--html page.html ...] [--iterations 30]
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+from utils.github_scraper import GITHUB_SCRAPE_CHUNK_SIZE, profile_fields_soup, profile_fields_streaming
+
+
+def generated_profile(login: str, repos: int, followers: int, arctic_vault: bool, seed: int = 0) -> bytes:
+    """A profile page shaped like GitHub's, about 300-400 KB."""
+    rng = random.Random(seed)
+    svg = '<svg aria-hidden="true" height="16" viewBox="0 0 16 16" width="16" class="octicon">' \
+          '<path d="M2 2.5A2.5 2.5 0 0 1 4.5 0h8.75a.75.75 0 0 1 .75.75v12.5a.75.75 0 0 1-.75.75h-2.5"></path></svg>'
+    parts = ['<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">',
+             ''.join(f'<link rel="stylesheet" href="https://github.githubassets.com/assets/app-{i}.css">'
+                     for i in range(30)),
+             '<script type="application/json" id="client-env">{"locale":"en","featureFlags":[',
+             ','.join(f'"flag_{i}_{rng.randrange(10 ** 6)}"' for i in range(3000)),
+             ']}</script>', f'<title>{login} (Bench User) · GitHub</title></head><body>',
+             '<header class="AppHeader">',
+             ''.join(f'<a href="/nav/{i}" class="AppHeader-link">{svg}<span>Nav {i}</span></a>' for i in range(40)),
+             '</header><main><nav class="UnderlineNav">',
+             f'<a href="/{login}" class="UnderlineNav-item selected">{svg}Overview</a>',
+             f'<a href="/{login}?tab=repositories" class="UnderlineNav-item">{svg}Repositories '
+             f'<span title="{repos}" class="Counter">{repos:,}</span></a>',
+             f'<a href="/{login}?tab=projects" class="UnderlineNav-item">{svg}Projects '
+             f'<span title="0" class="Counter" hidden="hidden">0</span></a>',
+             f'<a href="/{login}?tab=stars" class="UnderlineNav-item">{svg}Stars '
+             f'<span title="{rng.randrange(500)}" class="Counter">{rng.randrange(500)}</span></a>',
+             '</nav><div class="Layout-sidebar"><div class="h-card">',
+             f'<a itemprop="image" href="https://avatars.githubusercontent.com/u/{seed}?v=4">'
+             f'<img style="height:auto;" alt="Avatar" width="260" height="260" '
+             f'class="avatar avatar-user width-full border color-bg-default" '
+             f'src="https://avatars.githubusercontent.com/u/{seed}?v=4"></a>',
+             f'<h1 class="vcard-names"><span class="p-name">Bench User</span>'
+             f'<span class="p-nickname">{login}</span></h1>',
+             '<div class="p-note user-profile-bio">' + ' '.join(rng.choice(['Building', 'things', 'with', 'Python',
+                                                                            'and', 'Go']) for _ in range(30)),
+             '</div><div class="flex-order-1">',
+             f'<a class="Link--secondary no-underline no-wrap" href="https://github.com/{login}?tab=followers">'
+             f'{svg}<span class="text-bold color-fg-default">{followers}</span> followers</a> · ',
+             f'<a class="Link--secondary no-underline no-wrap" href="https://github.com/{login}?tab=following">'
+             f'<span class="text-bold color-fg-default">{rng.randrange(100)}</span> following</a></div>',
+             '<h2 class="h4 mb-2">Achievements</h2><div class="d-flex flex-wrap">']
+    if arctic_vault:
+        parts.append(f'<a href="/{login}?achievement=arctic-code-vault-contributor&amp;tab=achievements">'
+                     '<img alt="Achievement: Arctic Code Vault Contributor" width="64" '
+                     'src="https://github.githubassets.com/images/modules/profile/achievements/arctic.png"></a>')
+    parts.append('<a href="?tab=achievements"><img alt="Achievement: Pull Shark" width="64" src="/shark.png"></a>'
+                 '</div></div></div><div class="Layout-main"><h2>Pinned</h2><ol class="d-flex flex-wrap">')
+    for i in range(6):
+        parts.append(f'<li class="pinned-item-list-item"><div class="Box pinned-item-list-item-content">'
+                     f'<a href="/{login}/repo-{i}" class="Link text-bold"><span class="repo">repo-{i}</span></a>'
+                     f'<p class="pinned-item-desc">{" ".join(str(rng.random()) for _ in range(10))}</p>'
+                     f'<span class="repo-language-color" style="background-color: #3572A5"></span>'
+                     f'<span itemprop="programmingLanguage">Python</span>'
+                     f'<a href="/{login}/repo-{i}/stargazers" class="pinned-item-meta Link--muted">{svg}'
+                     f'{rng.randrange(1000)}</a></div></li>')
+    parts.append('</ol><h2 class="f4 text-normal mb-2">1,234 contributions in the last year</h2>'
+                 '<table class="ContributionCalendar-grid js-calendar-graph-table"><tbody>')
+    for day in range(7):
+        parts.append('<tr style="height: 10px">')
+        for week in range(53):
+            level = rng.randrange(5)
+            parts.append(f'<td tabindex="0" data-ix="{week}" aria-selected="false" '
+                         f'aria-describedby="contribution-graph-legend-level-{level}" style="width: 10px" '
+                         f'data-date="2024-{week % 12 + 1:02d}-{day + 1:02d}" id="contribution-day-component-{day}-{week}" '
+                         f'data-level="{level}" role="gridcell" class="ContributionCalendar-day"></td>'
+                         f'<tool-tip for="contribution-day-component-{day}-{week}" popover="manual" '
+                         f'class="sr-only position-absolute">{level * 3} contributions on day {week * 7 + day}.'
+                         f'</tool-tip>')
+        parts.append('</tr>')
+    parts.append('</tbody></table><div class="contribution-activity-listing">')
+    for i in range(120):
+        parts.append(f'<div class="TimelineItem">{svg}<div class="TimelineItem-body">'
+                     f'<a href="/{login}/repo-{i % 6}/commits?author={login}">Created {rng.randrange(50)} commits '
+                     f'in <span class="text-bold">repo-{i % 6}</span></a>'
+                     f'<span class="Progress"><span class="Progress-item" style="width: {rng.randrange(100)}%">'
+                     f'</span></span></div></div>')
+    parts.append('</div></div></main><footer>' + ''.join(f'<a href="/site/{i}">Footer {i}</a>' for i in range(30))
+                 + '</footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def measure(parse, iterations: int):
+    """CPU seconds per call and peak traced bytes of one call."""
+    start = time.process_time()
+    for _ in range(iterations):
+        result = parse()
+    cpu = (time.process_time() - start) / iterations
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--html', nargs='+', help='Saved GitHub profile pages')
+    parser.add_argument('--iterations', type=int, default=30, help='Parses per fixture and path')
+    args = parser.parse_args()
+
+    if args.html:
+        fixtures = []
+        for path in args.html:
+            with open(path, 'rb') as f:
+                fixtures.append((os.path.basename(path), f.read()))
+    else:
+        fixtures = [
+            ('generated', generated_profile('bench-user', 42, 17, False, seed=1)),
+            ('generated-arctic', generated_profile('bench-arctic', 1234, 980, True, seed=2)),
+        ]
+
+    for name, body in fixtures:
+        read = []
+
+        def chunks():
+            for start in range(0, len(body), GITHUB_SCRAPE_CHUNK_SIZE):
+                read.append(start + GITHUB_SCRAPE_CHUNK_SIZE)
+                yield body[start:start + GITHUB_SCRAPE_CHUNK_SIZE]
+
+        soup_fields, soup_cpu, soup_peak = measure(lambda: profile_fields_soup(body.decode('utf-8')), args.iterations)
+        fast_fields, fast_cpu, fast_peak = measure(lambda: profile_fields_streaming(chunks(), 'utf-8'),
+                                                   args.iterations)
+        print(f"{name} ({len(body) / 1024:.0f} KiB): {soup_fields}")
+        print(f"  soup       {soup_cpu * 1000:7.2f} ms CPU   peak {soup_peak / 1024:8.0f} KiB")
+        print(f"  streaming  {fast_cpu * 1000:7.2f} ms CPU   peak {fast_peak / 1024:8.0f} KiB   "
+              f"read {min(read[-1], len(body)) / len(body):.0%} of the body")
+        print(f"  same fields: {soup_fields == fast_fields}   CPU {soup_cpu / fast_cpu:.1f}x less")
+
+
+if __name__ == '__main__':
+    main()
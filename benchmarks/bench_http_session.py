@@ -0,0 +1,48 @@
+"""
+Compare per-call latency of one-off requests.get calls with the pooled session.
+
+Usage:
+    python -m benchmarks.bench_http_session [--calls 500]
+"""
+import argparse
+import statistics
+import time
+import requests
+from benchmarks.stubs import start_stub_server
+from utils.http_session import create_session, DEFAULT_TIMEOUT
+
+
+def time_calls(get, url: str, calls: int) -> list:
+    """Return the latency of each call in milliseconds."""
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        resp = get(f'{url}/users/user{i}', timeout=DEFAULT_TIMEOUT)
+        resp.content
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(latencies):7.3f} ms   "
+          f"p50 {statistics.median(latencies):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=500)
+    args = parser.parse_args()
+
+    server, url = start_stub_server()
+    try:
+        report('requests.get', time_calls(requests.get, url, args.calls))
+        session = create_session()
+        report('pooled session', time_calls(session.get, url, args.calls))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Compare time and peak memory of the original PDF extraction with the streaming extractor.
+
+Each run happens in a fresh process so peak RSS isn't shared between variants.
+
+Usage:
+    python -m benchmarks.bench_pdf_extract [--pages 300] [--lines 60]
+"""
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+
+def build_pdf(pages: int, lines_per_page: int, line_text=None) -> bytes:
+    """
+    Build a minimal text PDF with the given number of pages.
+    `line_text(page, line)` returns the bytes of each line; the default repeats a sample resume line.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for p in range(pages):
+        lines = b"".join(
+            b"(" + (line_text(p, l) if line_text else
+                    b"Page %d line %d: Python, Flask, SQL, distributed systems, LLMs and RAG pipelines" % (p + 1, l))
+            + b") Tj T* "
+            for l in range(lines_per_page)
+        )
+        stream = b"BT /F1 9 Tf 11 TL 40 800 Td " + lines + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract(pdf_file):
+    """The original implementation: copy the upload, then grow a string page by page."""
+    from PyPDF2 import PdfReader
+    pdf_reader = PdfReader(io.BytesIO(pdf_file.read()))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text.strip()
+
+
+def _run(variant: str, pdf_bytes: bytes, queue):
+    from utils.pdf_extractor import extract_text_from_pdf
+    extract = legacy_extract if variant == 'legacy' else extract_text_from_pdf
+    upload = io.BytesIO(pdf_bytes)
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = extract(upload)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put({
+        'variant': variant,
+        'seconds': elapsed,
+        'peak_traced_mb': peak / 1e6,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'chars': len(text or ''),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--lines', type=int, default=60)
+    args = parser.parse_args()
+
+    pdf_bytes = build_pdf(args.pages, args.lines)
+    print(f"Synthetic PDF: {args.pages} pages, {len(pdf_bytes) / 1e6:.1f} MB")
+    ctx = multiprocessing.get_context('spawn')
+    for variant in ('legacy', 'streaming'):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run, args=(variant, pdf_bytes, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        print(f"{result['variant']:<10} {result['seconds']:7.2f} s   peak traced {result['peak_traced_mb']:7.1f} MB   "
+              f"max RSS {result['max_rss_mb']:7.1f} MB   {result['chars']} chars")
+
+
+if __name__ == '__main__':
+    main()
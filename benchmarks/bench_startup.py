@@ -0,0 +1,88 @@
+"""
+Measure cold-start cost of a worker: import time of the app and time to first request.
+
+Each run starts a fresh interpreter, like a new gunicorn worker. The import
+breakdown comes from `python -X importtime`, aggregated per top-level package.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--path /] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child: import the app, then serve one request through the test client
+_CHILD = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get({path!r})
+done = time.perf_counter()
+print(json.dumps({{'import_seconds': imported - start, 'first_request_seconds': done - imported,
+                   'status': response.status_code}}))
+"""
+
+
+def _child_env():
+    env = dict(os.environ)
+    # Don't hit Supabase from the benchmark; warm-up and score refresh run on background threads anyway
+    env.setdefault('CANDIDATE_INDEX_WARMUP', 'false')
+    env.setdefault('BACKGROUND_SCORE_REFRESH', 'false')
+    return env
+
+
+def time_startup(path: str) -> dict:
+    """Start a fresh interpreter, import the app and serve `path` once."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', _CHILD.format(path=path)], cwd=ROOT, env=_child_env(),
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_seconds'] = time.perf_counter() - start
+    return timings
+
+
+def import_breakdown() -> dict:
+    """
+    Self import time per top-level package, in seconds, from -X importtime.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT,
+                            env=_child_env(), capture_output=True, text=True, check=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        package = module.strip().split('.')[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1e6
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+    parser.add_argument('--path', default='/', help='Path requested as the first request')
+    parser.add_argument('--top', type=int, default=15, help='Packages shown in the import breakdown')
+    args = parser.parse_args()
+
+    runs = [time_startup(args.path) for _ in range(args.runs)]
+    print(f"Worker cold start over {args.runs} runs (median, max), first request GET {args.path} "
+          f"-> {runs[0]['status']}")
+    for key in ('import_seconds', 'first_request_seconds', 'process_seconds'):
+        values = [run[key] for run in runs]
+        print(f"  {key:<22} {statistics.median(values) * 1000:8.1f} ms {max(values) * 1000:8.1f} ms")
+
+    totals = import_breakdown()
+    print(f"\nImport time by package (self time, total {sum(totals.values()) * 1000:.1f} ms)")
+    for package, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {package:<24} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
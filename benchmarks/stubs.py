@@ -0,0 +1,250 @@
+"""
+Local stand-ins for the external services the app talks to, used by the benchmarks.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from utils.candidate_repository import CandidateRepository
+from utils.query_parser import parse_query_locally
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    """
+    Minimal GitHub stand-in with keep-alive, serving REST /users/<username>
+    and GraphQL queries of aliased `user(login: $var)` fields on POST /graphql.
+    Usernames starting with "missing" don't exist. Set `latency` (seconds) on a
+    subclass to delay every response. `server.requests` counts the requests
+    served per API ('rest' and 'graphql').
+
+    Set `rate_limit` to enforce GitHub's rate limiting: each token (the
+    Authorization header, or none) gets `rate_limit` requests per
+    `rate_limit_window` seconds, separately for REST and GraphQL. Every
+    response carries X-RateLimit-Limit, -Remaining, -Used and -Reset, and
+    requests over the limit get GitHub's 403 "API rate limit exceeded" response.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Buffer each response into one write; separate header and body writes hit
+    # Nagle's algorithm and delayed ACKs, adding ~40 ms per keep-alive request
+    wbufsize = -1
+    latency = 0.0
+    rate_limit = 0  # requests per window and token, 0 for no limit
+    rate_limit_window = 3600.0
+
+    def _rate_limit_headers(self, api='rest'):
+        """Count this request against its token's quota for `api`; return (headers, allowed)."""
+        server = self.server
+        with server.lock:
+            windows = server.rate_windows
+            token = (api, self.headers.get('Authorization', ''))
+            now = time.time()
+            reset_at, used = windows.get(token, (0, 0))
+            if now >= reset_at:
+                reset_at, used = int(now + self.rate_limit_window), 0
+            allowed = used < self.rate_limit
+            used += allowed
+            windows[token] = (reset_at, used)
+            server.rejected += not allowed
+        return {
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(self.rate_limit - used),
+            'X-RateLimit-Used': str(used),
+            'X-RateLimit-Reset': str(reset_at),
+        }, allowed
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _begin(self, api):
+        """Delay, count and rate limit a request; return its rate limit headers, or None if rejected."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.server.lock:
+            self.server.requests[api] = self.server.requests.get(api, 0) + 1
+        headers = {}
+        if self.rate_limit:
+            headers, allowed = self._rate_limit_headers(api)
+            if not allowed:
+                self._send_json(403, {'message': 'API rate limit exceeded'}, headers)
+                return None
+        return headers
+
+    @staticmethod
+    def _profile(username):
+        return {
+            'login': username,
+            'public_repos': 12,
+            'followers': 30,
+            'avatar_url': f'https://avatars.example.com/{username}'
+        }
+
+    def do_GET(self):
+        headers = self._begin('rest')
+        if headers is None:
+            return
+        username = self.path.rstrip('/').split('/')[-1]
+        if username.startswith('missing'):
+            self._send_json(404, {'message': 'Not Found'}, headers)
+            return
+        self._send_json(200, self._profile(username), headers)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        headers = self._begin('graphql')
+        if headers is None:
+            return
+        if self.path.rstrip('/') != '/graphql':
+            self._send_json(404, {'message': 'Not Found'}, headers)
+            return
+        if not self.headers.get('Authorization'):
+            # Like GitHub, GraphQL needs a token
+            self._send_json(401, {'message': 'This endpoint requires you to be authenticated.'}, headers)
+            return
+        request = json.loads(body or b'{}')
+        variables = request.get('variables') or {}
+        data, errors = {}, []
+        for alias, variable in re.findall(r'(\w+)\s*:\s*user\(login:\s*\$(\w+)\)', request.get('query', '')):
+            login = variables.get(variable, '')
+            if login.startswith('missing'):
+                data[alias] = None
+                errors.append({'type': 'NOT_FOUND', 'path': [alias],
+                               'message': f"Could not resolve to a User with the login of '{login}'."})
+                continue
+            profile = self._profile(login)
+            data[alias] = {
+                'login': login,
+                'avatarUrl': profile['avatar_url'],
+                'followers': {'totalCount': profile['followers']},
+                'repositories': {'totalCount': profile['public_repos']},
+                'contributionsCollection': {'contributionCalendar': {'totalContributions': 250}},
+            }
+        payload = {'data': data}
+        if errors:
+            payload['errors'] = errors
+        self._send_json(200, payload, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(handler=GitHubStubHandler, host: str = '127.0.0.1', port: int = 0):
+    """
+    Start a stub server on a background thread.
+
+    Args:
+        handler: BaseHTTPRequestHandler subclass to serve
+        host (str): Interface to bind
+        port (int): Port to bind, 0 picks a free port
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    # Shared state for handlers: per-token rate limit windows, rejected and served request counts
+    server.lock = threading.Lock()
+    server.rate_windows = {}
+    server.rejected = 0
+    server.requests = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+class FakeGeminiClient:
+    """
+    Gemini stand-in for utils.gemini.set_client.
+
+    Resume prompts get a parse built from the resume text (email, skills and
+    location found by simple patterns), multi-resume prompts a JSON array of
+    such parses; search prompts get the local query parser's filters. Every
+    call sleeps for `latency` seconds first.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents, config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        prompt = contents[0].parts[0].text
+        if 'Query: ' in prompt:
+            query = prompt.split('Query: ', 1)[1].split('\n', 1)[0]
+            return SimpleNamespace(text=json.dumps(parse_query_locally(query)[0]))
+        documents = re.findall(r'<resume id="(\d+)">\n(.*?)\n</resume>', prompt, re.S)
+        if documents:
+            return SimpleNamespace(text=json.dumps([dict(self._parse_resume(resume), id=int(resume_id))
+                                                    for resume_id, resume in documents]))
+        resume = prompt.split('Now here is the resume: ', 1)[-1]
+        return SimpleNamespace(text=json.dumps(self._parse_resume(resume)))
+
+    @staticmethod
+    def _parse_resume(resume):
+        email = re.search(r'[\w.+-]+@[\w-]+\.[\w.]+', resume)
+        filters, _ = parse_query_locally(resume[:2000])
+        return {
+            'name': resume.strip().split('\n', 1)[0][:60],
+            'email': email.group(0) if email else None,
+            'phone': None,
+            'skills': filters['skills'],
+            'experience_years': filters['min_experience_years'] or 0,
+            'education': 'B.Sc. in Computer Science',
+            'current_location': filters['location'],
+            'linkedin': None,
+            'github': None
+        }
+
+
+class LatencyRepository(CandidateRepository):
+    """Wrap a CandidateRepository, adding `latency` seconds to every call (a remote database round trip)."""
+
+    def __init__(self, repository: CandidateRepository, latency: float = 0.0):
+        self.repository = repository
+        self.latency = latency
+
+    def _call(self, name, *args, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return getattr(self.repository, name)(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self._call('get', *args, **kwargs)
+
+    def get_by_email(self, *args, **kwargs):
+        return self._call('get_by_email', *args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        return self._call('get_many', *args, **kwargs)
+
+    def search(self, *args, **kwargs):
+        return self._call('search', *args, **kwargs)
+
+    def search_by_background_score(self, *args, **kwargs):
+        return self._call('search_by_background_score', *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._call('upsert', *args, **kwargs)
+
+    def upsert_many(self, *args, **kwargs):
+        return self._call('upsert_many', *args, **kwargs)
+
+    def update_scores(self, *args, **kwargs):
+        return self._call('update_scores', *args, **kwargs)
+
+    def due_for_scoring(self, *args, **kwargs):
+        return self._call('due_for_scoring', *args, **kwargs)
+
+    def changed_since(self, *args, **kwargs):
+        return self._call('changed_since', *args, **kwargs)
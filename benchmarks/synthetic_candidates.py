@@ -0,0 +1,116 @@
+"""
+Fill a candidate store with synthetic candidates for load testing and benchmarks.
+
+Skills and locations come from the query parser's vocabularies with a skewed
+distribution (a few very common skills, a long tail), so search filters have
+realistic selectivity. Output is deterministic for a given seed.
+
+Usage:
+    python -m benchmarks.synthetic_candidates --count 100000 [--path cache/candidates.sqlite3] [--seed 1]
+"""
+import argparse
+import random
+import time
+from typing import Dict, Iterator
+from utils.background_quality import background_score_fields, combine_background_scores
+from utils.candidate_repository import CANDIDATE_STORE_PATH, CandidateRepository, SQLiteCandidateRepository
+from utils.query_parser import KNOWN_LOCATIONS, KNOWN_SKILLS
+
+SKILLS = sorted(set(KNOWN_SKILLS.values()))
+CITIES = sorted({v for v in KNOWN_LOCATIONS.values() if v not in ('India', 'Germany', 'USA', 'UK', 'Canada', 'Remote')})
+COUNTRIES = {
+    'Berlin': 'Germany', 'Munich': 'Germany', 'London': 'UK', 'Paris': 'France', 'Amsterdam': 'Netherlands',
+    'Dublin': 'Ireland', 'Toronto': 'Canada', 'Vancouver': 'Canada', 'Singapore': 'Singapore',
+    'Sydney': 'Australia', 'Tokyo': 'Japan', 'Bangalore': 'India', 'Mumbai': 'India', 'Delhi': 'India',
+    'Hyderabad': 'India', 'Pune': 'India', 'Chennai': 'India',
+}
+FIRST_NAMES = ['Alex', 'Sam', 'Priya', 'Wei', 'Maria', 'Jonas', 'Aisha', 'Diego', 'Yuki', 'Olga',
+               'Omar', 'Lena', 'Ravi', 'Chloe', 'Mateo', 'Nina', 'Kofi', 'Sara', 'Ivan', 'Mei']
+LAST_NAMES = ['Smith', 'Patel', 'Chen', 'Garcia', 'Muller', 'Khan', 'Silva', 'Tanaka', 'Ivanova', 'Okafor',
+              'Johnson', 'Rossi', 'Kim', 'Nguyen', 'Dubois', 'Larsen', 'Cohen', 'Singh', 'Lopez', 'Novak']
+EDUCATION = ['B.Sc. in Computer Science', 'M.Sc. in Computer Science', 'B.Eng. in Software Engineering',
+             'M.Sc. in Data Science', 'Ph.D. in Machine Learning', 'B.A. in Mathematics']
+
+
+def generate_candidates(count: int, seed: int = 1, scored: bool = False) -> Iterator[Dict]:
+    """
+    Yield `count` synthetic candidates in the save_candidate format.
+
+    Args:
+        count (int): Number of candidates
+        seed (int): Random seed
+        scored (bool): Include stored background scores, as if the refresher had run
+
+    Yields:
+        Dict: Candidate data
+    """
+    rng = random.Random(seed)
+    # Zipf-like skill popularity: the k-th skill is picked with weight 1/k
+    skill_weights = [1 / (rank + 1) for rank in range(len(SKILLS))]
+    skills_by_popularity = SKILLS[:]
+    rng.shuffle(skills_by_popularity)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        handle = f'{first}{last}{i}'.lower()
+        city = rng.choice(CITIES)
+        skills = set(rng.choices(skills_by_popularity, weights=skill_weights, k=rng.randint(3, 10)))
+        location = 'Remote' if rng.random() < 0.05 else f"{city}, {COUNTRIES.get(city, 'USA')}"
+        candidate = {
+            'name': f'{first} {last}',
+            'email': f'{handle}@example.com',
+            'phone': f'+1-555-{i // 10000 % 1000:03d}-{i % 10000:04d}',
+            'skills': sorted(skills),
+            'experience_years': min(int(rng.expovariate(1 / 5)), 40),
+            'education': rng.choice(EDUCATION),
+            'current_location': location,
+            'linkedin': f'https://linkedin.com/in/{handle}',
+            'github': f'https://github.com/{handle}' if rng.random() < 0.7 else None,
+        }
+        if scored:
+            components = {'github': rng.randint(0, 100) if candidate['github'] else 0,
+                          'linkedin': 80, 'public_presence': rng.randint(0, 100)}
+            score = combine_background_scores(components['github'], components['linkedin'],
+                                              components['public_presence'])
+            candidate.update(background_score_fields(score, components))
+        yield candidate
+
+
+def fill_repository(repository: CandidateRepository, count: int, seed: int = 1, batch_size: int = 5000,
+                    scored: bool = False) -> int:
+    """
+    Upsert `count` synthetic candidates into a repository.
+
+    Returns:
+        int: Number of rows saved
+    """
+    saved = 0
+    batch = []
+    for candidate in generate_candidates(count, seed, scored=scored):
+        batch.append({k: v for k, v in candidate.items() if v is not None})
+        if len(batch) >= batch_size:
+            saved += len(repository.upsert_many(batch))
+            batch = []
+    if batch:
+        saved += len(repository.upsert_many(batch))
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100000, help='Number of candidates (default: %(default)s)')
+    parser.add_argument('--path', default=CANDIDATE_STORE_PATH, help='SQLite file (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--scored', action='store_true', help='Store background scores with the candidates')
+    args = parser.parse_args()
+
+    repository = SQLiteCandidateRepository(args.path)
+    start = time.perf_counter()
+    saved = fill_repository(repository, args.count, seed=args.seed, batch_size=args.batch_size, scored=args.scored)
+    elapsed = time.perf_counter() - start
+    print(f"Saved {saved} candidates to {args.path} in {elapsed:.1f}s ({saved / elapsed:.0f}/s); "
+          f"store now holds {repository.count()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,4 @@ class Config:
     # File Upload
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
-    
-    # Create upload folder if it doesn't exist
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True) 
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
\ No newline at end of file
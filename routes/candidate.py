@@ -1,15 +1,153 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, json
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, session
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
+import hashlib
 import os
-from utils.pdf_extractor import extract_text_from_pdf
+import tempfile
+import uuid
+from utils.pdf_extractor import extract_text_from_pdf_path
 from utils.gemini import parse_resume_with_gemini
-from utils.supabase_client import save_candidate, get_candidate_by_email, supabase
+from utils.supabase_client import save_candidate, get_candidate_by_email, get_candidate_by_id, CANDIDATE_FIELDS
+from utils.fingerprint import FINGERPRINT_FIELDS, fingerprint_index, compute_fingerprint, file_sha256, normalize_resume_text, diff_resumes
+from utils.job_queue import JobQueue, QueueFullError
+from utils.cache import PersistentCache
+from utils.metrics import register_collector, timed
 
 candidate_bp = Blueprint('candidate', __name__, url_prefix='/candidate')
 
-# Temporary storage for candidate profiles (replace with database later)
-candidate_profiles = {}
+# Previews waiting to be saved, keyed by session. Kept in SQLite only (no
+# in-process copy) so every worker process sees the same previews.
+preview_store = PersistentCache(
+    'candidate_previews',
+    path=os.getenv('PREVIEW_STORE_PATH'),
+    ttl=float(os.getenv('PREVIEW_TTL', '3600')),
+    max_entries=int(os.getenv('PREVIEW_MAX_ENTRIES', '1000')),
+    memory_entries=0
+)
+
+def _preview_key():
+    """Preview store key for the current browser session"""
+    if 'preview_id' not in session:
+        session['preview_id'] = uuid.uuid4().hex
+    return session['preview_id']
+
+# Directory for uploads waiting to be ingested, defaults to the system temp directory
+INGEST_UPLOAD_DIR = os.getenv('INGEST_UPLOAD_DIR') or None
+
+# Re-parse near-duplicate resumes with Gemini instead of reusing the earlier parse
+FINGERPRINT_REPARSE_NEAR_DUPLICATES = os.getenv('FINGERPRINT_REPARSE_NEAR_DUPLICATES', 'false').lower() == 'true'
+
+def _previous_parse(match):
+    """
+    Parsed data and raw response for a fingerprint match.
+    Matches loaded from the database only hold a candidate id, so the saved row is used.
+    """
+    if match.get('parsed_data'):
+        return match['parsed_data'], match.get('raw_response')
+    if match.get('candidate_id'):
+        candidate = get_candidate_by_id(match['candidate_id'])
+        if candidate:
+            return {k: candidate[k] for k in CANDIDATE_FIELDS
+                    if k not in FINGERPRINT_FIELDS and candidate.get(k) is not None}, None
+    return None, None
+
+@timed()
+def ingest_resume(payload):
+    """
+    Extract and parse an uploaded resume. Runs on an ingestion worker thread.
+    
+    Identical uploads (same file or same normalized text) and near-duplicates
+    of the uploader's own earlier resume reuse the earlier parse instead of
+    calling Gemini again. Near-duplicates of other people's resumes are
+    parsed again and only flagged.
+    The text is extracted in a separate process with a timeout, so a
+    pathological PDF can't hold the worker thread.
+    
+    Args:
+        payload (dict): Form fields plus 'resume_path' (the upload, spooled to a
+            temp file that is removed here) and 'resume_filename'
+        
+    Returns:
+        dict: The preview profile
+    """
+    try:
+        return _ingest_resume_file(payload)
+    finally:
+        os.remove(payload['resume_path'])
+
+def _ingest_resume_file(payload):
+    resume_path = payload['resume_path']
+    resume_sha256 = file_sha256(resume_path)
+    resume_data, raw_response, duplicate, resume_text, fingerprint = None, None, None, None, None
+    
+    # Same file as before: skip extraction and parsing entirely
+    match = fingerprint_index.find_exact_bytes(resume_sha256)
+    if match and len(match['fingerprint']) == len(FINGERPRINT_FIELDS):
+        resume_data, raw_response = _previous_parse(match)
+        resume_text, fingerprint = match.get('text'), match['fingerprint']
+    
+    if not resume_data:
+        # Extract text from PDF
+        resume_text = extract_text_from_pdf_path(resume_path)
+        if not resume_text:
+            raise ValueError('Error extracting text from PDF')
+        
+        match = fingerprint_index.find_exact_text(hashlib.sha256(
+            normalize_resume_text(resume_text).encode('utf-8')).hexdigest())
+        if match:
+            resume_data, raw_response = _previous_parse(match)
+    
+        fingerprint = compute_fingerprint(None, resume_text, resume_sha256=resume_sha256)
+    
+    if not resume_data:
+        match = fingerprint_index.find_near_duplicate(fingerprint['resume_minhash'])
+        # Only the uploader's own earlier resume is reused. A near-duplicate of someone
+        # else's (e.g. the same template) is parsed again and only flagged
+        if match and match['key'] == payload['email'] and not FINGERPRINT_REPARSE_NEAR_DUPLICATES:
+            resume_data, raw_response = _previous_parse(match)
+    
+    if match and (resume_data or match['match'] == 'near'):
+        own = match['key'] == payload['email']
+        duplicate = {
+            'match': match['match'],
+            'similarity': round(match['similarity'], 3),
+            'reused': bool(resume_data),
+            # Never show another person's resume text
+            'diff': diff_resumes(match['text'], resume_text) if own and match['match'] == 'near' and match.get('text') else None
+        }
+    
+    if not resume_data:
+        # Parse resume using Gemini
+        resume_data, raw_response = parse_resume_with_gemini(resume_text)
+        if not resume_data:
+            raise ValueError('Error parsing resume')
+    
+    fingerprint_index.add(payload['email'], fingerprint, parsed_data=resume_data,
+                          raw_response=raw_response, text=resume_text)
+    
+    return {
+        'full_name': payload['full_name'],
+        'email': payload['email'],
+        'github': payload['github'],
+        'linkedin': payload['linkedin'],
+        'resume_filename': payload['resume_filename'],
+        'raw_gemini_response': raw_response,
+        'parsed_data': resume_data,
+        'fingerprint': fingerprint,
+        'duplicate': duplicate
+    }
+
+# Resume ingestion queue, sized through the environment. Jobs run in the worker
+# process that accepted the upload; their status is in SQLite, readable from all.
+ingest_queue = JobQueue(
+    ingest_resume,
+    workers=int(os.getenv('INGEST_WORKERS', '4')),
+    max_depth=int(os.getenv('INGEST_QUEUE_DEPTH', '100')),
+    result_ttl=float(os.getenv('INGEST_JOB_TTL', '3600')),
+    name='ingest',
+    path=os.getenv('INGEST_JOB_STORE_PATH')
+)
+register_collector('hireai_ingest_queue', 'Resume ingestion queue depth, throughput and latency', ingest_queue.stats)
 
 @candidate_bp.route('/', methods=['GET', 'POST'])
 # @login_required  # Temporarily disabled
@@ -40,56 +178,101 @@ def index():
             flash('Only PDF files are allowed', 'error')
             return redirect(url_for('candidate.index'))
         
-        # Extract text from PDF
-        resume_text = extract_text_from_pdf(resume_file)
-        if not resume_text:
-            flash('Error extracting text from PDF', 'error')
-            return redirect(url_for('candidate.index'))
-        
-        # Parse resume using Gemini
-        resume_data, raw_response = parse_resume_with_gemini(resume_text)
-        if not resume_data:
-            flash('Error parsing resume', 'error')
+        # Queue extraction and parsing so the request returns immediately. The
+        # upload is closed with the request, so it is spooled to a file the job owns
+        upload_fd, resume_path = tempfile.mkstemp(prefix='resume-', suffix='.pdf', dir=INGEST_UPLOAD_DIR)
+        with os.fdopen(upload_fd, 'wb') as upload:
+            resume_file.save(upload)
+        try:
+            job_id = ingest_queue.submit({
+                'full_name': full_name,
+                'email': email,
+                'github': github,
+                'linkedin': linkedin,
+                'resume_filename': secure_filename(resume_file.filename),
+                'resume_path': resume_path
+            })
+        except QueueFullError:
+            os.remove(resume_path)
+            flash('We are processing a lot of resumes right now, please try again in a minute', 'error')
             return redirect(url_for('candidate.index'))
         
-        # Store profile data temporarily
-        profile = {
-            'full_name': full_name,
-            'email': email,
-            'github': github,
-            'linkedin': linkedin,
-            'resume_filename': secure_filename(resume_file.filename),
-            'raw_gemini_response': raw_response,
-            'parsed_data': resume_data
-        }
-        candidate_profiles['default'] = profile
-        
-        # Show preview page
-        return render_template('candidate/preview.html', 
-                             profile=profile,
-                             resume_data=resume_data)
+        # Show the processing page, which polls until the preview is ready
+        return render_template('candidate/processing.html', job_id=job_id)
     
     # GET request - show the form
     return render_template('candidate/dashboard.html')
 
+@candidate_bp.route('/jobs')
+def jobs():
+    """Ingestion queue depth, concurrency and latency of this worker process"""
+    return jsonify(ingest_queue.stats())
+
+@candidate_bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Ingestion job status. Returns right away; clients poll with a backoff until the job finishes.
+    """
+    job = ingest_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({
+        'id': job['id'],
+        'status': job['status'],
+        'error': job['error'],
+        'submitted_at': job['submitted_at'],
+        'finished_at': job['finished_at'],
+        'preview_url': url_for('candidate.job_preview', job_id=job_id)
+    })
+
+@candidate_bp.route('/jobs/<job_id>/preview')
+def job_preview(job_id):
+    """Show the preview page once an ingestion job has finished"""
+    job = ingest_queue.get(job_id)
+    if not job:
+        flash('Resume upload not found, please upload it again', 'error')
+        return redirect(url_for('candidate.index'))
+    if job['status'] == 'failed':
+        flash(job['error'] or 'Error processing resume', 'error')
+        return redirect(url_for('candidate.index'))
+    if job['status'] != 'done':
+        return render_template('candidate/processing.html', job_id=job_id)
+    
+    # Keep the preview for this session until it is saved or expires
+    profile = job['result']
+    preview_store.set(_preview_key(), profile)
+    
+    # Show preview page
+    return render_template('candidate/preview.html', 
+                         profile=profile,
+                         resume_data=profile['parsed_data'])
+
 @candidate_bp.route('/save_profile', methods=['POST'])
 # @login_required  # Temporarily disabled
 def save_profile():
     """Save the previewed profile to the database"""
     try:
-        # Get form data
+        profile = preview_store.get(_preview_key())
+        if not profile:
+            flash('Your resume preview has expired, please upload it again', 'error')
+            return redirect(url_for('candidate.index'))
+        
+        resume_data = profile['parsed_data']
         candidate_data = {
-            'name': request.form.get('full_name'),
-            'email': request.form.get('email'),
-            'phone': request.form.get('phone'),  # Add phone number
-            'github': request.form.get('github'),
-            'linkedin': request.form.get('linkedin'),
-            'skills': json.loads(request.form.get('skills', '[]')),
-            'experience_years': int(request.form.get('experience_years', 0)),
-            'education': request.form.get('education'),
-            'current_location': request.form.get('current_location')
+            'name': profile['full_name'],
+            'email': profile['email'],
+            'phone': resume_data.get('phone'),
+            'github': profile['github'],
+            'linkedin': profile['linkedin'],
+            'skills': resume_data.get('skills', []),
+            'experience_years': int(resume_data.get('experience_years') or 0),
+            'education': resume_data.get('education'),
+            'current_location': resume_data.get('current_location')
         }
         
+        # Resume fingerprints, stored so later uploads can be matched against this one
+        candidate_data.update({k: (profile.get('fingerprint') or {}).get(k) for k in FINGERPRINT_FIELDS})
+        
         # Remove None values
         candidate_data = {k: v for k, v in candidate_data.items() if v is not None}
         
@@ -99,6 +282,10 @@ def save_profile():
             flash('Error saving candidate data', 'error')
             return redirect(url_for('candidate.index'))
         
+        # Remember the saved candidate for the /profile fallback
+        profile['candidate_id'] = candidate_id
+        preview_store.set(_preview_key(), profile)
+        
         # Show appropriate message based on whether it was an update or new entry
         if is_update:
             flash('Profile updated successfully!', 'success')
@@ -120,27 +307,26 @@ def save_profile():
 def profile(candidate_id=None):
     """Display candidate profile"""
     try:
-        # If no candidate_id provided, try to get the most recent one
-        if not candidate_id and 'default' in candidate_profiles:
-            # Get the email from the most recent profile
-            email = candidate_profiles['default']['email']
-            # Fetch the candidate from Supabase
-            candidate = get_candidate_by_email(email)
-            if candidate:
-                candidate_id = candidate['id']
+        # If no candidate_id provided, use this session's most recent profile
+        preview = preview_store.get(_preview_key()) if not candidate_id else None
+        if preview:
+            candidate_id = preview.get('candidate_id')
+            if not candidate_id:
+                # Fetch the candidate from Supabase by the previewed email
+                candidate = get_candidate_by_email(preview['email'])
+                if candidate:
+                    candidate_id = candidate['id']
         
         if not candidate_id:
             flash('No candidate profile found', 'error')
             return redirect(url_for('candidate.index'))
             
-        # Fetch candidate data from Supabase
-        response = supabase.table('candidates').select('*').eq('id', candidate_id).execute()
+        # Fetch candidate data from the candidate store
+        candidate = get_candidate_by_id(candidate_id)
         
-        if not response.data or len(response.data) == 0:
+        if not candidate:
             flash('Candidate profile not found', 'error')
             return redirect(url_for('candidate.index'))
-            
-        candidate = response.data[0]
         
         return render_template('candidate/profile.html', candidate=candidate)
         
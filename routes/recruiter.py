@@ -1,16 +1,85 @@
-from flask import Blueprint, render_template, request, jsonify, flash
+from flask import Blueprint, Response, render_template, request, jsonify, flash, stream_with_context
 from flask_login import login_required
-from models.candidate import Candidate
-from utils.gemini import parse_resume_with_gemini
-from utils.supabase_client import supabase
-from utils.ranker import rank_candidates
-from utils.background_quality import score_github_background_api, score_linkedin_background, score_public_presence
+from utils.gemini import generate_json_with_gemini
+from utils.cache import PersistentCache
+from utils.query_parser import normalize_query, parse_query_locally
+from utils.candidate_repository import get_repository
+from utils.ranker import candidate_vector_index, rank_candidates
+from utils.metrics import register_collector, span, timed
+from utils.candidate_index import candidate_index
+from utils.background_quality import BACKGROUND_SCORE_DEADLINE
+from utils.score_refresher import iter_search_scores, score_search_results
 import json
-import os # Import os to get GITHUB_TOKEN
+import math
+import time
+import uuid
+import os
 
 recruiter_bp = Blueprint('recruiter', __name__, url_prefix='/recruiter')
 
+# Minimum local parser confidence needed to skip the Gemini call
+QUERY_PARSER_MIN_CONFIDENCE = float(os.getenv('QUERY_PARSER_MIN_CONFIDENCE', '0.8'))
+
+# Interpreted filters keyed by normalized query (case, whitespace and word order folded)
+_query_cache = PersistentCache(
+    'search_queries',
+    path=os.getenv('QUERY_CACHE_PATH'),
+    ttl=float(os.getenv('QUERY_CACHE_TTL', '86400')),
+    max_entries=int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '10000'))
+)
+# Search result paging
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '20'))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv('SEARCH_MAX_PAGE_SIZE', '50'))
+# Upper bound on the max_latency an API client may ask for, in seconds
+SEARCH_API_MAX_LATENCY = float(os.getenv('SEARCH_API_MAX_LATENCY', '10.0'))
+
+# Columns rendered by the results template, every field the ranker reads (skills,
+# current_location, education, background_score), and the fields needed to score
+# candidates that don't have a background score yet
+SEARCH_COLUMNS = ('id,name,skills,current_location,education,experience_years,github,linkedin,'
+                  'background_score,background_scored_at')
+
+_query_stats = {'total': 0, 'cache_hits': 0, 'local_parses': 0, 'llm_calls': 0}
+
+def query_interpretation_stats() -> dict:
+    """
+    Return counters for how search queries were interpreted.
+    `skipped_llm_ratio` is the fraction of queries answered without calling Gemini.
+    """
+    stats = dict(_query_stats)
+    skipped = stats['cache_hits'] + stats['local_parses']
+    stats['skipped_llm_ratio'] = skipped / stats['total'] if stats['total'] else 0.0
+    return stats
+
+register_collector('hireai_search_queries', 'How search queries were interpreted', query_interpretation_stats)
+
+@timed()
 def interpret_search_query(query: str) -> dict:
+    """
+    Interpret the recruiter's search query into structured filters.
+    Checks the normalized-query cache first, then the local rule-based parser,
+    and only calls Gemini when the local parser's confidence is low.
+    """
+    _query_stats['total'] += 1
+    cache_key = normalize_query(query)
+    cached = _query_cache.get(cache_key)
+    if cached is not None:
+        _query_stats['cache_hits'] += 1
+        return cached
+
+    local_filters, confidence = parse_query_locally(query)
+    if confidence >= QUERY_PARSER_MIN_CONFIDENCE:
+        _query_stats['local_parses'] += 1
+        _query_cache.set(cache_key, local_filters)
+        return local_filters
+
+    _query_stats['llm_calls'] += 1
+    structured_query = _interpret_search_query_with_gemini(query)
+    if structured_query:
+        _query_cache.set(cache_key, structured_query)
+    return structured_query
+
+def _interpret_search_query_with_gemini(query: str) -> dict:
     """
     Use Gemini to interpret the recruiter's search query into structured filters.
     """
@@ -29,57 +98,105 @@ Query: {query}
 Return ONLY the JSON object, no explanation or additional text. If a field is not mentioned, set it to null, empty string, or empty array as appropriate. Always include all fields."""
 
     try:
-        parsed_data, raw_response = parse_resume_with_gemini(prompt)
+        parsed_data, raw_response = generate_json_with_gemini(prompt)
         if parsed_data:
             return parsed_data
         return None
     except Exception as e:
         return None
 
-def calculate_background_score(candidate_data: dict) -> int:
+class InvalidCursorError(ValueError):
+    """Raised for a search cursor that is malformed or can no longer be served."""
+
+def _parse_cursor(cursor: str):
     """
-    Calculate a combined background score for a candidate.
-    This is a simple combination of individual scores for now.
+    Split a search cursor into (kind, score, id): kind 'r' (rank score, warm
+    index) or 'b' (background score, candidate store; score None for unscored).
+    Scores must be numbers and ids UUIDs or integers, since they end up in
+    store filters.
+    Raises:
+        InvalidCursorError: If the cursor is malformed
     """
-    github_url = candidate_data.get('github')
-    linkedin_url = candidate_data.get('linkedin')
-    name = candidate_data.get('name')
-    candidate_id = candidate_data.get('id', 'Unknown ID') # Get candidate ID for logging
-    
-    github_score = 0
-    linkedin_score = 0
-    public_presence_score = 0
+    kind, _, rest = cursor.partition(':')
+    score, _, candidate_id = rest.partition(':')
+    try:
+        if kind not in ('r', 'b'):
+            raise ValueError(kind)
+        if kind == 'b' and score == '':
+            score = None
+        else:
+            score = float(score)
+            if not math.isfinite(score):
+                raise ValueError(score)
+            if kind == 'b':
+                # Background scores are integers
+                if not score.is_integer():
+                    raise ValueError(score)
+                score = int(score)
+        candidate_id = str(int(candidate_id)) if candidate_id.isdigit() else str(uuid.UUID(candidate_id))
+    except ValueError:
+        raise InvalidCursorError('Invalid search cursor')
+    return kind, score, candidate_id
 
-    # Calculate GitHub score
-    if github_url:
-        try:
-            github_token = os.getenv("GITHUB_TOKEN")
-            github_score = score_github_background_api(github_url, github_token)
-        except Exception as e:
-            print(f"Error calculating GitHub score for candidate {candidate_id} ({github_url}): {e}")
+def find_matching_candidates(structured_query: dict, cursor: str = None, page_size: int = SEARCH_PAGE_SIZE,
+                             search_query: str = '') -> tuple:
+    """
+    Fetch one page of candidates matching the structured filters.
+    When the in-memory index is warm and recently synced the filters are
+    answered locally, every match is ranked by rank score (query similarity
+    blended with background score) and only the page's rows are fetched from the candidate store, so
+    page 1 holds the best matches. Pages are keyed on (rank score, id).
+    Otherwise the store runs the filters and orders matches by background
+    score, highest first, keyed on (background score, id). Both are keyset
+    pagination, so each page costs the same no matter how deep it is.
+    Only SEARCH_COLUMNS are fetched.
+    Returns:
+        tuple: (candidates, next_cursor) where next_cursor is None on the last page
+    Raises:
+        InvalidCursorError: If the cursor is malformed, or is a rank cursor and the
+            index is no longer fresh (the store can't continue that order)
+    """
+    page_size = max(1, min(page_size, SEARCH_MAX_PAGE_SIZE))
+    repository = get_repository()
 
-    # Calculate LinkedIn score
-    if linkedin_url:
-        try:
-            linkedin_score = score_linkedin_background(linkedin_url)
-        except Exception as e:
-            print(f"Error calculating LinkedIn score for candidate {candidate_id} ({linkedin_url}): {e}")
-
-    # Calculate Public Presence score
-    if name:
-         try:
-            public_presence_score = score_public_presence(name, github_url, linkedin_url)
-         except Exception as e:
-             print(f"Error calculating Public Presence score for candidate {candidate_id} ({name}): {e}")
-
-    # Simple weighted combination (adjust weights as needed)
-    # Max possible combined score with current mock logic: ~100 (GH API) + 80 (LI placeholder) + 80 (PP placeholder) = ~260
-    # We'll scale it to 100, but actual scores will likely be lower.
-    
-    combined_score = (github_score * 0.4) + (linkedin_score * 0.3) + (public_presence_score * 0.3)
-    
-    # Ensure score is between 0 and 100
-    return min(max(int(combined_score), 0), 100)
+    kind, score, candidate_id = _parse_cursor(cursor) if cursor else (None, None, None)
+    if kind == 'r' and not candidate_index.fresh:
+        raise InvalidCursorError('Search results changed, please run the search again')
+    if kind == 'r' or (not cursor and candidate_index.fresh):
+        after = (score, candidate_id) if kind == 'r' else None
+        matching_ids = candidate_index.search(
+            skills=structured_query.get('skills'),
+            min_experience_years=structured_query.get('min_experience_years'),
+            location=structured_query.get('location')
+        )
+        # One extra result tells whether there is a next page
+        ranked = candidate_vector_index.top_k(search_query, page_size + 1, candidate_ids=matching_ids, after=after)
+        page = ranked[:page_size]
+        if not page:
+            return [], None
+        next_cursor = f'r:{page[-1][1]!r}:{page[-1][0]}' if len(ranked) > page_size else None
+        with span('candidate_store_query'):
+            rows = {str(row['id']): row for row in
+                    repository.get_many([str(i) for i, _ in page], columns=SEARCH_COLUMNS)}
+        return [rows[str(i)] for i, _ in page if str(i) in rows], next_cursor
+
+    # Fetch one extra row to know whether there is a next page
+    with span('candidate_store_query'):
+        rows = repository.search_by_background_score(
+            skills=structured_query.get('skills'),
+            min_experience_years=structured_query.get('min_experience_years'),
+            location=structured_query.get('location'),
+            after=(score, candidate_id) if kind == 'b' else None,
+            limit=page_size + 1,
+            columns=SEARCH_COLUMNS
+        )
+    candidates = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = candidates[-1]
+        score = last.get('background_score')
+        next_cursor = f"b:{'' if score is None else score}:{last['id']}"
+    return candidates, next_cursor
 
 @recruiter_bp.route('/', methods=['GET', 'POST'])
 # @login_required  # Temporarily disabled for testing
@@ -97,6 +214,8 @@ def index():
     if request.method == 'POST':
         # Get the search query from the form
         search_query = request.form.get('search_query', '').strip()
+        cursor = request.form.get('cursor') or None
+        page_size = max(1, min(request.form.get('page_size', SEARCH_PAGE_SIZE, type=int), SEARCH_MAX_PAGE_SIZE))
         
         if not search_query:
             flash('Please enter a search query', 'error')
@@ -120,39 +239,29 @@ def index():
         
         # Step 2: Query Supabase for matching candidates
         try:
-            # Build the query based on structured filters
-            query = supabase.table('candidates').select('*')
-            
-            # Add filters if they exist in structured_query
-            if structured_query.get('skills'):
-                skills_json = json.dumps(structured_query['skills'])
-                query = query.filter('skills', 'cs', skills_json)
-            
-            if structured_query.get('min_experience_years'):
-                query = query.gte('experience_years', structured_query['min_experience_years'])
-            
-            if structured_query.get('location'):
-                query = query.ilike('current_location', f"%{structured_query['location']}%")
-            
-            # Execute the query
-            response = query.execute()
-            candidates = response.data
+            candidates, next_cursor = find_matching_candidates(structured_query, cursor=cursor, page_size=page_size,
+                                                               search_query=search_query)
             
-            # Calculate background scores and add to candidates
-            for candidate in candidates:
-                candidate['background_score'] = calculate_background_score(candidate)
+            # Use the stored background scores; candidates never scored are looked up
+            # concurrently and come back with a partial score marked as pending if they
+            # miss the search deadline
+            score_search_results(candidates, github_token=os.getenv("GITHUB_TOKEN"))
             
-            # Step 3: Rank the candidates (can use background score here later)
-            # For now, rank_candidates uses a dummy score, but we can update it.
-            # ranked_candidates = rank_candidates(search_query, candidates)
-            ranked_candidates = sorted(candidates, key=lambda x: x.get('background_score', 0), reverse=True)
+            # Step 3: Rank the candidates by query similarity blended with background score
+            ranked_candidates = rank_candidates(search_query, candidates)
             
             return render_template('recruiter/dashboard.html',
                                  search_query=search_query,
                                  candidates=ranked_candidates,
                                  structured_query=structured_query,
-                                 filters=filters)
+                                 filters=filters,
+                                 cursor=cursor,
+                                 next_cursor=next_cursor,
+                                 page_size=page_size)
             
+        except InvalidCursorError as e:
+            flash(str(e), 'error')
+            return render_template('recruiter/dashboard.html', search_query=search_query), 400
         except Exception as e:
             print(f"Error searching for candidates: {e}") # Keep error logging for backend issues
             flash('Error searching for candidates', 'error')
@@ -184,10 +293,91 @@ def outreach(candidate_id):
         pass
     return render_template('recruiter/outreach.html')
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, default=str) + '\n'
+
+def _stream_search(search_query: str, cursor: str, limit: int, max_latency: float):
+    """
+    Generate the NDJSON events of one API search. Each event is flushed as soon as it is known:
+    filters, then the matched page of candidates, then one score event per candidate
+    as its background lookups finish, then done.
+    """
+    started = time.perf_counter()
+    expires_at = time.monotonic() + max_latency
+    try:
+        structured_query = interpret_search_query(search_query)
+        if not structured_query:
+            yield _ndjson({'type': 'error', 'error': 'Error interpreting search query'})
+            return
+        yield _ndjson({'type': 'filters', 'query': search_query, 'filters': structured_query})
+
+        candidates, next_cursor = find_matching_candidates(structured_query, cursor=cursor, page_size=limit,
+                                                           search_query=search_query)
+        # Order by query similarity alone until background scores arrive
+        candidates = rank_candidates(search_query, candidates)
+        yield _ndjson({'type': 'candidates', 'candidates': candidates, 'next_cursor': next_cursor})
+
+        pending_count = 0
+        deadline = max(expires_at - time.monotonic(), 0)
+        for candidate, score, pending in iter_search_scores(candidates, os.getenv('GITHUB_TOKEN'), deadline):
+            candidate['background_score'] = score
+            candidate['background_score_pending'] = pending
+            pending_count += pending
+            yield _ndjson({'type': 'score', 'id': candidate.get('id'), 'background_score': score, 'pending': pending})
+
+        ranked = rank_candidates(search_query, candidates)
+        yield _ndjson({
+            'type': 'done',
+            'ranking': [{'id': c.get('id'), 'rank_score': c['rank_score']} for c in ranked],
+            'pending': pending_count,
+            'next_cursor': next_cursor,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        })
+    except InvalidCursorError as e:
+        yield _ndjson({'type': 'error', 'error': str(e)})
+    except Exception as e:
+        print(f"Error streaming search results: {e}")
+        yield _ndjson({'type': 'error', 'error': 'Error searching for candidates'})
+
 @recruiter_bp.route('/api/search', methods=['POST'])
 @login_required
 def api_search():
-    """API endpoint for candidate search"""
-    data = request.get_json()
-    # TODO: Implement search API
-    return jsonify({'results': []}) 
\ No newline at end of file
+    """
+    Candidate search API, streamed as newline-delimited JSON.
+
+    Request body (JSON): {"query": str, "limit": int, "cursor": str, "max_latency": seconds}
+    Events, one JSON object per line:
+        {"type": "filters", "query": ..., "filters": {...}}
+        {"type": "candidates", "candidates": [...], "next_cursor": ...}
+        {"type": "score", "id": ..., "background_score": ..., "pending": false}  (one per candidate, as ready)
+        {"type": "done", "ranking": [{"id": ..., "rank_score": ...}], "pending": n, "next_cursor": ..., "elapsed_ms": ...}
+    or {"type": "error", "error": ...} if the search fails midway.
+    A malformed cursor, or a rank cursor the store can't continue, is a 400.
+    Background lookups still running after max_latency are reported with "pending": true.
+    """
+    data = request.get_json(silent=True) or {}
+    search_query = str(data.get('query') or '').strip()
+    if not search_query:
+        return jsonify({'error': 'query is required'}), 400
+    try:
+        limit = int(data.get('limit') or SEARCH_PAGE_SIZE)
+        max_latency = float(data['max_latency']) if data.get('max_latency') is not None else BACKGROUND_SCORE_DEADLINE
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit and max_latency must be numbers'}), 400
+    cursor = str(data['cursor']) if data.get('cursor') else None
+    if cursor:
+        # Checked again when the page is fetched, in case the index goes stale meanwhile
+        try:
+            kind, _, _ = _parse_cursor(cursor)
+        except InvalidCursorError as e:
+            return jsonify({'error': str(e)}), 400
+        if kind == 'r' and not candidate_index.fresh:
+            return jsonify({'error': 'Search results changed, please run the search again'}), 400
+    max_latency = min(max(max_latency, 0.0), SEARCH_API_MAX_LATENCY)
+
+    return Response(
+        stream_with_context(_stream_search(search_query, cursor, limit, max_latency)),
+        mimetype='application/x-ndjson',
+        # Stop proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    ) 
\ No newline at end of file
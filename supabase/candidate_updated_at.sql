@@ -0,0 +1,24 @@
+-- Time of the last write to each candidate. Every web worker keeps its own in-memory
+-- search indexes and re-reads the rows changed since its last sync
+-- (utils.supabase_client.sync_candidate_indexes), so writes from other workers,
+-- bulk imports and the score refresher reach every worker's index.
+
+alter table candidates
+    add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists candidates_updated_at_idx on candidates (updated_at, id);
+
+create or replace function set_candidate_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists candidates_set_updated_at on candidates;
+create trigger candidates_set_updated_at
+    before update on candidates
+    for each row execute function set_candidate_updated_at();
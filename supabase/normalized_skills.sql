@@ -0,0 +1,20 @@
+-- Skills in the form the app compares them (utils.candidate_index.normalize_skills):
+-- stripped, lowercased, deduplicated and sorted. The skills search filter runs
+-- jsonb containment on skills_normalized, so "python" matches a candidate who
+-- listed "Python ", as it does in the in-memory candidate index.
+
+create or replace function normalize_skills(skills jsonb)
+returns jsonb
+language sql
+immutable
+as $$
+    select coalesce(jsonb_agg(distinct lower(btrim(skill)) order by lower(btrim(skill))), '[]'::jsonb)
+    from jsonb_array_elements_text(coalesce(skills, '[]'::jsonb)) as skill
+    where btrim(skill) <> ''
+$$;
+
+alter table candidates
+    add column if not exists skills_normalized jsonb
+    generated always as (normalize_skills(skills)) stored;
+
+create index if not exists candidates_skills_normalized_idx on candidates using gin (skills_normalized jsonb_path_ops);
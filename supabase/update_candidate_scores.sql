@@ -0,0 +1,27 @@
+-- Store background scores on existing candidates by id in a single statement, for the
+-- score refresher's write-back. Ids that no longer exist are skipped, never inserted.
+-- Fields missing from an update keep their current value. Returns the updated rows.
+--
+-- Requires the column recording the refresher's last attempt at a candidate, which
+-- orders the candidates due for scoring:
+--
+--     alter table candidates add column if not exists background_score_attempted_at timestamptz;
+--     create index if not exists candidates_background_score_attempted_at_idx
+--         on candidates (background_score_attempted_at nulls first, id);
+
+create or replace function update_candidate_scores(updates jsonb)
+returns setof candidates
+language sql
+as $$
+    update candidates as c set
+        background_score = coalesce(round((u->>'background_score')::numeric)::int, c.background_score),
+        github_score = coalesce(round((u->>'github_score')::numeric)::int, c.github_score),
+        linkedin_score = coalesce(round((u->>'linkedin_score')::numeric)::int, c.linkedin_score),
+        public_presence_score = coalesce(round((u->>'public_presence_score')::numeric)::int, c.public_presence_score),
+        background_scored_at = coalesce((u->>'background_scored_at')::timestamptz, c.background_scored_at),
+        background_score_attempted_at = coalesce((u->>'background_score_attempted_at')::timestamptz,
+                                                 c.background_score_attempted_at)
+    from jsonb_array_elements(updates) as u
+    where c.id = (u->>'id')::uuid
+    returning c.*;
+$$;
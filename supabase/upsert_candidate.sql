@@ -0,0 +1,67 @@
+-- Insert or update a candidate keyed on email in a single statement.
+-- Fields missing from the payload keep their current value on update.
+-- Returns the saved row and whether it was newly inserted.
+-- Numbers stored in integer columns are rounded, since the resume parser and
+-- the query path produce fractional years of experience such as 5.5.
+--
+-- Requires a unique constraint on candidates.email, the resume fingerprint columns
+-- and the stored background score columns:
+--
+--     alter table candidates
+--         add column if not exists resume_sha256 text,
+--         add column if not exists resume_text_sha256 text,
+--         add column if not exists resume_minhash jsonb,
+--         add column if not exists background_score int,
+--         add column if not exists github_score int,
+--         add column if not exists linkedin_score int,
+--         add column if not exists public_presence_score int,
+--         add column if not exists background_scored_at timestamptz;
+--     create index if not exists candidates_resume_sha256_idx on candidates (resume_sha256);
+--     create index if not exists candidates_background_scored_at_idx on candidates (background_scored_at);
+
+create or replace function upsert_candidate(candidate jsonb)
+returns table (row_data jsonb, inserted boolean)
+language sql
+as $$
+    insert into candidates as c
+        (name, email, phone, skills, experience_years, education, current_location, linkedin, github,
+         resume_sha256, resume_text_sha256, resume_minhash,
+         background_score, github_score, linkedin_score, public_presence_score, background_scored_at)
+    values (
+        candidate->>'name',
+        candidate->>'email',
+        candidate->>'phone',
+        coalesce(candidate->'skills', '[]'::jsonb),
+        round((candidate->>'experience_years')::numeric)::int,
+        candidate->>'education',
+        candidate->>'current_location',
+        candidate->>'linkedin',
+        candidate->>'github',
+        candidate->>'resume_sha256',
+        candidate->>'resume_text_sha256',
+        candidate->'resume_minhash',
+        round((candidate->>'background_score')::numeric)::int,
+        round((candidate->>'github_score')::numeric)::int,
+        round((candidate->>'linkedin_score')::numeric)::int,
+        round((candidate->>'public_presence_score')::numeric)::int,
+        (candidate->>'background_scored_at')::timestamptz
+    )
+    on conflict (email) do update set
+        name = coalesce(excluded.name, c.name),
+        phone = coalesce(excluded.phone, c.phone),
+        skills = case when candidate ? 'skills' then excluded.skills else c.skills end,
+        experience_years = coalesce(excluded.experience_years, c.experience_years),
+        education = coalesce(excluded.education, c.education),
+        current_location = coalesce(excluded.current_location, c.current_location),
+        linkedin = coalesce(excluded.linkedin, c.linkedin),
+        github = coalesce(excluded.github, c.github),
+        resume_sha256 = coalesce(excluded.resume_sha256, c.resume_sha256),
+        resume_text_sha256 = coalesce(excluded.resume_text_sha256, c.resume_text_sha256),
+        resume_minhash = coalesce(excluded.resume_minhash, c.resume_minhash),
+        background_score = coalesce(excluded.background_score, c.background_score),
+        github_score = coalesce(excluded.github_score, c.github_score),
+        linkedin_score = coalesce(excluded.linkedin_score, c.linkedin_score),
+        public_presence_score = coalesce(excluded.public_presence_score, c.public_presence_score),
+        background_scored_at = coalesce(excluded.background_scored_at, c.background_scored_at)
+    returning to_jsonb(c), (xmax = 0);
+$$;
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# Point every on-disk cache and the candidate store at a scratch directory,
+# and keep background threads off, before any app module reads its settings
+_workdir = tempfile.mkdtemp(prefix='hireai-tests-')
+os.environ.setdefault('CACHE_DIR', _workdir)
+os.environ.setdefault('CANDIDATE_STORE', 'sqlite')
+os.environ.setdefault('CANDIDATE_STORE_PATH', os.path.join(_workdir, 'candidates.sqlite3'))
+os.environ.setdefault('CANDIDATE_INDEX_WARMUP', 'false')
+os.environ.setdefault('BACKGROUND_SCORE_REFRESH', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
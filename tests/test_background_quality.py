@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from benchmarks.stubs import GitHubStubHandler, start_stub_server
+from utils import background_quality
+from utils.github_client import GitHubScheduler
+
+
+class SlowGitHubHandler(GitHubStubHandler):
+    latency = 5.0
+
+
+@pytest.fixture
+def slow_github(monkeypatch):
+    server, base_url = start_stub_server(SlowGitHubHandler)
+    monkeypatch.setattr(background_quality, 'GITHUB_API_URL', base_url)
+    monkeypatch.setattr(background_quality.github_graphql_scheduler, 'has_tokens', lambda: False)
+    yield server
+    server.shutdown()
+
+
+def test_slow_lookups_free_the_pool_soon_after_the_deadline(slow_github):
+    executor = ThreadPoolExecutor(max_workers=1)
+    candidates = [{'github': 'https://github.com/slow-user-1'}]
+
+    start = time.monotonic()
+    results = list(background_quality.iter_background_scores(candidates, deadline=0.3, executor=executor))
+    assert time.monotonic() - start < 1
+    assert results[0][2] is True  # pending
+
+    # The running lookup times out with the search instead of holding the thread for the full response
+    assert executor.submit(lambda: 'free').result(timeout=3) == 'free'
+    executor.shutdown()
+
+
+def test_one_search_runs_at_most_max_in_flight_lookups(monkeypatch):
+    monkeypatch.setattr(background_quality.github_graphql_scheduler, 'has_tokens', lambda: False)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def slow_score(github_url, github_token=None, priority=None, expires_at=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return 50
+    monkeypatch.setattr(background_quality, 'score_github_background_api', slow_score)
+
+    executor = ThreadPoolExecutor(max_workers=8)
+    candidates = [{'github': f'https://github.com/user-{i}'} for i in range(8)]
+    results = list(background_quality.iter_background_scores(candidates, deadline=5, executor=executor,
+                                                             max_in_flight=2))
+    executor.shutdown()
+
+    assert peak[0] == 2
+    assert [pending for _, _, pending, _ in results] == [False] * 8
+
+
+def test_lookups_not_started_by_the_deadline_are_never_run(monkeypatch):
+    monkeypatch.setattr(background_quality.github_graphql_scheduler, 'has_tokens', lambda: False)
+    calls = []
+
+    def slow_score(github_url, github_token=None, priority=None, expires_at=None):
+        calls.append(github_url)
+        time.sleep(0.3)
+        return 50
+    monkeypatch.setattr(background_quality, 'score_github_background_api', slow_score)
+
+    executor = ThreadPoolExecutor(max_workers=8)
+    candidates = [{'github': f'https://github.com/user-{i}'} for i in range(8)]
+    results = list(background_quality.iter_background_scores(candidates, deadline=0.1, executor=executor,
+                                                             max_in_flight=2))
+    executor.shutdown()
+
+    assert len(calls) == 2
+    assert all(pending for _, _, pending, _ in results)
+
+
+class PartialGraphQLHandler(GitHubStubHandler):
+    """Leaves users whose login starts with "flaky" out of GraphQL replies, without an error."""
+
+    def _send_json(self, status, payload, headers=None):
+        data = payload.get('data') if isinstance(payload, dict) else None
+        if data:
+            for alias, user in list(data.items()):
+                if user and user['login'].startswith('flaky'):
+                    data[alias] = None
+        super()._send_json(status, payload, headers)
+
+
+@pytest.fixture
+def github_stub(monkeypatch):
+    """A GitHub stand-in with fresh REST and GraphQL schedulers (the GraphQL one has a token) and an empty cache."""
+    server, base_url = start_stub_server(PartialGraphQLHandler)
+    monkeypatch.setattr(background_quality, 'GITHUB_API_URL', base_url)
+    monkeypatch.setattr(background_quality, 'GITHUB_GRAPHQL_URL', f'{base_url}/graphql')
+    monkeypatch.setattr(background_quality, 'github_scheduler', GitHubScheduler())
+    monkeypatch.setattr(background_quality, 'github_graphql_scheduler', GitHubScheduler(['token']))
+    background_quality._github_cache.clear()
+    yield server
+    background_quality._github_cache.clear()
+    server.shutdown()
+
+
+# The stub's profile: 12 repos, 30 followers and an avatar
+STUB_SCORE = 12 * 2 + 20 * 2 + 10
+
+
+def test_batch_scores_over_one_graphql_query(github_stub, monkeypatch):
+    monkeypatch.setattr(background_quality, 'GITHUB_GRAPHQL_BATCH_SIZE', 10)
+    urls = [f'https://github.com/user-{i}' for i in range(5)] + ['https://github.com/missing-user', None]
+
+    scores = background_quality.score_github_backgrounds_api(urls)
+
+    assert scores == [STUB_SCORE] * 5 + [0, 0]
+    assert github_stub.requests == {'graphql': 1}
+
+
+def test_users_graphql_did_not_answer_fall_back_to_rest(github_stub):
+    urls = ['https://github.com/user-a', 'https://github.com/flaky-b', 'https://github.com/flaky-c']
+
+    scores = background_quality.score_github_backgrounds_api(urls)
+
+    assert scores == [STUB_SCORE] * 3
+    assert github_stub.requests == {'graphql': 1, 'rest': 2}
+
+
+def test_everything_goes_over_rest_without_a_graphql_token(github_stub, monkeypatch):
+    monkeypatch.setattr(background_quality, 'github_graphql_scheduler', GitHubScheduler())
+    urls = ['https://github.com/user-a', 'https://github.com/user-b']
+
+    assert background_quality.score_github_backgrounds_api(urls) == [STUB_SCORE] * 2
+    assert github_stub.requests == {'rest': 2}
+
+
+def test_batched_profiles_are_cached(github_stub):
+    urls = ['https://github.com/user-a', 'https://github.com/user-b']
+    background_quality.score_github_backgrounds_api(urls)
+
+    assert background_quality.score_github_backgrounds_api(urls) == [STUB_SCORE] * 2
+    assert github_stub.requests == {'graphql': 1}
+
+
+def test_search_scores_batched_github_lookups_per_candidate(github_stub):
+    candidates = [{'name': 'A', 'github': 'https://github.com/user-a'},
+                  {'name': 'B', 'github': 'https://github.com/missing-b', 'linkedin': 'https://linkedin.com/in/b'},
+                  {'name': 'C'}]
+
+    results = {candidate['name']: (pending, components) for candidate, _, pending, components
+               in background_quality.iter_background_scores(candidates, deadline=5)}
+
+    assert results['A'] == (False, {'github': STUB_SCORE, 'linkedin': 0, 'public_presence': 65})
+    assert results['B'] == (False, {'github': 0, 'linkedin': 80, 'public_presence': 80})
+    assert results['C'] == (False, {'github': 0, 'linkedin': 0, 'public_presence': 50})
+    assert github_stub.requests == {'graphql': 1}
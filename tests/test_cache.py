@@ -0,0 +1,54 @@
+import threading
+from utils import cache
+from utils.cache import PersistentCache
+
+
+def _accessed_at(store: PersistentCache, key: str) -> float:
+    return store._connect().execute(f'SELECT accessed_at FROM "{store.name}" WHERE key = ?', (key,)).fetchone()[0]
+
+
+def test_disk_reads_write_access_times_in_batches(monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_ACCESS_FLUSH_EVERY', 3)
+    store = PersistentCache('batched_access', path=':memory:', memory_entries=0)
+    for key in 'abc':
+        store.set(key, key)
+    written = {key: _accessed_at(store, key) for key in 'abc'}
+    changes = store._connect().total_changes
+
+    assert store.get('a') == 'a'
+    assert store.get('b') == 'b'
+    # Queued, not written
+    assert store._connect().total_changes == changes
+    assert _accessed_at(store, 'a') == written['a']
+
+    assert store.get('c') == 'c'
+    assert all(_accessed_at(store, key) > written[key] for key in 'abc')
+
+
+def test_writes_flush_queued_access_times_before_evicting():
+    store = PersistentCache('flush_on_set', path=':memory:', memory_entries=0)
+    store.set('old', 1)
+    stored = _accessed_at(store, 'old')
+    store.get('old')
+
+    store.set('new', 2)
+
+    assert _accessed_at(store, 'old') > stored
+
+
+def test_counters_are_exact_under_concurrent_reads():
+    store = PersistentCache('concurrent_stats', path=':memory:')
+    store.set('key', 'value')
+
+    def read():
+        for _ in range(500):
+            store.get('key')
+            store.get('missing')
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = store.stats()
+    assert (stats['hits'], stats['misses']) == (4000, 4000)
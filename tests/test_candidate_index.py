@@ -0,0 +1,101 @@
+import json
+import random
+import pytest
+from urllib.parse import parse_qs
+from utils.candidate_index import CandidateIndex, normalize_skills
+from utils.candidate_repository import SQLiteCandidateRepository
+
+SKILLS = ['Python', 'python ', 'SQL', 'sql', 'React', ' Go', 'go', 'Rust', '']
+LOCATIONS = ['Berlin, Germany', 'berlin', 'London, UK', 'Remote', None]
+FILTERS = [
+    {},
+    {'skills': ['python']},
+    {'skills': ['PYTHON', ' Sql ']},
+    {'skills': ['go', 'rust']},
+    {'skills': ['cobol']},
+    {'min_experience_years': 5},
+    {'location': 'Berlin'},
+    {'skills': ['Python'], 'min_experience_years': 3, 'location': 'london'},
+]
+
+
+def _candidates(rng, count, offset=0):
+    return [{
+        'email': f'candidate-{offset + i}@example.com',
+        'skills': rng.sample(SKILLS, rng.randrange(0, 4)),
+        'experience_years': rng.choice([None, 0, 1, 3, 5, 8, 12]),
+        'current_location': rng.choice(LOCATIONS),
+    } for i in range(count)]
+
+
+@pytest.fixture
+def stores(tmp_path):
+    rng = random.Random(3)
+    repository = SQLiteCandidateRepository(str(tmp_path / 'candidates.sqlite3'))
+    rows = repository.upsert_many(_candidates(rng, 300))
+    index = CandidateIndex()
+    # Bulk load in pages like the warm-up, then keep it current with single upserts
+    index.add_many(rows[:150])
+    index.add_many(rows[150:])
+    index.load()
+    for row in repository.upsert_many(_candidates(rng, 20, offset=290)):
+        index.upsert(row)
+    return repository, index
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_index_matches_the_store_filter(stores, filters):
+    repository, index = stores
+    expected = {row['id'] for row in repository.search(limit=10000, columns='id', **filters)}
+    assert set(index.search(**filters)) == expected
+
+
+def test_remove_after_bulk_load(stores):
+    repository, index = stores
+    row = repository.search(min_experience_years=12, limit=1, columns='id')[0]
+    index.remove(row['id'])
+    assert row['id'] not in index.search(min_experience_years=12)
+
+
+def test_supabase_filter_uses_normalized_skills(monkeypatch):
+    postgrest = pytest.importorskip('postgrest')
+    from utils import supabase_client
+    monkeypatch.setattr(supabase_client, 'get_supabase',
+                        lambda: postgrest.SyncPostgrestClient('http://localhost:1/rest/v1'))
+    query = supabase_client.SupabaseCandidateRepository._filtered('id', [' Python', 'SQL', 'python'], None, None)
+    params = parse_qs(str(query.params))
+    assert json.loads(params['skills_normalized'][0][len('cs.'):]) == normalize_skills(['python', 'sql'])
+    assert 'skills' not in params
+
+
+def test_sync_picks_up_rows_written_by_another_process(tmp_path, monkeypatch):
+    from utils import candidate_index as candidate_index_module, supabase_client
+    from utils.candidate_repository import set_repository
+    from utils.fingerprint import FingerprintIndex
+    from utils.ranker import CandidateVectorIndex
+    path = str(tmp_path / 'candidates.sqlite3')
+    index = CandidateIndex()
+    monkeypatch.setattr(supabase_client, 'candidate_index', index)
+    monkeypatch.setattr(supabase_client, 'candidate_vector_index', CandidateVectorIndex())
+    monkeypatch.setattr(supabase_client, 'fingerprint_index', FingerprintIndex())
+    set_repository(SQLiteCandidateRepository(path))
+    try:
+        other = SQLiteCandidateRepository(path)
+        first = other.upsert({'email': 'a@example.com', 'skills': ['Python'], 'experience_years': 2})[0]
+        since = supabase_client._sync_start()
+        supabase_client.warm_candidate_indexes()
+        assert index.search(skills=['python']) == [first['id']]
+
+        # Another worker saves a new candidate and updates the first one
+        second = other.upsert({'email': 'b@example.com', 'skills': ['Python'], 'experience_years': 4})[0]
+        other.upsert({'email': 'a@example.com', 'skills': ['Go']})
+        assert supabase_client.sync_candidate_indexes(since, page_size=1) == 2
+        assert index.search(skills=['python']) == [second['id']]
+        assert index.search(skills=['go']) == [first['id']]
+        assert index.fresh
+
+        monkeypatch.setattr(candidate_index_module, 'CANDIDATE_INDEX_MAX_STALENESS', 0)
+        index.synced_at -= 1
+        assert not index.fresh
+    finally:
+        set_repository(None)
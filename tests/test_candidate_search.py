@@ -0,0 +1,93 @@
+import random
+import pytest
+from utils.candidate_repository import SQLiteCandidateRepository
+
+SKILLS = ['Python', 'Go', 'React', 'SQL', 'Rust']
+LOCATIONS = ['Berlin, Germany', 'London, UK', 'Remote']
+
+
+@pytest.fixture
+def repository(tmp_path):
+    rng = random.Random(7)
+    repository = SQLiteCandidateRepository(str(tmp_path / 'candidates.sqlite3'))
+    repository.upsert_many([{
+        'email': f'candidate-{i}@example.com',
+        'name': f'Candidate {i}',
+        'skills': rng.sample(SKILLS, rng.randrange(0, 4)),
+        'experience_years': rng.randrange(0, 12),
+        'current_location': rng.choice(LOCATIONS),
+        'education': 'BSc Computer Science',
+        'background_score': rng.choice([None, 0, 20, 50, 50, 90]),
+    } for i in range(200)])
+    return repository
+
+
+def _order(row):
+    score = row['background_score']
+    return (score is None, -(score or 0), row['id'])
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'skills': ['python']},
+    {'skills': ['Python', 'sql'], 'min_experience_years': 3},
+    {'location': 'berlin'},
+])
+def test_search_by_background_score_pages_in_score_order(repository, filters):
+    expected = sorted(repository.search(limit=1000, **filters), key=_order)
+    pages, after = [], None
+    while True:
+        rows = repository.search_by_background_score(after=after, limit=9, **filters)
+        pages.extend(rows)
+        if len(rows) < 9:
+            break
+        after = (rows[-1]['background_score'], rows[-1]['id'])
+    assert [row['id'] for row in pages] == [row['id'] for row in expected]
+
+
+@pytest.fixture
+def recruiter(repository, monkeypatch):
+    from routes import recruiter
+    from utils.candidate_index import CandidateIndex
+    monkeypatch.setattr(recruiter, 'get_repository', lambda: repository)
+    monkeypatch.setattr(recruiter, 'candidate_index', CandidateIndex())
+    return recruiter
+
+
+def test_store_cursor_pages_through_every_match(recruiter, repository):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = recruiter.find_matching_candidates({'skills': ['python']}, cursor=cursor, page_size=7)
+        seen.extend(row['id'] for row in rows)
+        if not cursor:
+            break
+        assert cursor.startswith('b:')
+    assert seen == [row['id'] for row in sorted(repository.search(skills=['python'], limit=1000), key=_order)]
+
+
+@pytest.mark.parametrize('cursor', [
+    'b:50:1),background_score.gte.0',
+    'b:50:not-an-id',
+    'b:5.5:3f1d0c9e-3a4b-4c1e-9a5b-0b8f2d6c7e11',
+    'b:nan:3f1d0c9e-3a4b-4c1e-9a5b-0b8f2d6c7e11',
+    'x:1:2',
+    'garbage',
+])
+def test_malformed_cursors_are_rejected(recruiter, cursor):
+    with pytest.raises(recruiter.InvalidCursorError):
+        recruiter.find_matching_candidates({}, cursor=cursor)
+
+
+def test_rank_cursor_on_a_cold_index_is_rejected(recruiter):
+    with pytest.raises(recruiter.InvalidCursorError):
+        recruiter.find_matching_candidates({}, cursor='r:0.5:3f1d0c9e-3a4b-4c1e-9a5b-0b8f2d6c7e11')
+
+
+def test_supabase_keyset_rejects_filter_injection(monkeypatch):
+    postgrest = pytest.importorskip('postgrest')
+    from utils import supabase_client
+    monkeypatch.setattr(supabase_client, 'get_supabase',
+                        lambda: postgrest.SyncPostgrestClient('http://localhost:1/rest/v1'))
+    repository = supabase_client.SupabaseCandidateRepository()
+    with pytest.raises(ValueError):
+        repository.search_by_background_score(after=(50, '1),background_score.gte.0'))
@@ -0,0 +1,60 @@
+from utils.fingerprint import FingerprintIndex, compute_fingerprint
+
+RESUME_A = 'Jane Doe\nPython engineer in Berlin\nBuilt data pipelines and APIs for five years'
+RESUME_B = 'John Roe\nFrontend developer in Lisbon\nShipped React apps and design systems'
+
+
+def test_exact_match_by_bytes_and_text():
+    index = FingerprintIndex()
+    fingerprint = compute_fingerprint(b'file-a', RESUME_A)
+    index.add('a@example.com', fingerprint, parsed_data={'name': 'Jane Doe'})
+
+    assert index.find_exact_bytes(fingerprint['resume_sha256'])['parsed_data'] == {'name': 'Jane Doe'}
+    assert index.find_exact_text(fingerprint['resume_text_sha256'])['key'] == 'a@example.com'
+
+
+def test_readding_a_key_with_another_resume_drops_the_old_hashes():
+    index = FingerprintIndex()
+    old = compute_fingerprint(b'file-a', RESUME_A)
+    new = compute_fingerprint(b'file-b', RESUME_B)
+    index.add('x@example.com', old, parsed_data={'name': 'Jane Doe'}, text=RESUME_A)
+    index.add('x@example.com', new, parsed_data={'name': 'John Roe'}, text=RESUME_B)
+
+    assert index.find_exact_bytes(old['resume_sha256']) is None
+    assert index.find_exact_text(old['resume_text_sha256']) is None
+    match = index.find_exact_bytes(new['resume_sha256'])
+    assert match['parsed_data'] == {'name': 'John Roe'}
+    assert match['fingerprint']['resume_sha256'] == new['resume_sha256']
+    assert match['text'] == RESUME_B
+
+
+def test_readding_without_a_parse_does_not_keep_the_old_parse():
+    index = FingerprintIndex()
+    index.add('x@example.com', compute_fingerprint(b'file-a', RESUME_A), parsed_data={'name': 'Jane Doe'})
+    new = compute_fingerprint(b'file-b', RESUME_B)
+    index.add_many([('x@example.com', new, 'candidate-1')])
+
+    match = index.find_exact_bytes(new['resume_sha256'])
+    assert match['candidate_id'] == 'candidate-1'
+    assert match['parsed_data'] is None
+
+
+def test_readding_does_not_steal_another_keys_hash():
+    index = FingerprintIndex()
+    shared = compute_fingerprint(b'file-a', RESUME_A)
+    index.add('x@example.com', shared)
+    index.add('y@example.com', shared)
+    index.add('x@example.com', compute_fingerprint(b'file-b', RESUME_B))
+
+    assert index.find_exact_bytes(shared['resume_sha256'])['key'] == 'y@example.com'
+
+
+def test_near_duplicate_uses_the_current_resume():
+    index = FingerprintIndex()
+    old = compute_fingerprint(b'file-a', RESUME_A)
+    index.add('x@example.com', old)
+    index.add('x@example.com', compute_fingerprint(b'file-b', RESUME_B))
+
+    assert index.find_near_duplicate(old['resume_minhash']) is None
+    near = compute_fingerprint(b'file-c', RESUME_B + ' ')
+    assert index.find_near_duplicate(near['resume_minhash'])['key'] == 'x@example.com'
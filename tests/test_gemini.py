@@ -0,0 +1,108 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils import gemini
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Replace the Gemini call with a stub that records each prompt."""
+    gemini.clear_response_cache()
+    calls = []
+
+    def generate(prompt, response_schema=None):
+        calls.append(prompt)
+        return {'name': 'Jane Doe'}, '{"name": "Jane Doe"}'
+    monkeypatch.setattr(gemini, '_generate_json', generate)
+    yield calls
+    gemini.clear_response_cache()
+
+
+def test_parse_logs_the_compaction_report(fake_gemini, caplog):
+    with caplog.at_level(logging.INFO, logger='utils.gemini'):
+        parsed, _ = gemini.parse_resume_with_gemini('Jane Doe\n\n\nPython    engineer in Berlin')
+
+    assert parsed == {'name': 'Jane Doe'}
+    assert 'Resume compacted' in caplog.text
+    assert 'estimated tokens' in caplog.text
+
+
+
+def test_cached_parses_are_not_shared_across_output_modes(fake_gemini, monkeypatch):
+    monkeypatch.setattr(gemini, 'GEMINI_STRUCTURED_OUTPUT', True)
+    gemini.parse_resume_with_gemini('Jane Doe\nPython engineer')
+    gemini.parse_resume_with_gemini('Jane Doe\nPython engineer')
+    assert len(fake_gemini) == 1
+
+    monkeypatch.setattr(gemini, 'GEMINI_STRUCTURED_OUTPUT', False)
+    gemini.parse_resume_with_gemini('Jane Doe\nPython engineer')
+    assert len(fake_gemini) == 2
+
+def test_concurrent_parses_of_one_resume_share_a_call(monkeypatch):
+    gemini.clear_response_cache()
+    calls = []
+
+    def generate(prompt, response_schema=None):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return {'name': 'Jane Doe'}, '{"name": "Jane Doe"}'
+    monkeypatch.setattr(gemini, '_generate_json', generate)
+    monkeypatch.setattr(gemini, 'GEMINI_SINGLE_FLIGHT', True)
+
+    start = threading.Barrier(4)
+
+    def parse():
+        start.wait()
+        return gemini.parse_resume_with_gemini('Jane Doe\nPython engineer')
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: parse(), range(4)))
+    gemini.clear_response_cache()
+
+    assert len(calls) == 1
+    assert all(parsed == {'name': 'Jane Doe'} for parsed, _ in results)
+
+
+def test_single_flight_followers_get_the_leaders_exception():
+    flights = gemini.SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('quota exceeded')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, 'key', fail)
+        started.wait(5)
+        follower = pool.submit(flights.do, 'key', lambda: 'not called')
+        time.sleep(0.05)
+        release.set()
+        with pytest.raises(RuntimeError):
+            leader.result()
+        with pytest.raises(RuntimeError):
+            follower.result()
+
+
+def test_batcher_sends_one_call_and_parses_missing_resumes_alone(monkeypatch):
+    prompts = []
+
+    def generate(prompt, response_schema=None):
+        prompts.append(prompt)
+        if prompt.startswith(gemini.RESUME_BATCH_PROMPT):
+            documents = re.findall(r'<resume id="(\d+)">\n(.*?)\n</resume>', prompt)
+            # The reply leaves out "resume two"
+            return [{'id': int(i), 'name': text} for i, text in documents if text != 'resume two'], '[...]'
+        return {'name': 'alone'}, '{"name": "alone"}'
+    monkeypatch.setattr(gemini, '_generate_json', generate)
+
+    batcher = gemini.ResumeBatcher(window=5, max_resumes=3, max_chars=100)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(batcher.parse, ['resume zero', 'resume one', 'resume two']))
+
+    assert len([p for p in prompts if p.startswith(gemini.RESUME_BATCH_PROMPT)]) == 1
+    assert [parsed['name'] for parsed, _ in results] == ['resume zero', 'resume one', 'alone']
+    assert len(prompts) == 2
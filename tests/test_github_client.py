@@ -0,0 +1,74 @@
+import time
+from types import SimpleNamespace
+import pytest
+from benchmarks.stubs import GitHubStubHandler, start_stub_server
+from utils.github_client import PRIORITY_BACKGROUND, GitHubDeferred, GitHubScheduler
+
+
+class TooManyRequestsHandler(GitHubStubHandler):
+    """Answers 429 with a long Retry-After for the token "limited", and normally otherwise."""
+
+    def do_GET(self):
+        if self.headers.get('Authorization') == 'bearer limited':
+            with self.server.lock:
+                self.server.requests['rest'] = self.server.requests.get('rest', 0) + 1
+            self._send_json(429, {'message': 'Too Many Requests'}, {'Retry-After': '6'})
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub_server(TooManyRequestsHandler)
+    yield server, base_url
+    server.shutdown()
+
+
+def test_429_defers_without_sleeping_on_retry_after(stub):
+    server, base_url = stub
+    scheduler = GitHubScheduler(['limited'])
+    start = time.monotonic()
+    with pytest.raises(GitHubDeferred):
+        scheduler.get(f'{base_url}/users/octocat', priority=PRIORITY_BACKGROUND)
+    assert time.monotonic() - start < 2
+    # Sent once: no session-level retry, and the token is out of quota until Retry-After passes
+    assert server.requests['rest'] == 1
+    stats = scheduler.stats()
+    assert stats['rate_limited'] == 1
+    assert stats['deferred'] == 1
+    assert stats['in_flight'] == 0
+
+
+def test_429_moves_on_to_another_token(stub):
+    server, base_url = stub
+    scheduler = GitHubScheduler(['limited', 'spare'])
+    # Make "limited" the first pick
+    scheduler._tokens['spare'].remaining -= 1
+    start = time.monotonic()
+    response = scheduler.get(f'{base_url}/users/octocat')
+    assert response.status_code == 200
+    assert time.monotonic() - start < 2
+    assert server.requests['rest'] == 2
+    assert scheduler.stats()['rate_limited'] == 1
+
+
+def _response(status_code, remaining, reset_at):
+    return SimpleNamespace(status_code=status_code, headers={
+        'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset': str(reset_at)})
+
+
+def test_remaining_follows_the_response_header():
+    scheduler = GitHubScheduler(['token'])
+    reset_at = int(time.time()) + 3600
+    states = [scheduler.acquire(PRIORITY_BACKGROUND, 1) for _ in range(3)]
+    state = states[0]
+    assert state.remaining == 4997
+    # A 304 costs no quota: GitHub still reports 4999, less the two requests still in flight
+    scheduler.release(states[0], _response(304, 4999, reset_at))
+    assert state.remaining == 4997
+    scheduler.release(states[1], _response(304, 4999, reset_at))
+    scheduler.release(states[2], _response(200, 4998, reset_at))
+    assert state.remaining == 4998
+    # A higher count than the local estimate is taken as-is too
+    scheduler.release(scheduler.acquire(PRIORITY_BACKGROUND, 1), _response(304, 4998, reset_at))
+    assert state.remaining == 4998
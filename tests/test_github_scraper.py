@@ -0,0 +1,50 @@
+import pytest
+from benchmarks.bench_github_scrape import generated_profile
+from utils.github_scraper import ARCTIC_VAULT_BADGE, profile_fields_soup, profile_fields_streaming
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def _page(body: str) -> bytes:
+    return f'<html><body>{body}</body></html>'.encode('utf-8')
+
+
+@pytest.mark.parametrize('fixture', [
+    generated_profile('bench-user', 42, 17, False, seed=1),
+    generated_profile('bench-arctic', 1234, 980, True, seed=2),
+    generated_profile('bench-empty', 0, 0, False, seed=3),
+])
+@pytest.mark.parametrize('chunk_size', [97, 16384, 10 ** 7])
+def test_streaming_matches_soup_on_generated_profiles(fixture, chunk_size):
+    expected = profile_fields_soup(fixture.decode('utf-8'))
+    assert profile_fields_streaming(_chunks(fixture, chunk_size)) == expected
+
+
+@pytest.mark.parametrize('body', [
+    # No followers link
+    '<span class="Counter">12</span><img alt="Avatar" src="/a.png">',
+    # Followers link without a span.text-bold
+    '<span class="Counter">12</span><a href="/jane?tab=followers">5 followers</a>',
+    # Nested spans inside the counter
+    '<span class="Counter"><span class="sr-only">1,</span>234</span>'
+    '<a href="/jane?tab=followers"><span class="text-bold"><span>7</span></span></a>',
+    # Counter never closed
+    '<img alt="Avatar" src=""><span class="Counter">3',
+])
+def test_streaming_matches_soup_on_edge_cases(body):
+    page = _page(body)
+    for chunk_size in (1, 7, len(page)):
+        assert profile_fields_streaming(_chunks(page, chunk_size)) == profile_fields_soup(page.decode('utf-8'))
+
+
+def test_badge_split_across_a_chunk_boundary():
+    page = _page('<span class="Counter">1</span><a href="/j?tab=followers"><span class="text-bold">2</span></a>'
+                 f'<img alt="Avatar" src="/a.png"><img alt="Achievement: {ARCTIC_VAULT_BADGE}">')
+    split = page.index(ARCTIC_VAULT_BADGE.encode()) + len(ARCTIC_VAULT_BADGE) // 2
+
+    fields = profile_fields_streaming([page[:split], page[split:]])
+
+    assert fields['arctic_vault'] is True
+    assert fields == profile_fields_soup(page.decode('utf-8'))
@@ -0,0 +1,51 @@
+import pytest
+import routes.candidate as candidate
+from utils.fingerprint import FingerprintIndex
+
+TEMPLATE = ('Summary\nSoftware engineer building data platforms, APIs and internal tools for growing teams\n'
+            'Experience\nSenior engineer at Acme, built the billing pipeline and the reporting service\n'
+            'Engineer at Globex, owned the search backend and its deployment tooling\n'
+            'Education\nB.Sc. Computer Science\nSkills\nPython, Go, PostgreSQL, Kubernetes, Terraform\n')
+
+
+@pytest.fixture
+def ingest(tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate, 'fingerprint_index', FingerprintIndex())
+    texts = {}
+    parses = []
+    monkeypatch.setattr(candidate, 'extract_text_from_pdf_path', lambda path: texts[path])
+
+    def parse(text):
+        parses.append(text)
+        return {'name': text.split('\n')[0], 'skills': ['Python']}, 'raw'
+    monkeypatch.setattr(candidate, 'parse_resume_with_gemini', parse)
+
+    def run(email, text):
+        path = tmp_path / f'{len(texts)}.pdf'
+        path.write_bytes(text.encode())
+        texts[str(path)] = text
+        return candidate.ingest_resume({'full_name': email, 'email': email, 'github': '', 'linkedin': '',
+                                        'resume_filename': 'resume.pdf', 'resume_path': str(path)})
+    run.parses = parses
+    return run
+
+
+def test_own_near_duplicate_reuses_the_parse(ingest):
+    ingest('jane@example.com', 'Jane Doe\n' + TEMPLATE)
+    profile = ingest('jane@example.com', 'Jane Doe\n' + TEMPLATE + 'Rust\n')
+
+    assert len(ingest.parses) == 1
+    assert profile['duplicate']['match'] == 'near'
+    assert profile['duplicate']['reused']
+    assert profile['duplicate']['diff']
+
+
+def test_someone_elses_near_duplicate_is_parsed_again(ingest):
+    ingest('jane@example.com', 'Jane Doe\n' + TEMPLATE)
+    profile = ingest('john@example.com', 'John Roe\n' + TEMPLATE)
+
+    assert len(ingest.parses) == 2
+    assert profile['parsed_data']['name'] == 'John Roe'
+    assert profile['duplicate']['match'] == 'near'
+    assert not profile['duplicate']['reused']
+    assert profile['duplicate']['diff'] is None
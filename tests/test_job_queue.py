@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+from utils.job_queue import JobQueue, QueueFullError
+
+
+def _poll(jobs, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job and job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_job_lifecycle(tmp_path):
+    release = threading.Event()
+
+    def handler(payload):
+        release.wait(5)
+        if payload == 'bad':
+            raise ValueError('bad payload')
+        return {'doubled': payload * 2}
+
+    jobs = JobQueue(handler, workers=1, path=str(tmp_path / 'jobs.sqlite3'))
+    job_id = jobs.submit(21)
+    failing_id = jobs.submit('bad')
+    assert jobs.get(failing_id)['status'] == 'queued'
+    release.set()
+
+    job = _poll(jobs, job_id)
+    assert job['status'] == 'done'
+    assert job['result'] == {'doubled': 42}
+    assert job['submitted_at'] <= job['started_at'] <= job['finished_at']
+
+    failed = _poll(jobs, failing_id)
+    assert failed['status'] == 'failed'
+    assert failed['error'] == 'bad payload'
+    assert jobs.get('unknown') is None
+
+    stats = jobs.stats()
+    assert (stats['submitted'], stats['completed'], stats['failed'], stats['running']) == (2, 1, 1, 0)
+
+
+def test_status_is_visible_from_another_process(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    jobs = JobQueue(lambda payload: payload.upper(), workers=1, path=path)
+    # Another worker process: same store, its own queue and threads
+    other = JobQueue(lambda payload: None, workers=1, path=path)
+    job_id = jobs.submit('resume')
+    _poll(jobs, job_id)
+    assert other.get(job_id)['result'] == 'RESUME'
+
+
+def test_full_queue_rejects(tmp_path):
+    release = threading.Event()
+    jobs = JobQueue(lambda payload: release.wait(5), workers=1, max_depth=1, path=str(tmp_path / 'jobs.sqlite3'))
+    running = jobs.submit(1)
+    deadline = time.time() + 5
+    while jobs.get(running)['status'] != 'running' and time.time() < deadline:
+        time.sleep(0.01)
+    jobs.submit(2)
+    with pytest.raises(QueueFullError):
+        jobs.submit(3)
+    release.set()
+    assert jobs.stats()['rejected'] == 1
+
+
+def test_finished_jobs_expire(tmp_path):
+    jobs = JobQueue(lambda payload: payload, workers=1, result_ttl=0.2, path=str(tmp_path / 'jobs.sqlite3'))
+    job_id = jobs.submit('x')
+    _poll(jobs, job_id)
+    time.sleep(0.3)
+    assert jobs.get(job_id) is None
@@ -0,0 +1,35 @@
+import pytest
+from flask import Flask
+from utils import metrics
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    metrics.init_app(app)
+    return app.test_client()
+
+
+def test_metrics_are_forbidden_until_access_is_configured(client):
+    assert client.get('/metrics').status_code == 403
+
+
+def test_allowed_addresses_can_scrape(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ALLOWED_IPS', {'127.0.0.1'})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.7'}).status_code == 403
+
+
+def test_token_holders_can_scrape_from_anywhere(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', 'scrape-secret')
+    environ = {'REMOTE_ADDR': '10.0.0.7'}
+
+    assert client.get('/metrics', environ_base=environ,
+                      headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+    assert client.get('/metrics', environ_base=environ,
+                      headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get('/metrics', environ_base=environ).status_code == 403
@@ -0,0 +1,35 @@
+import threading
+import time
+from benchmarks.bench_pdf_extract import build_pdf
+from utils.pdf_extractor import extract_text_from_pdf_path
+
+
+def _pdf(tmp_path, pages=2, lines=5):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(build_pdf(pages, lines, lambda page, line: b'Page %d line %d' % (page + 1, line)))
+    return str(path)
+
+
+def test_extracts_in_a_child_process_from_a_worker_thread(tmp_path):
+    path = _pdf(tmp_path)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(extract_text_from_pdf_path(path, timeout=30)))
+    thread.start()
+    thread.join()
+    pages = result[0].split('\f')
+    assert len(pages) == 2
+    assert 'Page 2 line 4' in pages[1]
+
+
+def test_gives_up_at_the_timeout(tmp_path):
+    # Takes about half a second to extract
+    path = _pdf(tmp_path, pages=20, lines=4000)
+    start = time.monotonic()
+    assert extract_text_from_pdf_path(path, timeout=0.01) is None
+    assert time.monotonic() - start < 2
+
+
+def test_unreadable_file_returns_none(tmp_path):
+    path = tmp_path / 'broken.pdf'
+    path.write_bytes(b'not a pdf')
+    assert extract_text_from_pdf_path(str(path), timeout=30) is None
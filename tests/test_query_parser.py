@@ -0,0 +1,56 @@
+import pytest
+from utils.query_parser import normalize_query, parse_query_locally
+
+
+@pytest.mark.parametrize('query, years', [
+    ('python 5+ years berlin', 5),
+    ('python 5 yrs berlin', 5),
+    ('python at least 5 years berlin', 5),
+    ('python 3-5 years berlin', 3),
+    ('python 3 to 5 years berlin', 3),
+])
+def test_years_minimum(query, years):
+    filters, confidence = parse_query_locally(query)
+
+    assert filters['min_experience_years'] == years
+    assert filters['skills'] == ['Python']
+    assert filters['location'] == 'Berlin'
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize('query', [
+    'python under 5 years berlin',
+    'python less than 5 years berlin',
+    'python up to 5 yrs berlin',
+    'python <5 years berlin',
+])
+def test_years_maximum_is_left_to_the_llm(query):
+    filters, confidence = parse_query_locally(query)
+
+    assert filters['min_experience_years'] is None
+    assert confidence == 0.0
+
+
+def test_skills_locations_and_titles():
+    filters, confidence = parse_query_locally('Senior backend engineer with Node.js and k8s in NYC')
+
+    assert filters['job_title'] == 'Backend Engineer'
+    assert filters['skills'] == ['Node.js', 'Kubernetes']
+    assert filters['location'] == 'New York'
+    # "senior" isn't recognized
+    assert 0 < confidence < 1
+
+
+def test_several_locations_are_left_to_the_llm():
+    _, confidence = parse_query_locally('python berlin or london')
+
+    assert confidence == 0.0
+
+
+def test_normalize_query_folds_case_and_order():
+    assert normalize_query('Python  Berlin 5+ years') == normalize_query('berlin python 5+ YEARS')
+
+
+def test_normalize_query_keeps_number_order():
+    assert normalize_query('python 3 to 5 years') != normalize_query('python 5 to 3 years')
+    assert normalize_query('python 3 to 5 years') == normalize_query('3 to 5 years Python')
@@ -0,0 +1,39 @@
+from utils.ranker import CandidateVectorIndex
+
+SKILLS = [['python', 'django'], ['python'], ['go'], ['python', 'flask'], ['rust'], []]
+
+
+def _index(count=60):
+    index = CandidateVectorIndex(dim=64, capacity=4)
+    for i in range(count):
+        index.upsert({'id': f'c{i:03d}', 'skills': SKILLS[i % len(SKILLS)],
+                      'current_location': 'Berlin' if i % 2 else 'London',
+                      # Many equal scores, so ties have to be broken by id
+                      'background_score': (i % 3) * 10})
+    return index
+
+
+def test_top_k_is_best_first_with_ties_by_id():
+    index = _index()
+    full = index.top_k('python developer in berlin', k=1000)
+    assert len(full) == 60
+    assert full == sorted(full, key=lambda item: (-item[1], item[0]))
+    assert index.top_k('python developer in berlin', k=5) == full[:5]
+
+
+def test_top_k_pages_cover_every_candidate_once():
+    index = _index()
+    query = 'python developer in berlin'
+    expected = index.top_k(query, k=1000)
+    candidate_ids = [f'c{i:03d}' for i in range(0, 60, 2)] + ['unknown']
+    expected_subset = [item for item in expected if item[0] in candidate_ids]
+
+    for ids, want in ((None, expected), (candidate_ids, expected_subset)):
+        pages, after = [], None
+        while True:
+            page = index.top_k(query, k=7, candidate_ids=ids, after=after)
+            if not page:
+                break
+            pages.extend(page)
+            after = (page[-1][1], page[-1][0])
+        assert pages == want
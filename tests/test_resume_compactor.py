@@ -0,0 +1,47 @@
+from utils.resume_compactor import compact_resume_text
+
+HEADER = 'Jane Doe | Senior Software Engineer'
+FOOTER = 'Confidential'
+
+
+def page(number, body):
+    return '\n'.join([HEADER] + body + [FOOTER, f'Page {number} of 3'])
+
+
+def test_headers_and_footers_are_kept_once_and_page_numbers_dropped():
+    jobs = {1: 'Acme', 2: 'Globex', 3: 'Initech'}
+    text = '\f'.join(page(n, [f'Engineer at {jobs[n]}', f'Built the {jobs[n]} billing system']) for n in jobs)
+    result, report = compact_resume_text(text, token_budget=0)
+
+    assert result.count(HEADER) == 1
+    assert result.count(FOOTER) == 1
+    assert 'Page' not in result
+    assert all(f'Built the {job} billing system' in result for job in jobs.values())
+    assert report['header_footer_lines_dropped'] == 7
+
+
+def test_header_lines_repeated_in_the_body_are_kept():
+    # The header's second line is also a job title in the body
+    title = 'Senior Software Engineer'
+    pages = ['\n'.join(['Jane Doe', title, company, title, 'Built the billing system', 'Led a team of five',
+                         'Page %d' % n]) for n, company in enumerate(['Acme', 'Globex', 'Initech'], 1)]
+    result, _ = compact_resume_text('\f'.join(pages), token_budget=0)
+
+    assert result.count('Jane Doe') == 1
+    assert result.count(title) == 4
+
+
+def test_truncation_is_reported_and_logged(caplog):
+    text = '\n'.join(f'Line {i} with some words about the work' for i in range(200))
+    result, report = compact_resume_text(text, token_budget=100)
+
+    assert report['truncated']
+    assert report['tokens_after'] <= 100
+    assert text.startswith(result)
+    assert 'token budget' in caplog.text
+
+
+def test_short_resume_is_not_truncated():
+    _, report = compact_resume_text('Jane Doe\nPython engineer', token_budget=100)
+
+    assert not report['truncated']
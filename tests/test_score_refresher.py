@@ -0,0 +1,53 @@
+import pytest
+from utils import score_refresher
+from utils.candidate_repository import SQLiteCandidateRepository, set_repository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteCandidateRepository(str(tmp_path / 'candidates.sqlite3'))
+    set_repository(repository)
+    yield repository
+    set_repository(None)
+
+
+def _fake_lookups(monkeypatch, deferred=(), during=None):
+    """Score every candidate 50, except names in `deferred`, which miss the deadline."""
+    def lookups(candidates, github_token, deadline, priority=None, executor=None, max_in_flight=None):
+        if during:
+            during()
+        for candidate in candidates:
+            components = {'github': 50, 'linkedin': 50, 'public_presence': 50}
+            yield candidate, 50, candidate['name'] in deferred, components
+    monkeypatch.setattr(score_refresher, 'iter_background_scores', lookups)
+
+
+def test_deferred_candidates_go_to_the_back_of_the_queue(repository, monkeypatch):
+    for name in ('a', 'b', 'c'):
+        repository.upsert({'email': f'{name}@example.com', 'name': name})
+    _fake_lookups(monkeypatch, deferred={'a'})
+    refresher = score_refresher.BackgroundScoreRefresher(batch_size=1)
+
+    picked = []
+    for _ in range(3):
+        picked.append(refresher._due()[0]['name'])
+        refresher.refresh_once()
+
+    # A deferred candidate isn't picked again before every other due candidate had its turn
+    assert sorted(picked) == ['a', 'b', 'c']
+    assert refresher._due()[0]['name'] == 'a'
+    assert repository.get_by_email('a@example.com')['background_score'] is None
+    assert repository.get_by_email('b@example.com')['background_score'] == 50
+    assert refresher.stats()['deferred'] == 1
+
+
+def test_write_back_does_not_recreate_a_deleted_candidate(repository, monkeypatch):
+    repository.upsert({'email': 'gone@example.com', 'name': 'gone'})
+
+    def delete():
+        with repository._connect() as conn:
+            conn.execute("DELETE FROM candidates WHERE email = 'gone@example.com'")
+    _fake_lookups(monkeypatch, during=delete)
+
+    assert score_refresher.BackgroundScoreRefresher().refresh_once() == 1
+    assert repository.count() == 0
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+import pytest
+from utils import supabase_client
+
+postgrest = pytest.importorskip('postgrest')
+
+
+class FakeSupabase:
+    """Records writes; the upsert_candidate RPC fails with `rpc_error`."""
+
+    def __init__(self, rpc_error):
+        self.rpc_error = rpc_error
+        self.writes = []
+
+    def rpc(self, name, params):
+        def execute():
+            raise self.rpc_error
+        return SimpleNamespace(execute=execute)
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+class FakeQuery:
+    def __init__(self, client):
+        self.client = client
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def insert(self, row):
+        self.client.writes.append(('insert', row))
+        self.row = row
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.client.writes.append(('upsert', rows))
+        self.row = rows[0]
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[dict(self.row, id='1')] if hasattr(self, 'row') else [])
+
+
+def _repository(monkeypatch, rpc_error):
+    client = FakeSupabase(rpc_error)
+    monkeypatch.setattr(supabase_client, 'get_supabase', lambda: client)
+    return supabase_client.SupabaseCandidateRepository(), client
+
+
+def test_missing_rpc_falls_back_to_two_step_write(monkeypatch):
+    repository, client = _repository(monkeypatch, postgrest.APIError({'code': 'PGRST202', 'message': 'not found'}))
+    row, inserted = repository.upsert({'email': 'a@example.com', 'experience_years': 5.5})
+
+    assert inserted
+    assert client.writes == [('insert', {'email': 'a@example.com', 'experience_years': 6})]
+
+
+def test_other_rpc_errors_are_raised(monkeypatch):
+    error = postgrest.APIError({'code': '23505', 'message': 'duplicate key value violates unique constraint'})
+    repository, client = _repository(monkeypatch, error)
+    with pytest.raises(postgrest.APIError):
+        repository.upsert({'email': 'a@example.com'})
+    assert client.writes == []
+
+
+def test_bulk_upsert_rounds_integer_columns(monkeypatch):
+    repository, client = _repository(monkeypatch, None)
+    repository.upsert_many([{'email': 'a@example.com', 'experience_years': 4.5, 'background_score': 71.2}])
+
+    assert client.writes == [('upsert', [{'email': 'a@example.com', 'experience_years': 5, 'background_score': 71}])]
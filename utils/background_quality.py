@@ -1,10 +1,52 @@
-import requests
-from bs4 import BeautifulSoup
 import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
+from utils.cache import PersistentCache
+from utils.http_session import DEFAULT_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, http_get
+from utils.github_scraper import (
+    GITHUB_SCRAPE_CHUNK_SIZE, GITHUB_SCRAPE_FAST, profile_fields_soup, profile_fields_streaming
+)
+from utils.github_client import (
+    GitHubDeferred, PRIORITY_INTERACTIVE, add_github_token, github_graphql_scheduler, github_scheduler
+)
+from utils.metrics import register_collector, timed
 
 load_dotenv()
 
+# Concurrent scoring settings for recruiter searches
+BACKGROUND_SCORE_WORKERS = int(os.getenv('BACKGROUND_SCORE_WORKERS', '16'))
+BACKGROUND_SCORE_DEADLINE = float(os.getenv('BACKGROUND_SCORE_DEADLINE', '3.0'))  # seconds per search
+# Lookups one search runs at once, so a search stuck on slow GitHub calls can't take the whole pool
+BACKGROUND_SCORE_SEARCH_SLOTS = int(os.getenv('BACKGROUND_SCORE_SEARCH_SLOTS',
+                                              str(max(BACKGROUND_SCORE_WORKERS // 4, 1))))
+
+# Shared pool so concurrent searches can't spawn unbounded threads
+_scoring_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_SCORE_WORKERS,
+    thread_name_prefix='background-score'
+)
+
+# GitHub REST API base URL (override to point at a stand-in, e.g. in benchmarks)
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+# GitHub profile cache, keyed by normalized username. Stale entries are
+# revalidated with If-None-Match, and 304s don't count against the rate limit.
+GITHUB_CACHE_TTL = float(os.getenv('GITHUB_CACHE_TTL', '3600'))  # seconds
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv('GITHUB_CACHE_MAX_ENTRIES', '10000'))
+_github_cache = PersistentCache(
+    'github_profiles',
+    path=os.getenv('GITHUB_CACHE_PATH'),
+    ttl=GITHUB_CACHE_TTL,
+    max_entries=GITHUB_CACHE_MAX_ENTRIES
+)
+_github_cache_stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'refreshed': 0, 'stale_served': 0}
+
+@timed()
 def score_github_background(github_url: str) -> int:
     """
     Score a candidate's GitHub background quality using public profile scraping.
@@ -17,36 +59,22 @@ def score_github_background(github_url: str) -> int:
         return 0
 
     try:
-        response = requests.get(github_url)
-        if response.status_code != 200:
-            return 0
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Number of public repositories
-        repo_count = 0
-        repo_tag = soup.find('span', {'class': 'Counter'})
-        if repo_tag:
-            try:
-                repo_count = int(repo_tag.text.strip().replace(',', ''))
-            except Exception:
-                repo_count = 0
-
-        # Number of followers
-        followers = 0
-        followers_tag = soup.find('a', href=lambda x: x and x.endswith('?tab=followers'))
-        if followers_tag:
-            try:
-                followers = int(followers_tag.find('span', class_='text-bold').text.strip())
-            except Exception:
-                followers = 0
-
-        # Arctic Code Vault Contributor badge
-        arctic_vault = 'Arctic Code Vault Contributor' in response.text
-
-        # Profile picture
-        avatar = soup.find('img', {'alt': 'Avatar'})
-        has_avatar = bool(avatar and avatar.get('src'))
+        # Stream the page so the fast path can stop reading once it has every field
+        response = http_get(github_url, stream=GITHUB_SCRAPE_FAST)
+        try:
+            if response.status_code != 200:
+                return 0
+            if GITHUB_SCRAPE_FAST:
+                fields = profile_fields_streaming(response.iter_content(GITHUB_SCRAPE_CHUNK_SIZE),
+                                                  response.encoding)
+            else:
+                fields = profile_fields_soup(response.text)
+        finally:
+            response.close()
+        repo_count = fields['repo_count']
+        followers = fields['followers']
+        arctic_vault = fields['arctic_vault']
+        has_avatar = fields['has_avatar']
 
         # Scoring logic (tweak as needed)
         score = 0
@@ -64,6 +92,7 @@ def score_github_background(github_url: str) -> int:
         return 0
 
 
+@timed()
 def score_linkedin_background(linkedin_url: str) -> int:
     """
     Score a candidate's LinkedIn background quality.
@@ -79,6 +108,7 @@ def score_linkedin_background(linkedin_url: str) -> int:
     return 80  # Placeholder score
 
 
+@timed()
 def score_public_presence(name: str, github_url: str = None, linkedin_url: str = None) -> int:
     """
     Score a candidate's public presence (e.g., mentions, talks, publications).
@@ -101,49 +131,465 @@ def score_public_presence(name: str, github_url: str = None, linkedin_url: str =
     return min(score, 100)
 
 
-def score_github_background_api(github_url: str, github_token: str = None) -> int:
+def normalize_github_username(github_url: str) -> str:
+    """
+    Extract a normalized (lowercase) username from a GitHub profile URL.
+    Args:
+        github_url (str): The candidate's GitHub profile URL
+    Returns:
+        str: The username, or an empty string if none could be found
+    """
+    path = github_url.strip().split('?')[0].split('#')[0].rstrip('/')
+    return path.split('/')[-1].lower()
+
+
+def _lookup_timeouts(expires_at: Optional[float]):
+    """
+    Timeouts for a GitHub request that has to finish by expires_at (a time.monotonic() value).
+    Returns:
+        Tuple: (seconds to wait for a scheduler slot, or None for the scheduler default,
+            (connect, read) timeout of the HTTP call)
+    Raises:
+        GitHubDeferred: expires_at has already passed
+    """
+    if expires_at is None:
+        return None, DEFAULT_TIMEOUT
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise GitHubDeferred('lookup deadline expired')
+    return remaining, (min(HTTP_CONNECT_TIMEOUT, remaining), min(HTTP_READ_TIMEOUT, remaining))
+
+
+def _fetch_github_profile(username: str, github_token: str = None, priority: int = PRIORITY_INTERACTIVE,
+                          expires_at: Optional[float] = None) -> Optional[Dict]:
+    """
+    Fetch a GitHub user profile through the profile cache and the request scheduler.
+    When the rate limit budget is exhausted (or expires_at passes while waiting for
+    a slot) a stale cached profile is served if there is one.
+    Returns:
+        Optional[Dict]: The GitHub API user payload, or None on error
+    Raises:
+        GitHubDeferred: Over the rate limit budget or past expires_at, and nothing cached
+    """
+    entry = _github_cache.get_entry(username)
+    if entry is not None and _github_cache.is_fresh(entry[1]):
+        _github_cache_stats['hits'] += 1
+        return entry[0]['data']
+
+    api_url = f"{GITHUB_API_URL}/users/{username}"
+    headers = {}
+    if github_token:
+        add_github_token(github_token)
+    if entry is not None and entry[0].get('etag'):
+        headers['If-None-Match'] = entry[0]['etag']
+
+    try:
+        slot_wait, http_timeout = _lookup_timeouts(expires_at)
+        resp = github_scheduler.get(api_url, priority=priority, headers=headers, timeout=slot_wait,
+                                    http_timeout=http_timeout)
+    except GitHubDeferred:
+        if entry is None:
+            raise
+        _github_cache_stats['stale_served'] += 1
+        return entry[0]['data']
+    if resp.status_code == 304 and entry is not None:
+        _github_cache_stats['revalidated'] += 1
+        _github_cache.touch(username)
+        return entry[0]['data']
+    if resp.status_code != 200:
+        print(f"GitHub API error: {resp.status_code} {resp.text}")
+        return None
+
+    if entry is not None:
+        _github_cache_stats['refreshed'] += 1
+    else:
+        _github_cache_stats['misses'] += 1
+    data = resp.json()
+    _github_cache.set(username, {'etag': resp.headers.get('ETag'), 'data': data})
+    return data
+
+
+def github_cache_stats() -> Dict[str, int]:
+    """
+    Return GitHub profile cache counters for sizing the cache.
+    Returns:
+        Dict[str, int]: hits (served from cache), misses (first fetch), revalidated (304),
+            refreshed (stale entry re-downloaded), stale_served (stale entry used because the
+            rate limit budget ran out), plus size and evictions
+    """
+    stats = _github_cache.stats()
+    return dict(_github_cache_stats, size=stats['size'], evictions=stats['evictions'])
+
+
+register_collector('hireai_github_profile_cache', 'GitHub profile cache counters', github_cache_stats)
+
+# GitHub GraphQL endpoint, and how many users one query fetches
+GITHUB_GRAPHQL_URL = os.getenv('GITHUB_GRAPHQL_URL', f'{GITHUB_API_URL}/graphql')
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv('GITHUB_GRAPHQL_BATCH_SIZE', '50'))
+_GRAPHQL_USER_FIELDS = ('login avatarUrl followers { totalCount } '
+                        'repositories(ownerAffiliations: OWNER, privacy: PUBLIC) { totalCount } '
+                        'contributionsCollection { contributionCalendar { totalContributions } }')
+# Users a GraphQL batch couldn't answer are fetched over REST on this pool
+_rest_fallback_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='github-rest-fallback')
+
+
+@timed()
+def score_github_background_api(github_url: str, github_token: str = None,
+                                priority: int = PRIORITY_INTERACTIVE, expires_at: Optional[float] = None) -> int:
     """
     Score a candidate's GitHub background quality using the GitHub API.
     Args:
         github_url (str): The candidate's GitHub profile URL
-        github_token (str, optional): GitHub personal access token for higher rate limits
+        github_token (str, optional): GitHub personal access token, added to the scheduler's token pool
+        priority (int): utils.github_client.PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        expires_at (float, optional): time.monotonic() by which the request must finish
     Returns:
         int: Score between 0 and 100
+    Raises:
+        GitHubDeferred: The profile can't be fetched within the rate limits right now
     """
     if not github_url or 'github.com' not in github_url:
         return 0
 
-    # Extract username from URL
+    username = normalize_github_username(github_url)
+    if not username:
+        return 0
+
     try:
-        username = github_url.rstrip('/').split('/')[-1]
-    except Exception:
+        return _score_github_profile(_fetch_github_profile(username, github_token, priority, expires_at))
+    except GitHubDeferred:
+        raise
+    except Exception as e:
+        print(f"Error scoring GitHub profile via API: {e}")
         return 0
 
-    api_url = f"https://api.github.com/users/{username}"
-    headers = {}
+
+def _score_github_profile(data: Optional[Dict]) -> int:
+    """Score a GitHub profile in the REST user format (0 for a missing profile)."""
+    if data is None:
+        return 0
+
+    # Scoring logic
+    score = 0
+    score += min(data.get('public_repos', 0), 20) * 2      # up to 40 points for repos
+    score += min(data.get('followers', 0), 20) * 2         # up to 40 points for followers
+    if data.get('avatar_url'):
+        score += 10
+    # Arctic Code Vault badge is not available via API, so skip
+
+    return min(score, 100)
+
+
+def _graphql_profile(user: Dict) -> Dict:
+    """Convert a GraphQL User to the REST user format the cache and scoring use."""
+    calendar = (user.get('contributionsCollection') or {}).get('contributionCalendar') or {}
+    return {
+        'login': user.get('login'),
+        'public_repos': (user.get('repositories') or {}).get('totalCount', 0),
+        'followers': (user.get('followers') or {}).get('totalCount', 0),
+        'avatar_url': user.get('avatarUrl'),
+        'contributions_last_year': calendar.get('totalContributions'),
+    }
+
+
+def _fetch_github_profiles_graphql(usernames: List[str], priority: int = PRIORITY_INTERACTIVE,
+                                    expires_at: Optional[float] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Fetch many GitHub profiles with one GraphQL query, one aliased `user` field per username.
+    Returns:
+        Dict[str, Optional[Dict]]: username -> profile in the REST format, or None if the user
+            doesn't exist. Usernames missing from the result failed and should be retried over REST.
+    Raises:
+        GitHubDeferred: Over the GraphQL rate limit budget, or past expires_at
+    """
+    slot_wait, http_timeout = _lookup_timeouts(expires_at)
+    declarations = ', '.join(f'$u{i}: String!' for i in range(len(usernames)))
+    fields = ' '.join(f'u{i}: user(login: $u{i}) {{ {_GRAPHQL_USER_FIELDS} }}' for i in range(len(usernames)))
+    query = f'query({declarations}) {{ {fields} }}'
+    variables = {f'u{i}': username for i, username in enumerate(usernames)}
+
+    resp = github_graphql_scheduler.post(GITHUB_GRAPHQL_URL, json={'query': query, 'variables': variables},
+                                         priority=priority, timeout=slot_wait, http_timeout=http_timeout)
+    if resp.status_code != 200:
+        print(f"GitHub GraphQL error: {resp.status_code} {resp.text}")
+        return {}
+    payload = resp.json()
+    data = payload.get('data') or {}
+    not_found = {error['path'][0] for error in payload.get('errors') or []
+                 if error.get('type') == 'NOT_FOUND' and error.get('path')}
+
+    profiles = {}
+    for i, username in enumerate(usernames):
+        user = data.get(f'u{i}')
+        if user:
+            profiles[username] = _graphql_profile(user)
+        elif f'u{i}' in not_found:
+            profiles[username] = None
+    return profiles
+
+
+@timed()
+def score_github_backgrounds_api(github_urls: List[str], github_token: str = None,
+                                 priority: int = PRIORITY_INTERACTIVE,
+                                 expires_at: Optional[float] = None) -> List[Optional[int]]:
+    """
+    Score many candidates' GitHub background quality with batched GitHub API calls.
+
+    Profiles missing from the cache (or stale) are fetched with one GraphQL query
+    per GITHUB_GRAPHQL_BATCH_SIZE users. Users the GraphQL query couldn't answer,
+    and every user when no token is configured (GraphQL needs one), are fetched
+    over REST concurrently.
+    Args:
+        github_urls (List[str]): The candidates' GitHub profile URLs (None or non-GitHub URLs score 0)
+        github_token (str, optional): GitHub personal access token, added to the scheduler's token pool
+        priority (int): utils.github_client.PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        expires_at (float, optional): time.monotonic() by which the requests must finish
+    Returns:
+        List[Optional[int]]: Score between 0 and 100 per URL, or None where the lookup was deferred
+            by the rate limit or didn't finish by expires_at
+    """
+    usernames = [normalize_github_username(url) if url and 'github.com' in url else '' for url in github_urls]
     if github_token:
-        headers['Authorization'] = f'token {github_token}'
+        add_github_token(github_token)
 
-    try:
-        resp = requests.get(api_url, headers=headers)
-        if resp.status_code != 200:
-            print(f"GitHub API error: {resp.status_code} {resp.text}")
-            return 0
-        data = resp.json()
+    profiles = {}
+    to_fetch = []
+    stale = set()
+    for username in dict.fromkeys(u for u in usernames if u):
+        entry = _github_cache.get_entry(username)
+        if entry is not None and _github_cache.is_fresh(entry[1]):
+            _github_cache_stats['hits'] += 1
+            profiles[username] = entry[0]['data']
+        else:
+            to_fetch.append(username)
+            if entry is not None:
+                stale.add(username)
 
-        # Scoring logic
-        score = 0
-        score += min(data.get('public_repos', 0), 20) * 2      # up to 40 points for repos
-        score += min(data.get('followers', 0), 20) * 2         # up to 40 points for followers
-        if data.get('avatar_url'):
-            score += 10
-        # Arctic Code Vault badge is not available via API, so skip
+    if to_fetch and github_graphql_scheduler.has_tokens():
+        for start in range(0, len(to_fetch), GITHUB_GRAPHQL_BATCH_SIZE):
+            chunk = to_fetch[start:start + GITHUB_GRAPHQL_BATCH_SIZE]
+            try:
+                fetched = _fetch_github_profiles_graphql(chunk, priority, expires_at)
+            except GitHubDeferred:
+                fetched = {}
+            except Exception as e:
+                print(f"Error fetching GitHub profiles via GraphQL: {e}")
+                fetched = {}
+            for username, data in fetched.items():
+                profiles[username] = data
+                if data is not None:
+                    _github_cache_stats['refreshed' if username in stale else 'misses'] += 1
+                    _github_cache.set(username, {'etag': None, 'data': data})
 
-        return min(score, 100)
+    # REST fallback, one request per user
+    deferred = set()
+    futures = {username: _rest_fallback_executor.submit(_fetch_github_profile, username, github_token, priority,
+                                                        expires_at)
+               for username in to_fetch if username not in profiles}
+    for username, future in futures.items():
+        try:
+            wait_for = None if expires_at is None else max(expires_at - time.monotonic(), 0)
+            profiles[username] = future.result(timeout=wait_for)
+        except (GitHubDeferred, FuturesTimeout):
+            future.cancel()
+            deferred.add(username)
+        except Exception as e:
+            print(f"Error scoring GitHub profile via API: {e}")
+            profiles[username] = None
+
+    return [None if username in deferred else _score_github_profile(profiles.get(username)) if username else 0
+            for username in usernames]
+
+
+def combine_background_scores(github_score: int, linkedin_score: int, public_presence_score: int) -> int:
+    """
+    Combine the individual background scores into a single 0-100 score.
+    Args:
+        github_score (int): GitHub score
+        linkedin_score (int): LinkedIn score
+        public_presence_score (int): Public presence score
+    Returns:
+        int: Score between 0 and 100
+    """
+    # Simple weighted combination (adjust weights as needed)
+    combined_score = (github_score * 0.4) + (linkedin_score * 0.3) + (public_presence_score * 0.3)
+    return min(max(int(combined_score), 0), 100)
+
+
+def _safe_score(score_fn, label: str, *args) -> int:
+    """Run a single scorer, logging and scoring 0 on failure. Deferred lookups are re-raised."""
+    try:
+        return score_fn(*args)
+    except GitHubDeferred:
+        raise
     except Exception as e:
-        print(f"Error scoring GitHub profile via API: {e}")
+        print(f"Error calculating {label} score ({args[0]}): {e}")
         return 0
 
+
+def iter_background_scores(candidates: List[Dict], github_token: Optional[str] = None,
+                           deadline: Optional[float] = None, priority: int = PRIORITY_INTERACTIVE,
+                           executor: Optional[ThreadPoolExecutor] = None, max_in_flight: Optional[int] = None
+                           ) -> Iterator[Tuple[Dict, int, bool, Dict[str, int]]]:
+    """
+    Score the background of many candidates concurrently, yielding each candidate as soon as it is scored.
+
+    The GitHub, LinkedIn and public presence lookups run on a shared thread
+    pool, at most max_in_flight at a time; the next lookup is submitted as one
+    finishes. When a GitHub token is configured, GitHub profiles are looked up
+    in batches of GITHUB_GRAPHQL_BATCH_SIZE candidates with one GraphQL query
+    each (see score_github_backgrounds_api()). GitHub requests are given the
+    time left until the deadline as their timeout, so they don't hold a pool
+    thread long after it. A candidate is yielded when all of its lookups have
+    finished. When the deadline expires, lookups not started yet are dropped
+    and the remaining candidates are yielded with a partial score, scored from
+    the components that did finish. GitHub lookups deferred by the rate limit
+    scheduler also leave the score pending instead of counting as 0.
+    Args:
+        candidates (List[Dict]): Candidate rows (uses 'github', 'linkedin' and 'name')
+        github_token (str, optional): GitHub personal access token for higher rate limits
+        deadline (float, optional): Seconds to wait for all lookups, defaults to BACKGROUND_SCORE_DEADLINE
+        priority (int): GitHub scheduler priority, PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        executor (ThreadPoolExecutor, optional): Pool to run the lookups on, defaults to the shared search pool
+        max_in_flight (int, optional): Lookups of this call on the pool at once,
+            defaults to BACKGROUND_SCORE_SEARCH_SLOTS
+    Yields:
+        Tuple[Dict, int, bool, Dict[str, int]]: (candidate, background score, pending, component scores
+            keyed 'github', 'linkedin' and 'public_presence'), in completion order
+    """
+    if deadline is None:
+        deadline = BACKGROUND_SCORE_DEADLINE
+    if executor is None:
+        executor = _scoring_executor
+    if max_in_flight is None:
+        max_in_flight = BACKGROUND_SCORE_SEARCH_SLOTS
+    expires_at = time.monotonic() + deadline
+    if github_token:
+        add_github_token(github_token)
+    batch_github = github_graphql_scheduler.has_tokens()
+
+    # Lookups as (component, candidate indices, batched, function, args). GraphQL batches
+    # go first as they are the slowest; the rest follow in candidate order.
+    tasks = deque()
+    if batch_github:
+        with_github = [index for index, candidate in enumerate(candidates) if candidate.get('github')]
+        for start in range(0, len(with_github), GITHUB_GRAPHQL_BATCH_SIZE):
+            chunk = with_github[start:start + GITHUB_GRAPHQL_BATCH_SIZE]
+            tasks.append(('github', chunk, True, score_github_backgrounds_api,
+                          ([candidates[i]['github'] for i in chunk], github_token, priority, expires_at)))
+    for index, candidate in enumerate(candidates):
+        github_url = candidate.get('github')
+        linkedin_url = candidate.get('linkedin')
+        name = candidate.get('name')
+        if github_url and not batch_github:
+            tasks.append(('github', [index], False, _safe_score,
+                          (score_github_background_api, 'GitHub', github_url, github_token, priority, expires_at)))
+        if linkedin_url:
+            tasks.append(('linkedin', [index], False, _safe_score,
+                          (score_linkedin_background, 'LinkedIn', linkedin_url)))
+        if name:
+            tasks.append(('public_presence', [index], False, _safe_score,
+                          (score_public_presence, 'Public Presence', name, github_url, linkedin_url)))
+
+    # Per candidate: component -> (future, position in a batch result or None), filled in on submit
+    jobs = [(candidate, {}) for candidate in candidates]
+    remaining = {index: 0 for index in range(len(candidates))}
+    for _, indices, _, _, _ in tasks:
+        for index in indices:
+            remaining[index] += 1
+    planned = dict(remaining)
+    in_flight = {}
+
+    def submit_next():
+        while tasks and len(in_flight) < max_in_flight and time.monotonic() < expires_at:
+            component, indices, batched, fn, args = tasks.popleft()
+            future = executor.submit(fn, *args)
+            for position, index in enumerate(indices):
+                jobs[index][1][component] = (future, position if batched else None)
+            in_flight[future] = indices
+
+    def combine(index):
+        futures = jobs[index][1]
+        scores = {'github': 0, 'linkedin': 0, 'public_presence': 0}
+        # Lookups never submitted leave the score pending
+        pending = len(futures) < planned[index]
+        for component, (future, position) in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                value = future.result()
+                if position is not None:
+                    value = value[position]
+                if value is None:
+                    # Deferred by the rate limit
+                    pending = True
+                else:
+                    scores[component] = value
+            else:
+                future.cancel()
+                pending = True
+        score = combine_background_scores(scores['github'], scores['linkedin'], scores['public_presence'])
+        return (jobs[index][0], score, pending, scores)
+
+    # Candidates with nothing to look up are scored straight away
+    for index, count in list(remaining.items()):
+        if count == 0:
+            del remaining[index]
+            yield combine(index)
+
+    submit_next()
+    while in_flight:
+        done, _ = wait(in_flight, timeout=max(expires_at - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        finished = []
+        for future in done:
+            for index in in_flight.pop(future):
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    del remaining[index]
+                    finished.append(index)
+        submit_next()
+        for index in finished:
+            yield combine(index)
+
+    # Deadline expired: score what finished and cancel the rest
+    tasks.clear()
+    for index in sorted(remaining):
+        yield combine(index)
+
+
+# Materialized on the candidate row by save_candidate and utils.score_refresher
+BACKGROUND_SCORE_FIELDS = ('background_score', 'github_score', 'linkedin_score', 'public_presence_score',
+                           'background_scored_at')
+
+
+def background_score_fields(score: int, components: Dict[str, int]) -> Dict:
+    """The BACKGROUND_SCORE_FIELDS of a candidate scored just now."""
+    return {
+        'background_score': score,
+        'github_score': components['github'],
+        'linkedin_score': components['linkedin'],
+        'public_presence_score': components['public_presence'],
+        'background_scored_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def score_candidate(candidate: Dict, github_token: Optional[str] = None, deadline: Optional[float] = None) -> Dict:
+    """
+    Score one candidate for storing on its row.
+    Args:
+        candidate (Dict): Candidate data (uses 'github', 'linkedin' and 'name')
+        github_token (str, optional): GitHub personal access token for higher rate limits
+        deadline (float, optional): Seconds to wait for the lookups, defaults to BACKGROUND_SCORE_DEADLINE
+    Returns:
+        Dict: BACKGROUND_SCORE_FIELDS, or an empty dict if a lookup missed the deadline
+            (the refresher scores the candidate later)
+    """
+    for _, score, pending, components in iter_background_scores([candidate], github_token, deadline):
+        if not pending:
+            return background_score_fields(score, components)
+    return {}
+
+
 if __name__ == "__main__":
     # Test GitHub scoring (scraping)
     github_url_sushtend = "https://github.com/sushtend/"
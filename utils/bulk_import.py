@@ -0,0 +1,206 @@
+"""
+Bulk import a directory or zip archive of PDF resumes.
+
+PDF extraction runs in a process pool, Gemini parses run with bounded
+concurrency and candidates are upserted in batches. Progress is recorded in
+a checkpoint file so an interrupted import can be resumed.
+
+Usage:
+    python -m utils.bulk_import resumes/ [--checkpoint import.checkpoint] [--batch-size 100]
+"""
+import argparse
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.pdf_extractor import extract_text_from_pdf
+
+
+def iter_resumes(source: str) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (name, path or bytes) for every PDF in a directory tree or zip archive.
+
+    Args:
+        source (str): Directory or .zip path
+
+    Yields:
+        Tuple[str, object]: Resume name and either a file path or the PDF bytes
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith('.pdf'):
+                    yield name, archive.read(name)
+    else:
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                if filename.lower().endswith('.pdf'):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, source), path
+
+
+def _extract(name: str, data) -> Tuple[str, Optional[str], float]:
+    """Extract resume text in a worker process."""
+    start = time.perf_counter()
+    if isinstance(data, bytes):
+        text = extract_text_from_pdf(io.BytesIO(data))
+    else:
+        with open(data, 'rb') as f:
+            text = extract_text_from_pdf(f)
+    return name, text, time.perf_counter() - start
+
+
+def _parse(name: str, text: str) -> Tuple[str, Optional[Dict], float]:
+    """Parse resume text with Gemini on a worker thread."""
+    from utils.gemini import parse_resume_with_gemini
+    start = time.perf_counter()
+    parsed_data, _ = parse_resume_with_gemini(text)
+    return name, parsed_data, time.perf_counter() - start
+
+
+def load_checkpoint(path: str) -> Dict[str, str]:
+    """
+    Read the checkpoint file.
+
+    Returns:
+        Dict[str, str]: Resume name -> status ('done' or 'failed')
+    """
+    done = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done[entry['source']] = entry['status']
+    return done
+
+
+def _write_checkpoint(path: str, entries: List[Dict]):
+    if path and entries:
+        with open(path, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+
+
+def bulk_import(source: str, checkpoint: Optional[str] = None, extract_workers: Optional[int] = None,
+                llm_concurrency: int = 4, batch_size: int = 100, retry_failed: bool = False) -> Dict:
+    """
+    Import every resume under `source`.
+
+    Args:
+        source (str): Directory or .zip of PDF resumes
+        checkpoint (str, optional): Checkpoint file used to skip already imported resumes
+        extract_workers (int, optional): Extraction processes, defaults to the CPU count
+        llm_concurrency (int): Maximum concurrent Gemini calls
+        batch_size (int): Candidates per upsert request
+        retry_failed (bool): Retry resumes recorded as failed in the checkpoint
+
+    Returns:
+        Dict: Counts, per-stage timings and throughput
+    """
+    previous = load_checkpoint(checkpoint)
+    skip = {name for name, status in previous.items() if status == 'done' or not retry_failed}
+    stats = {'imported': 0, 'failed': 0, 'skipped': 0,
+             'extract_seconds': 0.0, 'parse_seconds': 0.0, 'upsert_seconds': 0.0}
+    batch, batch_sources, failures = [], [], []
+    start = time.perf_counter()
+
+    def flush():
+        if not batch:
+            return
+        upsert_start = time.perf_counter()
+        try:
+            from utils.supabase_client import save_candidates
+            if not save_candidates(batch):
+                raise RuntimeError('no rows saved')
+            stats['imported'] += len(batch)
+            _write_checkpoint(checkpoint, [{'source': s, 'status': 'done'} for s in batch_sources])
+        except Exception as e:
+            print(f"Error upserting batch of {len(batch)} candidates: {str(e)}")
+            stats['failed'] += len(batch)
+            _write_checkpoint(checkpoint, [{'source': s, 'status': 'failed'} for s in batch_sources])
+        stats['upsert_seconds'] += time.perf_counter() - upsert_start
+        batch.clear()
+        batch_sources.clear()
+
+    def fail(name: str, reason: str):
+        print(f"Skipping {name}: {reason}")
+        stats['failed'] += 1
+        failures.append({'source': name, 'status': 'failed'})
+
+    with ProcessPoolExecutor(max_workers=extract_workers) as processes, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as threads:
+        pending = {}
+        # Bound the work in flight so zip contents aren't all held in memory at once
+        max_in_flight = (extract_workers or os.cpu_count() or 1) * 4 + llm_concurrency * 2
+        resumes = iter_resumes(source)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                item = next(resumes, None)
+                if item is None:
+                    exhausted = True
+                elif item[0] in skip:
+                    stats['skipped'] += 1
+                else:
+                    pending[processes.submit(_extract, *item)] = 'extract'
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = pending.pop(future)
+                if stage == 'extract':
+                    name, text, seconds = future.result()
+                    stats['extract_seconds'] += seconds
+                    if text:
+                        pending[threads.submit(_parse, name, text)] = 'parse'
+                    else:
+                        fail(name, 'no text extracted')
+                else:
+                    name, parsed_data, seconds = future.result()
+                    stats['parse_seconds'] += seconds
+                    if not parsed_data or not parsed_data.get('email'):
+                        fail(name, 'could not parse an email address')
+                        continue
+                    batch.append(parsed_data)
+                    batch_sources.append(name)
+                    if len(batch) >= batch_size:
+                        flush()
+            _write_checkpoint(checkpoint, failures)
+            failures.clear()
+        flush()
+
+    elapsed = time.perf_counter() - start
+    processed = stats['imported'] + stats['failed']
+    stats['elapsed_seconds'] = elapsed
+    stats['resumes_per_second'] = processed / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import PDF resumes into the candidates table.')
+    parser.add_argument('source', help='Directory or .zip of PDF resumes')
+    parser.add_argument('--checkpoint', default='bulk_import.checkpoint',
+                        help='Checkpoint file for resuming (default: %(default)s)')
+    parser.add_argument('--extract-workers', type=int, default=None, help='PDF extraction processes')
+    parser.add_argument('--llm-concurrency', type=int, default=4, help='Concurrent Gemini calls')
+    parser.add_argument('--batch-size', type=int, default=100, help='Candidates per upsert')
+    parser.add_argument('--retry-failed', action='store_true', help='Retry resumes that failed previously')
+    args = parser.parse_args()
+
+    stats = bulk_import(args.source, checkpoint=args.checkpoint, extract_workers=args.extract_workers,
+                        llm_concurrency=args.llm_concurrency, batch_size=args.batch_size,
+                        retry_failed=args.retry_failed)
+    print(f"Imported {stats['imported']}, failed {stats['failed']}, skipped {stats['skipped']} "
+          f"in {stats['elapsed_seconds']:.1f}s ({stats['resumes_per_second']:.2f} resumes/sec)")
+    print(f"Stage time: extract {stats['extract_seconds']:.1f}s, parse {stats['parse_seconds']:.1f}s, "
+          f"upsert {stats['upsert_seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
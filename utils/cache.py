@@ -0,0 +1,199 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Default directory for on-disk caches (override with CACHE_DIR)
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache'))
+# Disk reads queue an access-time update; queued updates are written together every
+# this many reads (and with the next write), instead of one UPDATE and commit per read
+CACHE_ACCESS_FLUSH_EVERY = int(os.getenv('CACHE_ACCESS_FLUSH_EVERY', '64'))
+
+
+class PersistentCache:
+    """
+    Size-bounded key/value cache with an optional TTL and SQLite backing.
+
+    Values must be JSON serializable. Recently used entries are kept in an
+    in-process LRU; every entry is also written to a SQLite file so the cache
+    survives restarts and is shared by all worker processes on the host.
+    The database is only opened on first use.
+    """
+
+    def __init__(self, name: str, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_entries: int = 10000, memory_entries: int = 1024):
+        """
+        Args:
+            name (str): Cache name, used as the SQLite table name
+            path (str, optional): SQLite file path, defaults to CACHE_DIR/<name>.sqlite3.
+                Pass ':memory:' for a process-local cache.
+            ttl (float, optional): Seconds before an entry is considered stale, None for no expiry
+            max_entries (int): Maximum number of entries kept on disk
+            memory_entries (int): Maximum number of entries kept in process memory, 0 to disable
+        """
+        self.name = name
+        self.path = path or os.path.join(CACHE_DIR, f'{name}.sqlite3')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._sets_since_prune = 0
+        self._pending_accesses = {}  # key -> accessed_at not written to disk yet
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            if self.path != ':memory:':
+                conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}" ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.name}_accessed" ON "{self.name}" (accessed_at)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, value: Any, stored_at: float):
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def is_fresh(self, stored_at: float) -> bool:
+        """Return True if an entry stored at `stored_at` is still within the TTL."""
+        return self.ttl is None or (time.time() - stored_at) < self.ttl
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up an entry regardless of its age.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[Tuple[Any, float]]: (value, stored_at) if present, None otherwise
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            conn = self._connect()
+            row = conn.execute(
+                f'SELECT value, stored_at FROM "{self.name}" WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_accesses[key] = time.time()
+            if len(self._pending_accesses) >= CACHE_ACCESS_FLUSH_EVERY:
+                self._flush_accesses(conn)
+                conn.commit()
+            value, stored_at = json.loads(row[0]), row[1]
+            self._remember(key, value, stored_at)
+            return value, stored_at
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a fresh value, counting the lookup as a hit or a miss.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired
+        """
+        entry = self.get_entry(key)
+        fresh = entry is not None and self.is_fresh(entry[1])
+        with self._lock:
+            self._stats['hits' if fresh else 'misses'] += 1
+        return entry[0] if fresh else None
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries when over capacity."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._pending_accesses.pop(key, None)
+            self._flush_accesses(conn)
+            conn.execute(
+                f'INSERT OR REPLACE INTO "{self.name}" (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now)
+            )
+            conn.commit()
+            self._remember(key, value, now)
+            self._stats['sets'] += 1
+            self._sets_since_prune += 1
+            if self._sets_since_prune >= 64:
+                self._prune(conn)
+
+    def touch(self, key: str):
+        """Mark an entry as fresh again, e.g. after a successful revalidation."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._pending_accesses.pop(key, None)
+            conn.execute(
+                f'UPDATE "{self.name}" SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key)
+            )
+            conn.commit()
+            if key in self._memory:
+                self._memory[key] = (self._memory[key][0], now)
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,))
+            conn.commit()
+            self._memory.pop(key, None)
+            self._pending_accesses.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f'DELETE FROM "{self.name}"')
+            conn.commit()
+            self._memory.clear()
+            self._pending_accesses.clear()
+
+    def _flush_accesses(self, conn: sqlite3.Connection):
+        """Write the queued access times (uncommitted; call with the lock held)."""
+        if self._pending_accesses:
+            conn.executemany(f'UPDATE "{self.name}" SET accessed_at = ? WHERE key = ?',
+                             [(accessed_at, key) for key, accessed_at in self._pending_accesses.items()])
+            self._pending_accesses.clear()
+
+    def _prune(self, conn: sqlite3.Connection):
+        self._sets_since_prune = 0
+        count = conn.execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f'DELETE FROM "{self.name}" WHERE key IN '
+                f'(SELECT key FROM "{self.name}" ORDER BY accessed_at LIMIT ?)', (overflow,)
+            )
+            conn.commit()
+            self._stats['evictions'] += overflow
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and the current size.
+
+        Returns:
+            Dict[str, int]: hits, misses, sets, evictions, size and memory_size
+        """
+        with self._lock:
+            size = self._connect().execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+            return dict(self._stats, size=size, memory_size=len(self._memory))
@@ -0,0 +1,261 @@
+import bisect
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+# Seconds since the last sync with the candidate store after which searches stop using the index
+CANDIDATE_INDEX_MAX_STALENESS = float(os.getenv('CANDIDATE_INDEX_MAX_STALENESS', '120'))
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of a lowercase string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def normalize_skills(skills: Optional[Iterable]) -> List[str]:
+    """
+    Skills as every candidate store compares them: stripped, lowercased, deduplicated and sorted.
+
+    The in-memory index, the SQLite skills table and the Supabase skills_normalized
+    column all hold skills in this form, so a skills filter matches the same
+    candidates whichever one answers it.
+
+    Args:
+        skills (Iterable, optional): Skill names as entered or parsed
+    Returns:
+        List[str]: Normalized skills, empty ones dropped
+    """
+    return sorted({str(s).strip().lower() for s in skills or []} - {''})
+
+
+class CandidateIndex:
+    """
+    In-memory inverted index answering the recruiter's structured filters.
+
+    Holds a posting list (set of row numbers) per skill, experience years in a
+    sorted array for range lookups, and a trigram index over locations so a
+    substring match doesn't need to scan every row. Rows are looked up by
+    candidate id; only ids are returned, the caller fetches full rows.
+
+    The index lives in one process's memory. Each web worker loads its own
+    copy at warm-up, then applies the rows changed in the candidate store
+    since its last sync every few seconds (see
+    utils.supabase_client.sync_candidate_indexes), so writes from other
+    workers and processes (bulk imports, the score refresher) show up after
+    one sync interval. `fresh` is False once the last sync is older than
+    CANDIDATE_INDEX_MAX_STALENESS, and searches then go to the store.
+    """
+
+    def __init__(self):
+        self._ids = []
+        self._rows = {}
+        self._skills = defaultdict(set)
+        self._trigrams = defaultdict(set)
+        self._row_skills = []
+        self._row_locations = []
+        self._row_experience = []
+        # Parallel sorted arrays of (experience_years, row)
+        self._experience_years = []
+        self._experience_rows = []
+        self._experience_sorted = True  # False after add_many() until the next lookup sorts them
+        self._lock = threading.RLock()
+        self.ready = False
+        self.synced_at = None  # time.monotonic() of the last load or sync
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the index is loaded and was synced with the store within CANDIDATE_INDEX_MAX_STALENESS."""
+        return (self.ready and self.synced_at is not None
+                and time.monotonic() - self.synced_at <= CANDIDATE_INDEX_MAX_STALENESS)
+
+    def mark_synced(self):
+        """Record that the index holds every change in the store up to now."""
+        self.synced_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def upsert(self, candidate: Dict):
+        """
+        Add a candidate or replace its postings.
+
+        Args:
+            candidate (Dict): Candidate row with 'id', 'skills', 'experience_years' and 'current_location'
+        """
+        candidate_id = candidate.get('id')
+        if candidate_id is None:
+            return
+        skills, location, experience = self._fields(candidate)
+
+        with self._lock:
+            self._sort_experience()
+            row = self._rows.get(candidate_id)
+            if row is None:
+                row = len(self._ids)
+                self._ids.append(candidate_id)
+                self._rows[candidate_id] = row
+                self._row_skills.append(set())
+                self._row_locations.append('')
+                self._row_experience.append(None)
+            else:
+                self._remove_postings(row)
+
+            for skill in skills:
+                self._skills[skill].add(row)
+            for gram in _trigrams(location):
+                self._trigrams[gram].add(row)
+            pos = bisect.bisect_left(self._experience_years, experience)
+            self._experience_years.insert(pos, experience)
+            self._experience_rows.insert(pos, row)
+            self._row_skills[row] = skills
+            self._row_locations[row] = location
+            self._row_experience[row] = experience
+
+    @staticmethod
+    def _fields(candidate: Dict):
+        skills = set(normalize_skills(candidate.get('skills')))
+        location = (candidate.get('current_location') or '').lower()
+        try:
+            experience = float(candidate.get('experience_years') or 0)
+        except (TypeError, ValueError):
+            experience = 0.0
+        return skills, location, experience
+
+    def add_many(self, candidates: Iterable[Dict]):
+        """
+        Add a batch of candidates, e.g. a page of the warm-up scan.
+
+        New rows are appended without keeping the experience array sorted;
+        it is sorted once, on the next lookup or single upsert, instead of
+        an O(n) insert per row.
+
+        Args:
+            candidates (Iterable[Dict]): Candidate rows, as for upsert()
+        """
+        with self._lock:
+            for candidate in candidates:
+                candidate_id = candidate.get('id')
+                if candidate_id is None:
+                    continue
+                if candidate_id in self._rows:
+                    self.upsert(candidate)
+                    continue
+                skills, location, experience = self._fields(candidate)
+                row = len(self._ids)
+                self._ids.append(candidate_id)
+                self._rows[candidate_id] = row
+                for skill in skills:
+                    self._skills[skill].add(row)
+                for gram in _trigrams(location):
+                    self._trigrams[gram].add(row)
+                self._row_skills.append(skills)
+                self._row_locations.append(location)
+                self._row_experience.append(experience)
+                self._experience_years.append(experience)
+                self._experience_rows.append(row)
+                self._experience_sorted = False
+
+    def _sort_experience(self):
+        if not self._experience_sorted:
+            pairs = sorted(zip(self._experience_years, self._experience_rows))
+            self._experience_years = [experience for experience, _ in pairs]
+            self._experience_rows = [row for _, row in pairs]
+            self._experience_sorted = True
+
+    def remove(self, candidate_id):
+        """Drop a candidate from the index."""
+        with self._lock:
+            self._sort_experience()
+            row = self._rows.pop(candidate_id, None)
+            if row is not None:
+                self._remove_postings(row)
+                self._row_skills[row] = set()
+                self._row_locations[row] = ''
+                self._row_experience[row] = None
+
+    def _remove_postings(self, row: int):
+        for skill in self._row_skills[row]:
+            self._skills[skill].discard(row)
+        for gram in _trigrams(self._row_locations[row]):
+            self._trigrams[gram].discard(row)
+        experience = self._row_experience[row]
+        if experience is not None:
+            lo = bisect.bisect_left(self._experience_years, experience)
+            hi = bisect.bisect_right(self._experience_years, experience)
+            pos = self._experience_rows.index(row, lo, hi)
+            del self._experience_years[pos]
+            del self._experience_rows[pos]
+
+    def load(self, candidates: Iterable[Dict] = ()):
+        """
+        Bulk load candidates and mark the index as ready.
+
+        Args:
+            candidates (Iterable[Dict]): Candidate rows, if not already added with add_many()
+        """
+        self.add_many(candidates)
+        with self._lock:
+            self._sort_experience()
+        self.mark_synced()
+        self.ready = True
+
+    def search(self, skills: Optional[List[str]] = None, min_experience_years: Optional[float] = None,
+               location: Optional[str] = None) -> List:
+        """
+        Return ids of candidates matching every given filter.
+
+        Skills use containment (the candidate has all of them, case-insensitive),
+        experience is a lower bound and location is a case-insensitive substring.
+
+        Args:
+            skills (List[str], optional): Required skills
+            min_experience_years (float, optional): Minimum years of experience
+            location (str, optional): Location substring
+
+        Returns:
+            List: Matching candidate ids, in index order
+        """
+        try:
+            min_experience_years = float(min_experience_years) if min_experience_years else None
+        except (TypeError, ValueError):
+            min_experience_years = None
+
+        with self._lock:
+            self._sort_experience()
+            sets = []
+            for skill in normalize_skills(skills):
+                sets.append(self._skills.get(skill, set()))
+
+            location = (location or '').lower()
+            if location:
+                grams = _trigrams(location)
+                if grams:
+                    sets.extend(self._trigrams.get(g, set()) for g in grams)
+
+            if sets:
+                sets.sort(key=len)
+                rows = set(sets[0])
+                for s in sets[1:]:
+                    if not rows:
+                        break
+                    rows &= s
+                if min_experience_years:
+                    rows = {r for r in rows if self._row_experience[r] is not None
+                            and self._row_experience[r] >= min_experience_years}
+            elif min_experience_years:
+                start = bisect.bisect_left(self._experience_years, min_experience_years)
+                rows = set(self._experience_rows[start:])
+            else:
+                rows = set(self._rows.values())
+
+            # Trigrams only narrow the set down, confirm the actual substring
+            if location:
+                rows = {r for r in rows if location in self._row_locations[r]}
+
+            return [self._ids[r] for r in sorted(rows)]
+
+
+# Process-wide index, kept up to date by utils.supabase_client.save_candidate
+candidate_index = CandidateIndex()
@@ -0,0 +1,411 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from utils.cache import CACHE_DIR
+from utils.candidate_index import normalize_skills
+
+# Which CandidateRepository get_repository() returns: 'supabase' or 'sqlite'
+CANDIDATE_STORE = os.getenv('CANDIDATE_STORE', 'supabase').lower()
+# SQLite file used when CANDIDATE_STORE=sqlite (':memory:' for a throwaway store)
+CANDIDATE_STORE_PATH = os.getenv('CANDIDATE_STORE_PATH', os.path.join(CACHE_DIR, 'candidates.sqlite3'))
+# Fields update_scores() writes: the stored background score and the refresher's last attempt
+SCORE_UPDATE_FIELDS = ('background_score', 'github_score', 'linkedin_score', 'public_presence_score',
+                       'background_scored_at', 'background_score_attempted_at')
+
+
+class CandidateRepository(ABC):
+    """
+    Storage for candidate rows.
+
+    Rows are dicts keyed by column name with 'id' and 'email' always present;
+    'skills' is a list. Searches and scans are ordered by id so callers can
+    page with a keyset cursor (the last id of the previous page); ranked
+    searches page on (background_score, id) instead.
+    """
+
+    @abstractmethod
+    def get(self, candidate_id: str, columns: str = '*') -> Optional[Dict]:
+        """Return the candidate with this id, or None."""
+
+    @abstractmethod
+    def get_by_email(self, email: str, columns: str = '*') -> Optional[Dict]:
+        """Return the candidate with this email, or None."""
+
+    @abstractmethod
+    def get_many(self, candidate_ids: List[str], columns: str = '*') -> List[Dict]:
+        """Return the candidates with these ids, ordered by id."""
+
+    @abstractmethod
+    def search(self, skills: Optional[List[str]] = None, min_experience_years: Optional[float] = None,
+               location: Optional[str] = None, cursor: Optional[str] = None, limit: int = 20,
+               columns: str = '*') -> List[Dict]:
+        """
+        Return up to `limit` candidates matching every given filter, ordered by id.
+
+        Args:
+            skills (List[str], optional): Candidate must have all of these skills
+            min_experience_years (float, optional): Minimum years of experience
+            location (str, optional): Substring of the candidate's location (case-insensitive)
+            cursor (str, optional): Only return candidates with an id greater than this
+            limit (int): Maximum number of rows
+            columns (str): Comma-separated columns to return, or '*'
+        """
+
+    @abstractmethod
+    def search_by_background_score(self, skills: Optional[List[str]] = None,
+                                   min_experience_years: Optional[float] = None, location: Optional[str] = None,
+                                   after: Optional[Tuple[Optional[int], str]] = None, limit: int = 20,
+                                   columns: str = '*') -> List[Dict]:
+        """
+        Like search(), ordered by background score, highest first, then by id.
+        Candidates that have never been scored come last.
+
+        Args:
+            after (Tuple[Optional[int], str], optional): (background_score, id) of the last row
+                of the previous page; only rows ordered after it are returned
+        """
+
+    @abstractmethod
+    def upsert(self, candidate: Dict) -> Tuple[Optional[Dict], bool]:
+        """
+        Insert or update a candidate keyed on email.
+        Fields missing from `candidate` keep their current value on update.
+
+        Returns:
+            Tuple[Optional[Dict], bool]: (saved row, inserted)
+        """
+
+    @abstractmethod
+    def upsert_many(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        Insert or update many candidates keyed on email (unique within the list).
+
+        Returns:
+            List[Dict]: The saved rows
+        """
+
+    @abstractmethod
+    def update_scores(self, updates: List[Dict]) -> List[Dict]:
+        """
+        Update the stored background score fields of existing candidates by id. Ids that no
+        longer exist are skipped, never inserted. Fields missing from an update keep their value.
+
+        Args:
+            updates (List[Dict]): Rows with 'id' and any of SCORE_UPDATE_FIELDS
+
+        Returns:
+            List[Dict]: The updated rows
+        """
+
+    @abstractmethod
+    def due_for_scoring(self, scored_before: str, limit: int = 100, columns: str = '*') -> List[Dict]:
+        """
+        Return up to `limit` candidates whose background score is missing or older than `scored_before`
+        (an ISO 8601 timestamp). Candidates never attempted come first, then the least recently
+        attempted (background_score_attempted_at), so candidates whose lookups keep getting
+        deferred don't hold the front of the queue.
+        """
+
+    @abstractmethod
+    def changed_since(self, since: str, after: Optional[Tuple[str, str]] = None, limit: int = 1000,
+                      columns: str = '*') -> List[Dict]:
+        """
+        Return up to `limit` candidates written at or after `since` (an ISO 8601 timestamp),
+        ordered by updated_at, then id.
+
+        Args:
+            since (str): Earliest updated_at returned
+            after (Tuple[str, str], optional): (updated_at, id) of the last row of the previous
+                page; only rows ordered after it are returned
+        """
+
+    def scan(self, columns: str = '*', page_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield every candidate in pages of up to `page_size` rows, ordered by id."""
+        cursor = None
+        while True:
+            rows = self.search(cursor=cursor, limit=page_size, columns=columns)
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            cursor = str(rows[-1]['id'])
+
+
+class SQLiteCandidateRepository(CandidateRepository):
+    """
+    Candidate storage in a local SQLite file, for offline development and load testing.
+
+    Skills are also kept in a (skill, candidate_id) table so a skills filter is
+    an index lookup per skill. Skills are compared normalized (see
+    normalize_skills), like the in-memory candidate index.
+    """
+
+    # Column name -> SQLite type. List and dict values are stored as JSON text.
+    COLUMNS = {
+        'id': 'TEXT PRIMARY KEY',
+        'name': 'TEXT',
+        'email': 'TEXT NOT NULL UNIQUE',
+        'phone': 'TEXT',
+        'skills': "TEXT NOT NULL DEFAULT '[]'",
+        'experience_years': 'INTEGER',
+        'education': 'TEXT',
+        'current_location': 'TEXT',
+        'linkedin': 'TEXT',
+        'github': 'TEXT',
+        'resume_sha256': 'TEXT',
+        'resume_text_sha256': 'TEXT',
+        'resume_minhash': 'TEXT',
+        'background_score': 'INTEGER',
+        'github_score': 'INTEGER',
+        'linkedin_score': 'INTEGER',
+        'public_presence_score': 'INTEGER',
+        'background_scored_at': 'TEXT',
+        'background_score_attempted_at': 'TEXT',
+        'created_at': 'TEXT DEFAULT CURRENT_TIMESTAMP',
+        'updated_at': 'TEXT',
+    }
+    JSON_COLUMNS = {'skills', 'resume_minhash'}
+
+    def __init__(self, path: str = CANDIDATE_STORE_PATH):
+        """
+        Args:
+            path (str): SQLite file path, or ':memory:'
+        """
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.path != ':memory:':
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            columns = ', '.join(f'{name} {kind}' for name, kind in self.COLUMNS.items())
+            conn.execute(f'CREATE TABLE IF NOT EXISTS candidates ({columns})')
+            # Add columns introduced after the file was created
+            existing = {row['name'] for row in conn.execute('PRAGMA table_info(candidates)')}
+            for name, kind in self.COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE candidates ADD COLUMN {name} {kind.replace("UNIQUE", "")}')
+            conn.execute('CREATE TABLE IF NOT EXISTS candidate_skills ('
+                         'skill TEXT NOT NULL, candidate_id TEXT NOT NULL, '
+                         'PRIMARY KEY (skill, candidate_id)) WITHOUT ROWID')
+            conn.execute('CREATE INDEX IF NOT EXISTS candidate_skills_candidate ON candidate_skills (candidate_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS candidates_experience ON candidates (experience_years)')
+            conn.execute('CREATE INDEX IF NOT EXISTS candidates_scored_at ON candidates (background_scored_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS candidates_score_attempted_at '
+                         'ON candidates (background_score_attempted_at, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS candidates_updated_at ON candidates (updated_at, id)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _select(self, columns: str) -> str:
+        if columns.strip() == '*':
+            return '*'
+        names = [c.strip() for c in columns.split(',') if c.strip()]
+        unknown = [c for c in names if c not in self.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown candidate columns: {', '.join(unknown)}")
+        return ', '.join(names)
+
+    def _row(self, row: sqlite3.Row) -> Dict:
+        data = dict(row)
+        for column in self.JSON_COLUMNS & data.keys():
+            if data[column] is not None:
+                data[column] = json.loads(data[column])
+        return data
+
+    def _value(self, column: str, value):
+        return json.dumps(value) if column in self.JSON_COLUMNS and value is not None else value
+
+    def get(self, candidate_id: str, columns: str = '*') -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute(
+                f'SELECT {self._select(columns)} FROM candidates WHERE id = ?', (str(candidate_id),)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def get_by_email(self, email: str, columns: str = '*') -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute(
+                f'SELECT {self._select(columns)} FROM candidates WHERE email = ?', (email,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def get_many(self, candidate_ids: List[str], columns: str = '*') -> List[Dict]:
+        rows = []
+        ids = [str(i) for i in candidate_ids]
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows.extend(conn.execute(
+                    f'SELECT {self._select(columns)} FROM candidates '
+                    f'WHERE id IN ({",".join("?" * len(chunk))}) ORDER BY id', chunk
+                ).fetchall())
+        return sorted((self._row(row) for row in rows), key=lambda row: row['id'])
+
+    @staticmethod
+    def _filters(skills: Optional[List[str]], min_experience_years: Optional[float],
+                 location: Optional[str]) -> Tuple[List[str], List]:
+        where, params = [], []
+        for skill in normalize_skills(skills):
+            where.append('EXISTS (SELECT 1 FROM candidate_skills s WHERE s.skill = ? AND s.candidate_id = c.id)')
+            params.append(skill)
+        if min_experience_years:
+            where.append('c.experience_years >= ?')
+            params.append(min_experience_years)
+        if location:
+            escaped = location.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("c.current_location LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        return where, params
+
+    def _query(self, columns: str, where: List[str], params: List, order: str, limit: int) -> List[Dict]:
+        sql = f'SELECT {self._select(columns)} FROM candidates c'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {order} LIMIT ?'
+        with self._lock:
+            rows = self._connect().execute(sql, params + [limit]).fetchall()
+        return [self._row(row) for row in rows]
+
+    def search(self, skills: Optional[List[str]] = None, min_experience_years: Optional[float] = None,
+               location: Optional[str] = None, cursor: Optional[str] = None, limit: int = 20,
+               columns: str = '*') -> List[Dict]:
+        where, params = self._filters(skills, min_experience_years, location)
+        if cursor:
+            where.append('c.id > ?')
+            params.append(str(cursor))
+        return self._query(columns, where, params, 'c.id', limit)
+
+    def search_by_background_score(self, skills: Optional[List[str]] = None,
+                                   min_experience_years: Optional[float] = None, location: Optional[str] = None,
+                                   after: Optional[Tuple[Optional[int], str]] = None, limit: int = 20,
+                                   columns: str = '*') -> List[Dict]:
+        where, params = self._filters(skills, min_experience_years, location)
+        if after:
+            score, candidate_id = after
+            if score is None:
+                where.append('(c.background_score IS NULL AND c.id > ?)')
+                params.append(str(candidate_id))
+            else:
+                where.append('(c.background_score < ? OR (c.background_score = ? AND c.id > ?) '
+                             'OR c.background_score IS NULL)')
+                params.extend([score, score, str(candidate_id)])
+        return self._query(columns, where, params, 'c.background_score IS NULL, c.background_score DESC, c.id', limit)
+
+    def due_for_scoring(self, scored_before: str, limit: int = 100, columns: str = '*') -> List[Dict]:
+        where = ['(c.background_scored_at IS NULL OR c.background_scored_at < ?)']
+        # NULLs sort first, so candidates never attempted lead
+        return self._query(columns, where, [scored_before], 'c.background_score_attempted_at, c.id', limit)
+
+    def changed_since(self, since: str, after: Optional[Tuple[str, str]] = None, limit: int = 1000,
+                      columns: str = '*') -> List[Dict]:
+        where, params = ['c.updated_at >= ?'], [since]
+        if after:
+            where.append('(c.updated_at > ? OR (c.updated_at = ? AND c.id > ?))')
+            params.extend([after[0], after[0], str(after[1])])
+        return self._query(columns, where, params, 'c.updated_at, c.id', limit)
+
+    def _upsert(self, conn: sqlite3.Connection, candidate: Dict) -> Tuple[Dict, bool]:
+        data = {k: v for k, v in candidate.items() if k in self.COLUMNS and k not in ('id', 'created_at')}
+        data['updated_at'] = datetime.now(timezone.utc).isoformat(timespec='microseconds')
+        existing = conn.execute('SELECT id FROM candidates WHERE email = ?', (data['email'],)).fetchone()
+        candidate_id = existing['id'] if existing else str(uuid.uuid4())
+        if existing:
+            updates = {k: v for k, v in data.items() if k != 'email' and v is not None}
+            if updates:
+                conn.execute(
+                    f'UPDATE candidates SET {", ".join(f"{k} = ?" for k in updates)} WHERE id = ?',
+                    [self._value(k, v) for k, v in updates.items()] + [candidate_id]
+                )
+        else:
+            data['id'] = candidate_id
+            data.setdefault('skills', [])
+            conn.execute(
+                f'INSERT INTO candidates ({", ".join(data)}) VALUES ({", ".join("?" * len(data))})',
+                [self._value(k, v) for k, v in data.items()]
+            )
+        if data.get('skills') is not None:
+            if existing:
+                conn.execute('DELETE FROM candidate_skills WHERE candidate_id = ?', (candidate_id,))
+            conn.executemany(
+                'INSERT OR IGNORE INTO candidate_skills (skill, candidate_id) VALUES (?, ?)',
+                [(skill, candidate_id) for skill in normalize_skills(data['skills'])]
+            )
+        row = conn.execute('SELECT * FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
+        return self._row(row), not existing
+
+    def upsert(self, candidate: Dict) -> Tuple[Optional[Dict], bool]:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return self._upsert(conn, candidate)
+
+    def upsert_many(self, candidates: List[Dict]) -> List[Dict]:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return [self._upsert(conn, candidate)[0] for candidate in candidates if candidate.get('email')]
+
+    def update_scores(self, updates: List[Dict]) -> List[Dict]:
+        updated_at = datetime.now(timezone.utc).isoformat(timespec='microseconds')
+        rows = []
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for update in updates:
+                    fields = {k: v for k, v in update.items() if k in SCORE_UPDATE_FIELDS and v is not None}
+                    fields['updated_at'] = updated_at
+                    if conn.execute(f'UPDATE candidates SET {", ".join(f"{k} = ?" for k in fields)} WHERE id = ?',
+                                    list(fields.values()) + [str(update['id'])]).rowcount:
+                        rows.append(conn.execute('SELECT * FROM candidates WHERE id = ?',
+                                                 (str(update['id']),)).fetchone())
+        return [self._row(row) for row in rows]
+
+    def count(self) -> int:
+        """Number of stored candidates."""
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> CandidateRepository:
+    """
+    Return the process-wide candidate repository selected by CANDIDATE_STORE,
+    creating it on first use.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                if CANDIDATE_STORE == 'sqlite':
+                    _repository = SQLiteCandidateRepository(CANDIDATE_STORE_PATH)
+                elif CANDIDATE_STORE == 'supabase':
+                    from utils.supabase_client import SupabaseCandidateRepository
+                    _repository = SupabaseCandidateRepository()
+                else:
+                    raise ValueError(f"Unknown CANDIDATE_STORE '{CANDIDATE_STORE}', expected 'supabase' or 'sqlite'")
+    return _repository
+
+
+def set_repository(repository: Optional[CandidateRepository]):
+    """Replace the process-wide repository, e.g. with a SQLite store in a benchmark."""
+    global _repository
+    with _repository_lock:
+        _repository = repository
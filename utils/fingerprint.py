@@ -0,0 +1,317 @@
+import difflib
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+
+# MinHash signature size and LSH banding (BANDS * ROWS must equal NUM_PERM)
+NUM_PERM = 128
+LSH_BANDS = 32
+LSH_ROWS = 4
+SHINGLE_SIZE = 5
+# Estimated Jaccard similarity above which two resumes are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.85'))
+# Number of recent resume texts kept for diffing near-duplicates
+FINGERPRINT_TEXT_CACHE = int(os.getenv('FINGERPRINT_TEXT_CACHE', '1000'))
+# Candidate columns holding a resume's fingerprint
+FINGERPRINT_FIELDS = ('resume_sha256', 'resume_text_sha256', 'resume_minhash')
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, NUM_PERM).astype(np.uint64)
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_resume_text(text: str) -> str:
+    """
+    Lowercase resume text and reduce it to single-spaced words.
+    Args:
+        text (str): Extracted resume text
+    Returns:
+        str: Normalized text
+    """
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def minhash_signature(normalized_text: str) -> np.ndarray:
+    """
+    MinHash signature over word shingles of normalized text.
+    Args:
+        normalized_text (str): Output of normalize_resume_text
+    Returns:
+        np.ndarray: uint32 signature of length NUM_PERM
+    """
+    words = normalized_text.split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    hashes %= _MERSENNE_PRIME
+    # (a * x + b) mod p for every shingle and permutation; fits in uint64 since a, x < 2^31
+    permuted = (hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 of a file on disk, read in chunks.
+    Args:
+        path (str): File path
+        chunk_size (int): Bytes read at a time
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_fingerprint(resume_bytes: Optional[bytes], resume_text: str, resume_sha256: Optional[str] = None) -> Dict:
+    """
+    Compute the exact and near-duplicate fingerprints of a resume.
+    Args:
+        resume_bytes (bytes): Raw uploaded file, or None when `resume_sha256` is given
+        resume_text (str): Extracted text
+        resume_sha256 (str, optional): SHA-256 of the file, e.g. from file_sha256()
+    Returns:
+        Dict: resume_sha256, resume_text_sha256 and resume_minhash (list of ints)
+    """
+    normalized = normalize_resume_text(resume_text)
+    return {
+        'resume_sha256': resume_sha256 or hashlib.sha256(resume_bytes).hexdigest(),
+        'resume_text_sha256': hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+        'resume_minhash': minhash_signature(normalized).tolist()
+    }
+
+
+# Odd multipliers used to fold the LSH_ROWS values of a band into one 64-bit hash
+_BAND_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+                              0x165667B19E3779F9, 0xD6E8FEB86659FD93][:LSH_ROWS], dtype=np.uint64)
+
+
+def band_hashes(signature: np.ndarray) -> np.ndarray:
+    """Fold each LSH band of a signature into a single uint64 hash."""
+    bands = signature.astype(np.uint64).reshape(LSH_BANDS, LSH_ROWS)
+    return (bands * _BAND_MULTIPLIERS).sum(axis=1, dtype=np.uint64)
+
+
+class FingerprintIndex:
+    """
+    Exact-hash maps plus an LSH index over MinHash signatures.
+
+    Band hashes are kept in one sorted NumPy array per band, so a near-duplicate
+    lookup is LSH_BANDS binary searches plus a comparison against the few
+    resumes sharing a band. Resumes added since the arrays were last sorted sit
+    in a small dict until the next rebuild. Memory is a few KB per resume, so a
+    million resumes fit in memory and lookups stay sub-millisecond.
+    Each entry stores a reference (a candidate id and/or the parsed resume).
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._keys = []
+        self._rows = {}
+        self._entries = {}
+        self._by_bytes = {}
+        self._by_text = {}
+        self._signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self._band_hashes = np.zeros((capacity, LSH_BANDS), dtype=np.uint64)
+        self._has_signature = np.zeros(capacity, dtype=bool)
+        # Per-band sorted hashes and matching rows, plus rows added since the last sort
+        self._sorted_hashes = np.zeros((LSH_BANDS, 0), dtype=np.uint64)
+        self._sorted_rows = np.zeros((LSH_BANDS, 0), dtype=np.int32)
+        self._recent = defaultdict(list)
+        self._recent_rows = set()
+        self._texts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _grow(self):
+        capacity = self._signatures.shape[0] * 2
+        for name in ('_signatures', '_band_hashes', '_has_signature'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _rebuild(self):
+        """Merge recently added rows into the sorted per-band arrays."""
+        new_rows = np.array(sorted(self._recent_rows), dtype=np.int32)
+        new_hashes = self._band_hashes[new_rows].T
+        order = np.argsort(new_hashes, axis=1)
+        hashes = np.concatenate([self._sorted_hashes, np.take_along_axis(new_hashes, order, axis=1)], axis=1)
+        rows = np.concatenate([self._sorted_rows, new_rows[order]], axis=1)
+        # Two sorted runs: the stable sort (timsort) merges them in linear time
+        merged = np.argsort(hashes, axis=1, kind='stable')
+        self._sorted_hashes = np.take_along_axis(hashes, merged, axis=1)
+        self._sorted_rows = np.take_along_axis(rows, merged, axis=1)
+        self._recent.clear()
+        self._recent_rows.clear()
+
+    def add(self, key, fingerprint: Dict, candidate_id=None, parsed_data: Optional[Dict] = None,
+            raw_response: Optional[str] = None, text: Optional[str] = None):
+        """
+        Index a resume.
+        Args:
+            key: Unique key for the resume (e.g. candidate email or id)
+            fingerprint (Dict): Output of compute_fingerprint
+            candidate_id (optional): Saved candidate id
+            parsed_data (Dict, optional): Parsed resume to reuse on a match
+            raw_response (str, optional): Raw Gemini response for the parse
+            text (str, optional): Resume text, kept in a bounded cache for diffing
+        """
+        with self._lock:
+            if self._add(key, fingerprint, candidate_id, parsed_data, raw_response) is not None:
+                self._index_recent([self._rows[key]])
+            if text:
+                self._texts[key] = text
+                self._texts.move_to_end(key)
+                while len(self._texts) > FINGERPRINT_TEXT_CACHE:
+                    self._texts.popitem(last=False)
+
+    def add_many(self, items: Iterable[Tuple]):
+        """
+        Index many resumes at once, e.g. when loading saved candidates.
+        Args:
+            items: (key, fingerprint, candidate_id) tuples
+        """
+        with self._lock:
+            rows = [self._add(key, fingerprint, candidate_id) for key, fingerprint, candidate_id in items]
+            self._index_recent([row for row in rows if row is not None])
+
+    def _index_recent(self, rows):
+        """Make new rows searchable: sort them in once enough are pending, else keep them in the dict."""
+        if len(self._recent_rows) > max(1024, len(self._keys) // 16):
+            self._rebuild()
+            return
+        for row in rows:
+            for band, h in enumerate(self._band_hashes[row].tolist()):
+                self._recent[(band, h)].append(row)
+
+    def _add(self, key, fingerprint: Dict, candidate_id=None, parsed_data: Optional[Dict] = None,
+             raw_response: Optional[str] = None) -> Optional[int]:
+        """Store a resume's hashes and signature; returns its row if it has a signature."""
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == self._signatures.shape[0]:
+                self._grow()
+            self._keys.append(key)
+            self._rows[key] = row
+        entry = self._entries.setdefault(key, {})
+        replaced = False
+        for field, by_hash in (('resume_sha256', self._by_bytes), ('resume_text_sha256', self._by_text)):
+            if fingerprint.get(field):
+                digest = bytes.fromhex(fingerprint[field])
+                old = entry.get(field)
+                if old is not None and old != digest:
+                    # The key has a new resume: its old hashes must not find the new entry
+                    replaced = True
+                    if by_hash.get(old) == key:
+                        del by_hash[old]
+                by_hash[digest] = key
+                entry[field] = digest
+        if replaced:
+            # The stored parse and text belong to the old resume
+            entry.pop('parsed_data', None)
+            entry.pop('raw_response', None)
+            self._texts.pop(key, None)
+        entry.update({k: v for k, v in {
+            'candidate_id': candidate_id, 'parsed_data': parsed_data, 'raw_response': raw_response
+        }.items() if v is not None})
+        signature = fingerprint.get('resume_minhash')
+        if signature is None or len(signature) != NUM_PERM:
+            return None
+        signature = np.asarray(signature, dtype=np.uint32)
+        self._signatures[row] = signature
+        self._band_hashes[row] = band_hashes(signature)
+        self._has_signature[row] = True
+        self._recent_rows.add(row)
+        return row
+
+    def _match(self, key, similarity: float, kind: str) -> Dict:
+        entry = self._entries.get(key, {})
+        row = self._rows[key]
+        fingerprint = {field: entry[field].hex() for field in ('resume_sha256', 'resume_text_sha256') if field in entry}
+        if self._has_signature[row]:
+            fingerprint['resume_minhash'] = self._signatures[row].tolist()
+        return {
+            'key': key,
+            'candidate_id': entry.get('candidate_id'),
+            'parsed_data': entry.get('parsed_data'),
+            'raw_response': entry.get('raw_response'),
+            'fingerprint': fingerprint,
+            'text': self._texts.get(key),
+            'similarity': similarity,
+            'match': kind
+        }
+
+    def find_exact_bytes(self, resume_sha256: str) -> Optional[Dict]:
+        """Return the entry for an identical file, if any."""
+        with self._lock:
+            key = self._by_bytes.get(bytes.fromhex(resume_sha256))
+            return self._match(key, 1.0, 'exact') if key is not None else None
+
+    def find_exact_text(self, resume_text_sha256: str) -> Optional[Dict]:
+        """Return the entry for a resume with identical normalized text, if any."""
+        with self._lock:
+            key = self._by_text.get(bytes.fromhex(resume_text_sha256))
+            return self._match(key, 1.0, 'exact') if key is not None else None
+
+    def find_near_duplicate(self, signature, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Optional[Dict]:
+        """
+        Return the most similar indexed resume above `threshold`, if any.
+        Args:
+            signature: MinHash signature (array or list)
+            threshold (float): Minimum estimated Jaccard similarity
+        Returns:
+            Optional[Dict]: The entry with 'similarity' set
+        """
+        signature = np.asarray(signature, dtype=np.uint32)
+        hashes = band_hashes(signature)
+        with self._lock:
+            rows = set()
+            if self._sorted_hashes.shape[1]:
+                for band, h in enumerate(hashes):
+                    sorted_band = self._sorted_hashes[band]
+                    lo = np.searchsorted(sorted_band, h, 'left')
+                    hi = np.searchsorted(sorted_band, h, 'right')
+                    rows.update(self._sorted_rows[band, lo:hi].tolist())
+            for band, h in enumerate(hashes.tolist()):
+                rows.update(self._recent.get((band, h), ()))
+            rows = [r for r in rows if self._has_signature[r]]
+            if not rows:
+                return None
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            best = int(np.argmax(similarity))
+            if similarity[best] < threshold:
+                return None
+            return self._match(self._keys[rows[best]], float(similarity[best]), 'near')
+
+
+def diff_resumes(old_text: str, new_text: str, max_lines: int = 40) -> str:
+    """
+    Short unified diff between two resume texts.
+    Args:
+        old_text (str): Previously uploaded resume text
+        new_text (str): New resume text
+        max_lines (int): Maximum diff lines returned
+    Returns:
+        str: Diff text
+    """
+    diff = difflib.unified_diff(old_text.splitlines(), new_text.splitlines(),
+                                'previous', 'uploaded', lineterm='', n=0)
+    return '\n'.join(list(diff)[:max_lines])
+
+
+# Process-wide index, kept up to date by utils.supabase_client.save_candidate
+fingerprint_index = FingerprintIndex()
@@ -1,39 +1,37 @@
 # To run this code you need to install the following dependencies:
 # pip install google-genai
 
-import base64
+import hashlib
 import os
 import json
+import logging
+import threading
+from concurrent.futures import Future
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from utils.cache import PersistentCache
+from utils.metrics import register_collector, timed
+from utils.resume_compactor import RESUME_COMPACTION, compact_resume_text
 
 # Load environment variables
 load_dotenv()
 
-def parse_resume_with_gemini(resume_text):
-    """
-    Parse resume text using Gemini API and return structured data.
-    
-    Args:
-        resume_text (str): The text content of the resume
-        
-    Returns:
-        tuple: (parsed_data, raw_response)
-            - parsed_data: dict containing structured resume data
-            - raw_response: str containing the raw response from Gemini
-    """
-    try:
-        client = genai.Client(
-            api_key=os.getenv("GEMINI_API_KEY"),
-        )
+logger = logging.getLogger(__name__)
+
+# Model used for all Gemini calls
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-8b")
 
-        model = "gemini-1.5-flash-8b"
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text="""You are an expert resume parser. I will give you the raw text of a resume.  
+# Bounded response cache for parsed resumes, keyed by prompt + model + (compacted) resume text
+# + response schema. Changing RESUME_PARSER_PROMPT, RESUME_RESPONSE_SCHEMA or
+# GEMINI_STRUCTURED_OUTPUT changes every key, so old entries are never served.
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "5000"))
+_response_cache = PersistentCache(
+    "gemini_responses",
+    path=os.getenv("GEMINI_CACHE_PATH"),
+    max_entries=GEMINI_CACHE_MAX_ENTRIES,
+    memory_entries=256
+)
+
+RESUME_PARSER_PROMPT = """You are an expert resume parser. I will give you the raw text of a resume.  
 Your task is to extract the following fields **accurately** and return ONLY a valid JSON object (no explanation, no formatting, no markdown, no code blocks, just the raw JSON):
 
 - name
@@ -49,78 +47,448 @@ Your task is to extract the following fields **accurately** and return ONLY a va
 Example of expected response (just the JSON, nothing else):
 {"name": "Jane Doe", "email": "jane.doe@gmail.com", "phone": "+1-234-567-8901", "skills": ["Python", "LangChain", "NLP", "RAG", "LLMs"], "experience_years": 5, "education": "M.Sc. in Computer Science", "current_location": "Berlin, Germany", "linkedin": "https://linkedin.com/in/janedoe", "github": "https://github.com/janedoe"}
 
-Now here is the resume: """ + resume_text),
-                ],
-            ),
-        ]
-        
-        generate_content_config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-        )
+Now here is the resume: """
 
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        )
-        
-        # Get the raw response
-        raw_response = response.text.strip()
+# Same fields as RESUME_PARSER_PROMPT, for several resumes in one call (see ResumeBatcher)
+RESUME_BATCH_PROMPT = """You are an expert resume parser. I will give you the raw text of several resumes, each between <resume id="N"> and </resume> tags.
+For every resume, extract the following fields **accurately**. Return ONLY a valid JSON array with one object per resume, in the order given, each with an "id" field set to the resume's id (no explanation, no formatting, no markdown, no code blocks, just the raw JSON):
+
+- id
+- name
+- email
+- phone
+- skills (as an array)
+- experience_years (numeric only)
+- education (highest qualification)
+- current_location (if available)
+- linkedin (if mentioned)
+- github (if mentioned)
+
+Never mix up details between resumes. Here are the resumes:
+"""
+
+# Set GEMINI_SINGLE_FLIGHT=false to stop concurrent identical calls from sharing one request
+GEMINI_SINGLE_FLIGHT = os.getenv("GEMINI_SINGLE_FLIGHT", "true").lower() == "true"
+# Micro-batching of resume parses: seconds to wait for more resumes to pack into
+# one call (0 turns it off), how many resumes one call may take, and the longest
+# resume text (in characters) that is batched
+GEMINI_BATCH_WINDOW = float(os.getenv("GEMINI_BATCH_WINDOW", "0"))
+GEMINI_BATCH_MAX_RESUMES = int(os.getenv("GEMINI_BATCH_MAX_RESUMES", "4"))
+GEMINI_BATCH_MAX_CHARS = int(os.getenv("GEMINI_BATCH_MAX_CHARS", "4000"))
+
+# Set GEMINI_STRUCTURED_OUTPUT=false to ask for JSON in plain text instead of passing a response schema
+GEMINI_STRUCTURED_OUTPUT = os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# JSON schema of a parsed resume (the fields RESUME_PARSER_PROMPT lists), so Gemini can only reply with valid JSON
+RESUME_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "name": {"type": "STRING", "nullable": True},
+        "email": {"type": "STRING", "nullable": True},
+        "phone": {"type": "STRING", "nullable": True},
+        "skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "experience_years": {"type": "NUMBER", "nullable": True},
+        "education": {"type": "STRING", "nullable": True},
+        "current_location": {"type": "STRING", "nullable": True},
+        "linkedin": {"type": "STRING", "nullable": True},
+        "github": {"type": "STRING", "nullable": True},
+    },
+    "required": ["name", "email", "phone", "skills", "experience_years", "education",
+                 "current_location", "linkedin", "github"],
+}
+RESUME_BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"id": {"type": "INTEGER"}, **RESUME_RESPONSE_SCHEMA["properties"]},
+        "required": ["id"] + RESUME_RESPONSE_SCHEMA["required"],
+    },
+}
+
+# requests: calls that missed the response cache, upstream_calls: requests sent to Gemini,
+# coalesced: callers that shared another caller's in-flight request,
+# batched: resumes parsed in a multi-resume call
+_coalescing_stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "batched": 0}
+# Token usage Gemini reported, for cost tracking
+_token_stats = {"prompt_tokens": 0, "output_tokens": 0, "calls": 0}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide Gemini client, creating it on first use.
+    The SDK is imported here so importing this module stays cheap.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(
+                    api_key=os.getenv("GEMINI_API_KEY"),
+                )
+    return _client
+
+
+def set_client(client):
+    """
+    Replace the process-wide Gemini client, e.g. with a local stand-in for
+    benchmarks. The client must provide `models.generate_content(model, contents, config)`.
+    Pass None to go back to creating the real client on first use.
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def _cache_key(prompt, model, text, response_schema=None):
+    """Hash the prompt, model name, input text and response schema (None for plain text) into a cache key."""
+    schema = "" if response_schema is None else json.dumps(response_schema, sort_keys=True)
+    digest = hashlib.sha256()
+    for part in (prompt, model, text, schema):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def clear_response_cache():
+    """
+    Drop every cached Gemini response, e.g. after changing a prompt in place
+    without changing its text or when the model behaviour changes.
+    """
+    _response_cache.clear()
+
+
+def response_cache_stats():
+    """
+    Return hit/miss counters for the Gemini response cache.
+    """
+    return _response_cache.stats()
+
+
+register_collector('hireai_gemini_response_cache', 'Gemini response cache counters', response_cache_stats)
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one call: the first caller
+    runs it, callers arriving while it runs wait for its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the running call
+
+    def do(self, key, fn):
+        """
+        Run fn(), or wait for the running call with the same key.
+
+        Returns:
+            The result of fn()
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            _coalescing_stats["coalesced"] += 1
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class _Batch:
+    def __init__(self):
+        self.entries = []  # (resume text, Future)
+        self.full = threading.Event()
+
+
+class ResumeBatcher:
+    """
+    Packs short resumes parsed at about the same time into one multi-resume
+    Gemini call (RESUME_BATCH_PROMPT) and splits the JSON array back out.
+
+    The first resume opens a batch and waits up to `window` seconds for more,
+    or until `max_resumes` have joined; its thread then sends the call for the
+    whole batch. Resumes the reply doesn't cover are parsed one by one.
+    Worth enabling for bulk imports and busy ingestion, where several workers
+    parse at once; a lone resume waits `window` seconds for nothing.
+    """
+
+    def __init__(self, window: float = GEMINI_BATCH_WINDOW, max_resumes: int = GEMINI_BATCH_MAX_RESUMES,
+                 max_chars: int = GEMINI_BATCH_MAX_CHARS):
+        """
+        Args:
+            window (float): Seconds to wait for more resumes, 0 to disable batching
+            max_resumes (int): Maximum resumes per call
+            max_chars (int): Longer resume texts are parsed on their own
+        """
+        self.window = window
+        self.max_resumes = max_resumes
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._open = None
+
+    def accepts(self, resume_text: str) -> bool:
+        """True if this resume should be batched."""
+        return self.window > 0 and self.max_resumes > 1 and len(resume_text) <= self.max_chars
+
+    def parse(self, resume_text: str):
+        """
+        Parse a resume as part of a batch.
+
+        Returns:
+            tuple: (parsed_data, raw_response)
+        """
+        future = Future()
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.entries.append((resume_text, future))
+            if len(batch.entries) >= self.max_resumes:
+                self._open = None
+                batch.full.set()
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._send(batch.entries)
+        return future.result()
+
+    def _send(self, entries):
+        results = [None] * len(entries)
+        if len(entries) > 1:
+            try:
+                results = _generate_batch([text for text, _ in entries])
+                _coalescing_stats["batched"] += sum(result is not None for result in results)
+            except Exception as e:
+                print(f"Error parsing resume batch, parsing one by one: {str(e)}")
+        for (text, future), result in zip(entries, results):
+            try:
+                future.set_result(result if result is not None else _generate_resume_json(text))
+            except Exception as e:
+                future.set_exception(e)
+
+
+_resume_flights = SingleFlight()
+_prompt_flights = SingleFlight()
+resume_batcher = ResumeBatcher()
+
+
+def coalescing_stats():
+    """
+    Return counters for single-flight deduplication and micro-batching.
+
+    Returns:
+        dict: requests (cache misses), upstream_calls (sent to Gemini), coalesced, batched,
+            and saved (requests minus upstream calls)
+    """
+    stats = dict(_coalescing_stats)
+    stats["saved"] = max(stats["requests"] - stats["upstream_calls"], 0)
+    return stats
+
+
+register_collector('hireai_gemini_coalescing', 'Gemini calls coalesced by single-flight and micro-batching',
+                   coalescing_stats)
+
+
+def token_stats():
+    """
+    Return the token usage Gemini reported.
+
+    Returns:
+        dict: prompt_tokens and output_tokens summed over the calls that reported usage, and calls
+    """
+    return dict(_token_stats)
+
+
+register_collector('hireai_gemini_tokens', 'Gemini token usage reported by the API', token_stats, kind='counter')
+
+
+@timed()
+def parse_resume_with_gemini(resume_text):
+    """
+    Parse resume text using Gemini API and return structured data.
+    
+    The text is compacted first (see utils.resume_compactor) unless
+    RESUME_COMPACTION is off, and the reply is constrained to
+    RESUME_RESPONSE_SCHEMA unless GEMINI_STRUCTURED_OUTPUT is off.
+    Identical resumes are answered from the response cache without calling Gemini,
+    and concurrent parses of the same resume share one call. Short resumes are
+    packed into multi-resume calls when GEMINI_BATCH_WINDOW is set.
+    
+    Args:
+        resume_text (str): The text content of the resume
         
-        # Clean the response - remove any markdown or code block indicators
-        json_str = raw_response
-        if "```json" in json_str:
-            json_str = json_str.split("```json")[1].split("```")[0].strip()
-        elif "```" in json_str:
-            json_str = json_str.split("```")[1].split("```")[0].strip()
-            
-        # Parse JSON
-        parsed_data = json.loads(json_str)
-        return parsed_data, raw_response
+    Returns:
+        tuple: (parsed_data, raw_response)
+            - parsed_data: dict containing structured resume data
+            - raw_response: str containing the raw response from Gemini
+    """
+    if RESUME_COMPACTION:
+        resume_text, report = compact_resume_text(resume_text)
+        logger.info("Resume compacted: %d -> %d estimated tokens, %d -> %d chars, "
+                    "%d header/footer lines dropped, truncated %s",
+                    report["tokens_before"], report["tokens_after"], report["chars_before"],
+                    report["chars_after"], report["header_footer_lines_dropped"], report["truncated"])
+    cache_key = _cache_key(RESUME_PARSER_PROMPT, GEMINI_MODEL, resume_text, _resume_schema())
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached["parsed_data"], cached["raw_response"]
+
+    _coalescing_stats["requests"] += 1
+    try:
+        if GEMINI_SINGLE_FLIGHT:
+            return _resume_flights.do(cache_key, lambda: _parse_resume_uncached(cache_key, resume_text))
+        return _parse_resume_uncached(cache_key, resume_text)
         
     except Exception as e:
         print(f"Error parsing resume: {str(e)}")
         return None, None
 
-def test_parser():
-    """
-    Test function to verify the resume parser is working.
+
+def _parse_resume_uncached(cache_key, resume_text):
+    """Call Gemini for a resume (batched if it qualifies) and cache the parse. Raises on error."""
+    # The previous call for this key may have finished between the cache check and now
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached["parsed_data"], cached["raw_response"]
+
+    if resume_batcher.accepts(resume_text):
+        parsed_data, raw_response = resume_batcher.parse(resume_text)
+    else:
+        parsed_data, raw_response = _generate_resume_json(resume_text)
+    _response_cache.set(cache_key, {"parsed_data": parsed_data, "raw_response": raw_response})
+    return parsed_data, raw_response
+
+
+def generate_json_with_gemini(prompt):
     """
-    test_resume = """
-    JOHN DOE
-    Software Engineer
-    john.doe@email.com | (555) 123-4567 | New York, NY
+    Send a prompt that asks for a JSON object to Gemini and parse the reply.
+    Concurrent calls with the same prompt share one request.
     
-    SKILLS
-    Python, JavaScript, React, Node.js, SQL, Git
-    
-    EXPERIENCE
-    Senior Software Engineer
-    Tech Corp
-    2020 - Present
-    • Led development of microservices architecture
-    • Mentored junior developers
+    Args:
+        prompt (str): The full prompt text
+        
+    Returns:
+        tuple: (parsed_data, raw_response), or (None, None) on error
+    """
+    _coalescing_stats["requests"] += 1
+    try:
+        if GEMINI_SINGLE_FLIGHT:
+            return _prompt_flights.do(_cache_key("", GEMINI_MODEL, prompt), lambda: _generate_json(prompt))
+        return _generate_json(prompt)
+    except Exception as e:
+        print(f"Error generating JSON with Gemini: {str(e)}")
+        return None, None
+
+
+def _resume_schema():
+    """The response schema resume parses are sent with, or None for plain text replies."""
+    return RESUME_RESPONSE_SCHEMA if GEMINI_STRUCTURED_OUTPUT else None
+
+
+def _generate_resume_json(resume_text):
+    """Parse one resume with Gemini. Raises on API or JSON errors."""
+    return _generate_json(RESUME_PARSER_PROMPT + resume_text, response_schema=_resume_schema())
+
+
+@timed('gemini_request')
+def _generate_json(prompt, response_schema=None):
+    """
+    Call Gemini with a single user prompt and parse the JSON reply.
+    With a response schema Gemini returns JSON matching it (structured output);
+    without one the JSON is cut out of a plain text reply.
+    Raises on API or JSON errors.
+    """
+    from google.genai import types
+    client = get_client()
+    _coalescing_stats["upstream_calls"] += 1
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+            ],
+        ),
+    ]
     
-    Software Engineer
-    Startup Inc
-    2018 - 2020
-    • Developed full-stack web applications
+    if response_schema is not None:
+        generate_content_config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+    else:
+        generate_content_config = types.GenerateContentConfig(
+            response_mime_type="text/plain",
+        )
+
+    response = client.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=contents,
+        config=generate_content_config,
+    )
     
-    EDUCATION
-    M.Sc. in Computer Science
-    University of Technology
-    2018
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        _token_stats["calls"] += 1
+        _token_stats["prompt_tokens"] += usage.prompt_token_count or 0
+        _token_stats["output_tokens"] += usage.candidates_token_count or 0
+
+    # Get the raw response
+    raw_response = response.text.strip()
     
-    LINKS
-    LinkedIn: https://linkedin.com/in/johndoe
-    GitHub: https://github.com/johndoe
+    # Clean the response - remove any markdown or code block indicators
+    json_str = raw_response
+    if "```json" in json_str:
+        json_str = json_str.split("```json")[1].split("```")[0].strip()
+    elif "```" in json_str:
+        json_str = json_str.split("```")[1].split("```")[0].strip()
+        
+    # Parse JSON
+    parsed_data = json.loads(json_str)
+    return parsed_data, raw_response
+
+
+def _generate_batch(resume_texts):
     """
-    
-    result, raw_response = parse_resume_with_gemini(test_resume)
-    print("\nRaw Gemini Response:")
-    print(raw_response)
-    print("\nParsed Resume Data:")
-    print(json.dumps(result, indent=2))
-
-if __name__ == "__main__":
-    test_parser()
+    Parse several resumes with one Gemini call.
+
+    Returns:
+        list: (parsed_data, raw_response) per resume, in order, or None for a resume
+            missing from the reply. raw_response is that resume's object as JSON.
+    """
+    documents = "\n".join(f'<resume id="{i}">\n{text}\n</resume>' for i, text in enumerate(resume_texts))
+    schema = RESUME_BATCH_RESPONSE_SCHEMA if GEMINI_STRUCTURED_OUTPUT else None
+    parsed_data, _ = _generate_json(RESUME_BATCH_PROMPT + documents, response_schema=schema)
+    if not isinstance(parsed_data, list):
+        raise ValueError("Expected a JSON array of resumes")
+
+    results = [None] * len(resume_texts)
+    for position, item in enumerate(parsed_data):
+        if not isinstance(item, dict):
+            continue
+        item = dict(item)
+        index = item.pop("id", None)
+        try:
+            index = int(index) if index is not None else position
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(results) and results[index] is None:
+            results[index] = (item, json.dumps(item))
+    return results
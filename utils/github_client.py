@@ -0,0 +1,256 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from utils.http_session import DEFAULT_TIMEOUT, create_session
+from utils.metrics import register_collector
+
+# Comma-separated pool of GitHub tokens; GITHUB_TOKEN alone also works
+GITHUB_TOKENS = [t.strip() for t in os.getenv('GITHUB_TOKENS', os.getenv('GITHUB_TOKEN', '')).split(',') if t.strip()]
+# Maximum GitHub requests in flight across the process
+GITHUB_MAX_CONCURRENCY = int(os.getenv('GITHUB_MAX_CONCURRENCY', '8'))
+# Share of each token's hourly quota that only interactive lookups may use
+GITHUB_INTERACTIVE_RESERVE = float(os.getenv('GITHUB_INTERACTIVE_RESERVE', '0.2'))
+# Seconds a background lookup may wait for a request slot
+GITHUB_BACKGROUND_QUEUE_TIMEOUT = float(os.getenv('GITHUB_BACKGROUND_QUEUE_TIMEOUT', '30'))
+
+# Lookup priorities, lower is served first
+PRIORITY_INTERACTIVE = 0  # a recruiter or candidate is waiting on the result
+PRIORITY_BACKGROUND = 1  # score refreshes
+
+# Statuses the scheduler's session retries itself. 403 and 429 are left to the
+# scheduler, which defers instead of sleeping on Retry-After in a request slot.
+_SESSION_RETRY_STATUSES = (500, 502, 503, 504)
+
+# GitHub's documented hourly limits, used until a response reports the real one
+_DEFAULT_LIMIT = {True: 5000, False: 60}
+
+
+class GitHubDeferred(Exception):
+    """Raised when no token has quota left for a lookup; the caller should retry after the reset."""
+
+
+class _TokenState:
+    """Remaining quota of one token (None for unauthenticated requests), from the last response headers."""
+
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.limit = _DEFAULT_LIMIT[token is not None]
+        self.remaining = self.limit
+        self.reset_at = 0.0
+        self.in_flight = 0  # requests sent with this token and not yet answered
+
+    def available(self, now: float) -> int:
+        if self.reset_at and now >= self.reset_at:
+            # A new window started; the next response reports the exact numbers
+            self.remaining = self.limit
+            self.reset_at = 0.0
+        return self.remaining
+
+
+class GitHubScheduler:
+    """
+    Schedules GitHub API requests across a pool of tokens.
+
+    Every request takes a slot (at most `max_concurrency` in flight) and a token.
+    Waiting requests are served in priority order, so interactive lookups jump
+    ahead of queued background refreshes. Each token's remaining quota is tracked
+    from the X-RateLimit-* response headers, and requests go to the token with
+    the most quota left. Background lookups may not use the last
+    `interactive_reserve` share of a token's quota. When no token has quota
+    left, or the wait for a slot times out, GitHubDeferred is raised instead
+    of sending a request that would be rejected.
+    """
+
+    def __init__(self, tokens: List[str] = None, max_concurrency: int = GITHUB_MAX_CONCURRENCY,
+                 interactive_reserve: float = GITHUB_INTERACTIVE_RESERVE):
+        """
+        Args:
+            tokens (List[str], optional): Token pool; unauthenticated requests are used when empty
+            max_concurrency (int): Maximum requests in flight
+            interactive_reserve (float): Share of each token's quota kept for interactive lookups
+        """
+        self.max_concurrency = max_concurrency
+        self.interactive_reserve = interactive_reserve
+        self._tokens = {}
+        for token in tokens or []:
+            self._tokens[token] = _TokenState(token)
+        self._anonymous = _TokenState(None)
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._session = None
+        self._in_flight = 0
+        self._stats = {'requests': 0, 'interactive': 0, 'background': 0, 'deferred': 0, 'rate_limited': 0}
+
+    def add_token(self, token: str):
+        """Add a token to the pool (no-op if already present)."""
+        with self._cond:
+            if token and token not in self._tokens:
+                self._tokens[token] = _TokenState(token)
+
+    def _pick_token(self, priority: int, now: float) -> Optional[_TokenState]:
+        states = list(self._tokens.values()) or [self._anonymous]
+        best = max(states, key=lambda state: state.available(now))
+        floor = 0 if priority == PRIORITY_INTERACTIVE else int(best.limit * self.interactive_reserve)
+        return best if best.available(now) > floor else None
+
+    def acquire(self, priority: int, timeout: float) -> _TokenState:
+        """
+        Wait for a request slot and pick a token, reserving one request of its quota.
+
+        Raises:
+            GitHubDeferred: No token has quota for this priority, or no slot freed up within `timeout`
+        """
+        deadline = time.monotonic() + timeout
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry and self._in_flight < self.max_concurrency:
+                        state = self._pick_token(priority, time.time())
+                        if state is None:
+                            self._stats['deferred'] += 1
+                            raise GitHubDeferred('GitHub rate limit budget exhausted')
+                        state.remaining -= 1
+                        state.in_flight += 1
+                        self._in_flight += 1
+                        self._stats['requests'] += 1
+                        self._stats['interactive' if priority == PRIORITY_INTERACTIVE else 'background'] += 1
+                        return state
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['deferred'] += 1
+                        raise GitHubDeferred('Timed out waiting for a GitHub request slot')
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def release(self, state: _TokenState, response=None):
+        """Free the slot and update the token's quota from the response's rate limit headers."""
+        with self._cond:
+            self._in_flight -= 1
+            state.in_flight -= 1
+            if response is not None:
+                headers = response.headers
+                try:
+                    if 'X-RateLimit-Limit' in headers:
+                        state.limit = int(headers['X-RateLimit-Limit'])
+                    if 'X-RateLimit-Reset' in headers:
+                        state.reset_at = float(headers['X-RateLimit-Reset'])
+                    if 'X-RateLimit-Remaining' in headers:
+                        # GitHub's count is the truth (304s, for one, cost nothing); it doesn't
+                        # include requests with this token still in flight
+                        state.remaining = max(0, int(headers['X-RateLimit-Remaining']) - state.in_flight)
+                except ValueError:
+                    pass
+                if _is_rate_limited(response):
+                    self._stats['rate_limited'] += 1
+                    state.remaining = 0
+                    retry_after = headers.get('Retry-After')
+                    if retry_after and retry_after.isdigit():
+                        state.reset_at = max(state.reset_at, time.time() + int(retry_after))
+                    elif not state.reset_at:
+                        state.reset_at = time.time() + 60
+            self._cond.notify_all()
+
+    def has_tokens(self) -> bool:
+        """True if the pool has at least one token (some APIs, like GraphQL, need one)."""
+        with self._cond:
+            return bool(self._tokens)
+
+    def request(self, method: str, url: str, priority: int = PRIORITY_INTERACTIVE, headers: Optional[Dict] = None,
+                timeout: Optional[float] = None, http_timeout=None, **kwargs):
+        """
+        Send a GitHub API request with the best available token.
+        A rate-limited response is retried with another token while one has quota.
+
+        Args:
+            method (str): 'GET' or 'POST'
+            url (str): API URL
+            priority (int): PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            headers (Dict, optional): Extra request headers
+            timeout (float, optional): Seconds to wait for a slot, defaults to
+                GITHUB_BACKGROUND_QUEUE_TIMEOUT for background lookups and 10 otherwise
+            http_timeout (float or Tuple[float, float], optional): Timeout of the HTTP call itself,
+                defaults to utils.http_session.DEFAULT_TIMEOUT
+            **kwargs: Passed to the HTTP call, e.g. json=
+
+        Returns:
+            requests.Response: The response
+
+        Raises:
+            GitHubDeferred: The lookup can't be made within the rate limits right now
+        """
+        if timeout is None:
+            timeout = GITHUB_BACKGROUND_QUEUE_TIMEOUT if priority == PRIORITY_BACKGROUND else 10.0
+        if self._session is None:
+            with self._cond:
+                if self._session is None:
+                    self._session = create_session(pool_size=max(self.max_concurrency, 1),
+                                                   retry_statuses=_SESSION_RETRY_STATUSES,
+                                                   respect_retry_after=False)
+        kwargs['timeout'] = http_timeout or DEFAULT_TIMEOUT
+        while True:
+            state = self.acquire(priority, timeout)
+            request_headers = dict(headers or {})
+            if state.token:
+                request_headers['Authorization'] = f'bearer {state.token}'
+            response = None
+            try:
+                response = self._session.request(method, url, headers=request_headers, **kwargs)
+            finally:
+                self.release(state, response)
+            if not _is_rate_limited(response):
+                return response
+
+    def get(self, url: str, priority: int = PRIORITY_INTERACTIVE, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None, http_timeout=None):
+        """GET a GitHub API URL; see request()."""
+        return self.request('GET', url, priority, headers, timeout, http_timeout)
+
+    def post(self, url: str, json: Dict, priority: int = PRIORITY_INTERACTIVE, headers: Optional[Dict] = None,
+             timeout: Optional[float] = None, http_timeout=None):
+        """POST a JSON body to a GitHub API URL; see request()."""
+        return self.request('POST', url, priority, headers, timeout, http_timeout, json=json)
+
+    def stats(self) -> Dict:
+        """
+        Return scheduler counters.
+
+        Returns:
+            Dict: requests (by priority), deferred, rate_limited (403/429 responses),
+                in_flight, waiting, tokens and quota_remaining (summed over tokens)
+        """
+        with self._cond:
+            now = time.time()
+            states = list(self._tokens.values()) or [self._anonymous]
+            return dict(self._stats, in_flight=self._in_flight, waiting=len(self._waiting),
+                        tokens=len(self._tokens), quota_remaining=sum(s.available(now) for s in states))
+
+
+def _is_rate_limited(response) -> bool:
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (response.headers.get('X-RateLimit-Remaining') == '0'
+                                            or 'Retry-After' in response.headers)
+
+
+# Process-wide schedulers for GitHub API calls. GraphQL has its own quota
+# (in points rather than requests), so it is tracked separately.
+github_scheduler = GitHubScheduler(GITHUB_TOKENS)
+github_graphql_scheduler = GitHubScheduler(GITHUB_TOKENS)
+register_collector('hireai_github_scheduler', 'GitHub REST request scheduler counters', github_scheduler.stats)
+register_collector('hireai_github_graphql_scheduler', 'GitHub GraphQL request scheduler counters',
+                   github_graphql_scheduler.stats)
+
+
+def add_github_token(token: str):
+    """Add a token to the REST and GraphQL pools."""
+    github_scheduler.add_token(token)
+    github_graphql_scheduler.add_token(token)
@@ -0,0 +1,177 @@
+import codecs
+import os
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Optional
+
+# Set GITHUB_SCRAPE_FAST=false to parse profile pages with BeautifulSoup instead
+GITHUB_SCRAPE_FAST = os.getenv('GITHUB_SCRAPE_FAST', 'true').lower() == 'true'
+# Bytes read from the profile page per chunk
+GITHUB_SCRAPE_CHUNK_SIZE = int(os.getenv('GITHUB_SCRAPE_CHUNK_SIZE', '16384'))
+
+ARCTIC_VAULT_BADGE = 'Arctic Code Vault Contributor'
+
+
+class _ProfileFieldParser(HTMLParser):
+    """
+    Tag-level scanner for the fields score_github_background reads, without building a tree.
+    Matches the same elements as the BeautifulSoup lookups in profile_fields_soup().
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.repo_count = None  # None until the first span.Counter is closed
+        self.followers = None  # None until the followers link is closed
+        self.has_avatar = None  # None until the first img[alt=Avatar]
+        self._counter = None  # [span depth, text parts] while inside the first span.Counter
+        self._followers_link = False  # inside the first ?tab=followers link, before its span
+        self._followers_span = None  # [span depth, text parts] while inside that link's span.text-bold
+
+    @property
+    def done(self) -> bool:
+        return self.repo_count is not None and self.followers is not None and self.has_avatar is not None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'span':
+            for capture in (self._counter, self._followers_span):
+                if capture is not None:
+                    capture[0] += 1
+            classes = None
+            if self.repo_count is None and self._counter is None:
+                classes = (dict(attrs).get('class') or '').split()
+                if 'Counter' in classes:
+                    self._counter = [1, []]
+            if self._followers_link and self._followers_span is None:
+                if classes is None:
+                    classes = (dict(attrs).get('class') or '').split()
+                if 'text-bold' in classes:
+                    self._followers_span = [1, []]
+        elif tag == 'a':
+            if self.followers is None and not self._followers_link:
+                href = dict(attrs).get('href')
+                if href and href.endswith('?tab=followers'):
+                    self._followers_link = True
+        elif tag == 'img':
+            if self.has_avatar is None:
+                attributes = dict(attrs)
+                if attributes.get('alt') == 'Avatar':
+                    self.has_avatar = bool(attributes.get('src'))
+
+    def handle_endtag(self, tag):
+        if tag == 'span':
+            if self._counter is not None:
+                self._counter[0] -= 1
+                if self._counter[0] == 0:
+                    self.repo_count = _to_int(''.join(self._counter[1]).strip().replace(',', ''))
+                    self._counter = None
+            if self._followers_span is not None:
+                self._followers_span[0] -= 1
+                if self._followers_span[0] == 0:
+                    self.followers = _to_int(''.join(self._followers_span[1]).strip())
+                    self._followers_span = None
+                    self._followers_link = False
+        elif tag == 'a' and self._followers_link and self._followers_span is None:
+            # The followers link had no span.text-bold
+            self.followers = 0
+            self._followers_link = False
+
+    def close(self):
+        super().close()
+        # Elements still open at the end of the page end there, as in a tree parse
+        while self._counter is not None or self._followers_span is not None:
+            self.handle_endtag('span')
+        if self._followers_link:
+            self.handle_endtag('a')
+
+    def handle_data(self, data):
+        if self._counter is not None:
+            self._counter[1].append(data)
+        if self._followers_span is not None:
+            self._followers_span[1].append(data)
+
+
+def _to_int(text: str) -> int:
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+def profile_fields_streaming(chunks: Iterable[bytes], encoding: Optional[str] = None) -> Dict:
+    """
+    Extract the scored fields from a GitHub profile page as it downloads.
+
+    Chunks are tokenized (no tree is built) until the repository counter, the
+    followers count and the avatar have been seen. After that the rest of the
+    page is only searched for the Arctic Code Vault badge, and reading stops
+    as soon as it is found.
+    Args:
+        chunks (Iterable[bytes]): The response body, e.g. response.iter_content()
+        encoding (str, optional): Body encoding, defaults to UTF-8
+    Returns:
+        Dict: repo_count, followers, arctic_vault and has_avatar
+    """
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    parser = _ProfileFieldParser()
+    badge = ARCTIC_VAULT_BADGE.encode()
+    arctic_vault = False
+    tail = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not arctic_vault:
+            window = tail + chunk
+            arctic_vault = badge in window
+            tail = window[-(len(badge) - 1):]
+        if not parser.done:
+            parser.feed(decoder.decode(chunk))
+        if parser.done and arctic_vault:
+            break
+    if not parser.done:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+    return {
+        'repo_count': parser.repo_count or 0,
+        'followers': parser.followers or 0,
+        'arctic_vault': arctic_vault,
+        'has_avatar': bool(parser.has_avatar),
+    }
+
+
+def profile_fields_soup(html: str) -> Dict:
+    """
+    Extract the scored fields from a GitHub profile page with a full BeautifulSoup parse.
+    Args:
+        html (str): The page
+    Returns:
+        Dict: repo_count, followers, arctic_vault and has_avatar
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Number of public repositories
+    repo_count = 0
+    repo_tag = soup.find('span', {'class': 'Counter'})
+    if repo_tag:
+        try:
+            repo_count = int(repo_tag.text.strip().replace(',', ''))
+        except Exception:
+            repo_count = 0
+
+    # Number of followers
+    followers = 0
+    followers_tag = soup.find('a', href=lambda x: x and x.endswith('?tab=followers'))
+    if followers_tag:
+        try:
+            followers = int(followers_tag.find('span', class_='text-bold').text.strip())
+        except Exception:
+            followers = 0
+
+    # Profile picture
+    avatar = soup.find('img', {'alt': 'Avatar'})
+
+    return {
+        'repo_count': repo_count,
+        'followers': followers,
+        'arctic_vault': ARCTIC_VAULT_BADGE in html,
+        'has_avatar': bool(avatar and avatar.get('src')),
+    }
@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Tuple
+
+# Connection pool and timeout settings for outbound HTTP calls
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '32'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))  # seconds
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))  # seconds
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3'))
+# Longest Retry-After wait honoured before a retry, in seconds; longer waits are cut to this
+HTTP_MAX_RETRY_AFTER = float(os.getenv('HTTP_MAX_RETRY_AFTER', '5'))
+
+# Statuses retried by default
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Default (connect, read) timeout passed to every request
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES,
+                   backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                   retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+                   respect_retry_after: bool = True) -> 'requests.Session':
+    """
+    Create a requests Session with keep-alive connection pooling and retries.
+
+    Idempotent requests are retried with exponential backoff on 429 and 5xx
+    responses, honouring any Retry-After header up to HTTP_MAX_RETRY_AFTER seconds.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host
+        max_retries (int): Number of retries on connection errors and `retry_statuses`
+        backoff_factor (float): Backoff multiplier between retries
+        retry_statuses (Tuple[int, ...]): Response statuses that are retried
+        respect_retry_after (bool): Retry 413, 429 and 503 responses that carry a
+            Retry-After header after that wait; when False, they are returned as-is
+            unless in `retry_statuses`
+
+    Returns:
+        requests.Session: The configured session
+    """
+    # Imported on first use to keep app import time down
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class CappedRetry(Retry):
+        def get_retry_after(self, response):
+            retry_after = super().get_retry_after(response)
+            return None if retry_after is None else min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+    retry = CappedRetry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=retry_statuses,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=respect_retry_after,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session() -> 'requests.Session':
+    """
+    Return the process-wide pooled session, creating it on first use.
+
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def http_get(url: str, **kwargs) -> 'requests.Response':
+    """
+    GET a URL through the shared session with the default timeouts.
+
+    Args:
+        url (str): URL to fetch
+        **kwargs: Passed through to requests.Session.get
+
+    Returns:
+        requests.Response: The response
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_session().get(url, **kwargs)
+
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from utils.cache import PersistentCache
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth."""
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue served by a fixed pool of worker threads.
+
+    Each job runs `handler(payload)`; its return value becomes the job result
+    and any exception marks the job as failed. The job runs in the process that
+    accepted it, but its status and result are kept in SQLite only (no
+    in-process copy, like the candidate preview store), so `get()` answers from
+    any worker process on the host. Results must be JSON serializable. Jobs
+    are kept for `result_ttl` seconds after their last status change.
+    """
+
+    def __init__(self, handler: Callable[[Any], Any], workers: int = 4, max_depth: int = 100,
+                 result_ttl: float = 3600, name: str = 'jobs', path: Optional[str] = None):
+        """
+        Args:
+            handler (Callable): Function run for each job payload
+            workers (int): Number of worker threads
+            max_depth (int): Maximum number of queued (not yet running) jobs
+            result_ttl (float): Seconds jobs are kept after their last status change
+            name (str): Prefix for worker thread names, and the job store name
+            path (str, optional): SQLite file for the job store, defaults to CACHE_DIR/<name>_jobs.sqlite3
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.name = name
+        self._store = PersistentCache(f'{name}_jobs', path=path, ttl=result_ttl,
+                                      max_entries=max(max_depth * 100, 1000), memory_entries=0)
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = 0
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0,
+                       'total_wait_seconds': 0.0, 'total_run_seconds': 0.0}
+
+    def _start_workers(self):
+        # Workers start on first submit so importing the module has no side effects
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'{self.name}-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, payload: Any) -> str:
+        """
+        Queue a job.
+
+        Args:
+            payload: Passed to the handler
+
+        Returns:
+            str: The job id
+
+        Raises:
+            QueueFullError: If the queue is at its maximum depth
+        """
+        job = {'id': uuid.uuid4().hex, 'status': 'queued', 'submitted_at': time.time(),
+               'started_at': None, 'finished_at': None, 'result': None, 'error': None}
+        with self._lock:
+            if not self._threads:
+                self._start_workers()
+            # Stored before it is queued, so a worker never updates a job that isn't there yet
+            self._store.set(job['id'], job)
+            try:
+                self._queue.put_nowait((job, payload))
+            except queue.Full:
+                self._stats['rejected'] += 1
+                self._store.delete(job['id'])
+                raise QueueFullError(f'{self.name} queue is full ({self.max_depth} jobs)')
+            self._stats['submitted'] += 1
+        return job['id']
+
+    def _work(self):
+        while True:
+            job, payload = self._queue.get()
+            job.update(status='running', started_at=time.time())
+            self._store.set(job['id'], job)
+            with self._lock:
+                self._running += 1
+            try:
+                result, error, status = self.handler(payload), None, 'done'
+            except Exception as e:
+                print(f"Error running {self.name} job {job['id']}: {str(e)}")
+                result, error, status = None, str(e), 'failed'
+            job.update(status=status, result=result, error=error, finished_at=time.time())
+            try:
+                self._store.set(job['id'], job)
+            except Exception as e:
+                print(f"Error storing {self.name} job {job['id']}: {str(e)}")
+                job.update(status='failed', result=None, error='Error storing the job result')
+                self._store.set(job['id'], job)
+            with self._lock:
+                self._running -= 1
+                self._stats['completed' if job['status'] == 'done' else 'failed'] += 1
+                self._stats['total_wait_seconds'] += job['started_at'] - job['submitted_at']
+                self._stats['total_run_seconds'] += job['finished_at'] - job['started_at']
+            self._queue.task_done()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a snapshot of a job, or None if unknown or expired. Never blocks on the job.
+        """
+        return self._store.get(job_id)
+
+    def stats(self) -> Dict:
+        """
+        Return queue depth, worker concurrency and job latency counters for this process.
+
+        Returns:
+            Dict: depth, running, workers, max_depth, submitted, completed, failed,
+                rejected, avg_wait_seconds and avg_run_seconds
+        """
+        with self._lock:
+            finished = self._stats['completed'] + self._stats['failed']
+            return {
+                'depth': self._queue.qsize(),
+                'running': self._running,
+                'workers': self.workers,
+                'max_depth': self.max_depth,
+                'submitted': self._stats['submitted'],
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+                'rejected': self._stats['rejected'],
+                'avg_wait_seconds': self._stats['total_wait_seconds'] / finished if finished else 0.0,
+                'avg_run_seconds': self._stats['total_run_seconds'] / finished if finished else 0.0,
+            }
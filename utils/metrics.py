@@ -0,0 +1,266 @@
+import bisect
+import functools
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from flask import Response, before_render_template, g, has_request_context, request, template_rendered
+
+# Set METRICS_ENABLED=false to turn spans into no-ops and hide /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Add a Server-Timing header to every response (always on when the app runs in debug mode)
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'false').lower() == 'true'
+# Who may scrape /metrics: clients at these comma-separated addresses, or any client sending
+# "Authorization: Bearer <METRICS_TOKEN>". Neither is set by default, so /metrics answers 403
+# until one is. Behind a reverse proxy every client has the proxy's address; use the token there.
+METRICS_ALLOWED_IPS = {ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()}
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow LLM call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus format, one series per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self) -> Dict[Labels, Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for key, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", le),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {total:.6f}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter in the Prometheus format, one series per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Labels, float]:
+        with self._lock:
+            return dict(self._series)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f'{self.name}{_format_labels(key)} {_format_value(value)}')
+        return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+stage_duration = Histogram('hireai_stage_duration_seconds', 'Time spent in an instrumented stage')
+stage_errors = Counter('hireai_stage_errors_total', 'Instrumented stages that raised an exception')
+request_duration = Histogram('hireai_http_request_duration_seconds', 'HTTP request handling time by endpoint')
+requests_total = Counter('hireai_http_requests_total', 'HTTP requests by endpoint, method and status')
+
+_metrics = [stage_duration, stage_errors, request_duration, requests_total]
+# name -> (help, type, label, collect) for values kept by other modules
+_collectors: Dict[str, Tuple[str, str, str, Callable[[], Dict]]] = {}
+
+
+def register_collector(name: str, help_text: str, collect: Callable[[], Dict[str, float]],
+                       label: str = 'kind', kind: str = 'gauge'):
+    """
+    Export counters another module already keeps (cache stats, queue stats) on /metrics.
+
+    Args:
+        name (str): Metric name
+        help_text (str): HELP line
+        collect (Callable): Returns {label value: number}; non-numeric values are skipped
+        label (str): Label name for the dict keys
+        kind (str): Prometheus type, 'gauge' or 'counter'
+    """
+    _collectors[name] = (help_text, kind, label, collect)
+
+
+def _render_collectors() -> List[str]:
+    lines = []
+    for name, (help_text, kind, label, collect) in sorted(_collectors.items()):
+        try:
+            values = collect()
+        except Exception as e:
+            print(f"Error collecting metric {name}: {e}")
+            continue
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for key, value in sorted(values.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f'{name}{_format_labels(((label, key),))} {_format_value(value)}')
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics of this process in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines += metric.render()
+    lines += _render_collectors()
+    return '\n'.join(lines) + '\n'
+
+
+def _record(stage: str, elapsed: float, failed: bool):
+    stage_duration.observe(elapsed, stage=stage)
+    if failed:
+        stage_errors.inc(stage=stage)
+    timings = _request_timings()
+    if timings is not None:
+        total, count = timings.get(stage, (0.0, 0))
+        timings[stage] = (total + elapsed, count + 1)
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a block as `stage`: a histogram observation, an error count if it raises,
+    and a Server-Timing entry when it runs on a request thread.
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        _record(stage, time.perf_counter() - start, failed)
+
+
+def timed(stage: Optional[str] = None):
+    """Decorator form of span(); the stage defaults to the function name."""
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _record(name, time.perf_counter() - start, failed)
+        return wrapper
+    return decorator
+
+
+def _request_timings() -> Optional[Dict[str, Tuple[float, int]]]:
+    """Per-request stage totals, or None outside a request (e.g. on a worker thread)."""
+    if not has_request_context():
+        return None
+    return g.get('_stage_timings')
+
+
+def server_timing_header(timings: Dict[str, Tuple[float, int]], total: float) -> str:
+    """Server-Timing value with one entry per stage (summed over repeated calls) plus the total."""
+    entries = [f'{stage};dur={seconds * 1000:.1f};desc="{count}x"' for stage, (seconds, count) in timings.items()]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def metrics_access_allowed() -> bool:
+    """True if the current request may read /metrics (see METRICS_ALLOWED_IPS and METRICS_TOKEN)."""
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(token.strip(), METRICS_TOKEN):
+            return True
+    return request.remote_addr in METRICS_ALLOWED_IPS
+
+
+def init_app(app):
+    """
+    Record request latency, time template rendering and serve /metrics.
+
+    /metrics is only served to METRICS_ALLOWED_IPS and holders of METRICS_TOKEN.
+    Metrics are per process; with several workers, scrape each one or sum them downstream.
+    """
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def _start_request_timer():
+        g._request_started = time.perf_counter()
+        g._stage_timings = {}
+
+    @app.after_request
+    def _finish_request_timer(response):
+        started = g.get('_request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        request_duration.observe(elapsed, endpoint=endpoint)
+        requests_total.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        if (app.debug or METRICS_SERVER_TIMING) and g.get('_stage_timings') is not None:
+            response.headers['Server-Timing'] = server_timing_header(g._stage_timings, elapsed)
+        return response
+
+    def _template_started(sender, template, context, **extra):
+        g.setdefault('_template_starts', []).append(time.perf_counter())
+
+    def _template_finished(sender, template, context, **extra):
+        starts = g.get('_template_starts')
+        if starts:
+            _record('render_template', time.perf_counter() - starts.pop(), False)
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+    @app.route('/metrics')
+    def metrics():
+        if not metrics_access_allowed():
+            return Response('Forbidden', status=403, content_type='text/plain; charset=utf-8')
+        return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
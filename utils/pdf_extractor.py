@@ -1,27 +1,204 @@
-from PyPDF2 import PdfReader
-import io
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from utils.metrics import timed
 
-def extract_text_from_pdf(pdf_file):
+# Resumes longer than this are truncated
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '20'))
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', '50000'))
+# Time budget for extracting a single page, in seconds
+PDF_PAGE_TIMEOUT = float(os.getenv('PDF_PAGE_TIMEOUT', '2.0'))
+# Non-seekable uploads larger than this are spooled to a temp file instead of memory
+PDF_SPOOL_MAX_MEMORY = int(os.getenv('PDF_SPOOL_MAX_MEMORY', str(1024 * 1024)))
+# Time allowed for a whole extraction in a separate process (extract_text_from_pdf_path), in seconds
+PDF_EXTRACT_TIMEOUT = float(os.getenv('PDF_EXTRACT_TIMEOUT', '30'))
+
+
+class PageTimeout(Exception):
+    """Raised when a page takes longer than its time budget to extract."""
+
+
+def _seekable_stream(pdf_file):
+    """
+    Return a seekable stream for the PDF without copying it if possible.
+    Uploads are read from their underlying stream; anything that can't seek
+    is spooled, spilling to a temp file past PDF_SPOOL_MAX_MEMORY bytes.
+    """
+    stream = getattr(pdf_file, 'stream', pdf_file)
+    try:
+        if stream.seekable():
+            stream.seek(0)
+            return stream
+    except (AttributeError, OSError):
+        pass
+    spooled = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(stream, spooled)
+    spooled.seek(0)
+    return spooled
+
+
+@contextmanager
+def _time_budget(seconds: float):
+    """
+    Interrupt the block with PageTimeout after `seconds`.
+    Uses SIGALRM, which is only available on the main thread on Unix; elsewhere
+    the caller falls back to checking the elapsed time after each page, which
+    can't stop a page that never finishes. Code on worker threads should use
+    extract_text_from_pdf_path(), which runs on the main thread of a child process.
+    """
+    if (seconds <= 0 or not hasattr(signal, 'setitimer')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def _raise_timeout(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def iter_pdf_pages(pdf_file, max_pages: int = PDF_MAX_PAGES,
+                   page_timeout: float = PDF_PAGE_TIMEOUT) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF, one page at a time.
+
+    Stops after `max_pages` pages, or at the first page that exceeds its
+    time budget so a pathological PDF can't pin a worker.
+
+    Args:
+        pdf_file: FileStorage object from Flask request.files, or any binary file object
+        max_pages (int): Maximum number of pages to extract
+        page_timeout (float): Time budget per page in seconds
+
+    Yields:
+        str: Text of each page
+    """
+    from PyPDF2 import PdfReader
+    pdf_reader = PdfReader(_seekable_stream(pdf_file))
+    for i, page in enumerate(pdf_reader.pages):
+        if i >= max_pages:
+            print(f"PDF truncated to {max_pages} pages")
+            return
+        start = time.perf_counter()
+        try:
+            with _time_budget(page_timeout):
+                text = page.extract_text() or ""
+        except PageTimeout:
+            print(f"PDF page {i + 1} exceeded its {page_timeout}s budget, stopping extraction")
+            return
+        yield text
+        if time.perf_counter() - start > page_timeout:
+            print(f"PDF page {i + 1} exceeded its {page_timeout}s budget, stopping extraction")
+            return
+
+
+@timed()
+def extract_text_from_pdf(pdf_file, max_pages: Optional[int] = None, max_chars: Optional[int] = None):
     """
     Extract text from a PDF file.
-    
+
     Args:
         pdf_file: FileStorage object from Flask request.files
-        
+        max_pages (int, optional): Page limit, defaults to PDF_MAX_PAGES
+        max_chars (int, optional): Character limit, defaults to PDF_MAX_CHARS
+
     Returns:
-        str: Extracted text from the PDF
+        str: Extracted text from the PDF, pages separated by form feeds (\f)
     """
+    max_pages = max_pages or PDF_MAX_PAGES
+    max_chars = max_chars or PDF_MAX_CHARS
     try:
-        # Read the PDF file
-        pdf_reader = PdfReader(io.BytesIO(pdf_file.read()))
-        
-        # Extract text from all pages
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-            
-        return text.strip()
-        
+        # Collect pages and join once instead of growing a string
+        pages = []
+        total_chars = 0
+        for text in iter_pdf_pages(pdf_file, max_pages=max_pages):
+            pages.append(text)
+            total_chars += len(text) + 1
+            if total_chars >= max_chars:
+                print(f"PDF text truncated to {max_chars} characters")
+                break
+
+        # Form feeds mark page breaks, so repeated page headers can be found later
+        return "\f".join(pages)[:max_chars].strip()
+
     except Exception as e:
         print(f"Error extracting text from PDF: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+
+
+def _extract_in_child(path: str, max_pages: Optional[int], max_chars: Optional[int], conn):
+    """Extraction process: send the text (or None) back through the pipe."""
+    with open(path, 'rb') as f:
+        conn.send(extract_text_from_pdf(f, max_pages=max_pages, max_chars=max_chars))
+    conn.close()
+
+
+_mp_context = None
+
+
+def _context():
+    # forkserver children are forked from a clean single-threaded server with the
+    # extractor already imported: cheap to start, and safe to use from a threaded worker
+    global _mp_context
+    if _mp_context is None:
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['utils.pdf_extractor', 'PyPDF2'])
+        else:
+            context = multiprocessing.get_context('spawn')
+        _mp_context = context
+    return _mp_context
+
+
+@timed()
+def extract_text_from_pdf_path(path: str, timeout: Optional[float] = None, max_pages: Optional[int] = None,
+                               max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Extract text from a PDF file on disk in a separate process, killed after `timeout`.
+
+    Unlike extract_text_from_pdf(), a pathological PDF can't hold the calling
+    thread past the timeout, from any thread, and the per-page budget applies
+    too since the child extracts on its main thread.
+
+    Args:
+        path (str): PDF file path
+        timeout (float, optional): Seconds allowed, defaults to PDF_EXTRACT_TIMEOUT
+        max_pages (int, optional): Page limit, defaults to PDF_MAX_PAGES
+        max_chars (int, optional): Character limit, defaults to PDF_MAX_CHARS
+
+    Returns:
+        str: Extracted text as extract_text_from_pdf() returns it, or None on error or timeout
+    """
+    timeout = PDF_EXTRACT_TIMEOUT if timeout is None else timeout
+    context = _context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_extract_in_child, args=(path, max_pages, max_chars, sender),
+                              name='pdf-extract', daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        print(f"PDF extraction exceeded its {timeout}s budget, stopping it")
+        return None
+    except EOFError:
+        process.join()
+        print(f"PDF extraction process exited with code {process.exitcode}")
+        return None
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
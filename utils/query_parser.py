@@ -0,0 +1,153 @@
+import re
+from typing import Dict, List, Tuple
+
+# Known skills: lowercase alias -> canonical name
+KNOWN_SKILLS = {
+    'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'js': 'JavaScript',
+    'typescript': 'TypeScript', 'ts': 'TypeScript', 'node.js': 'Node.js', 'nodejs': 'Node.js',
+    'node': 'Node.js', 'react': 'React', 'react.js': 'React', 'reactjs': 'React',
+    'angular': 'Angular', 'vue': 'Vue', 'vue.js': 'Vue', 'go': 'Go', 'golang': 'Go',
+    'rust': 'Rust', 'c++': 'C++', 'cpp': 'C++', 'c#': 'C#', 'ruby': 'Ruby', 'rails': 'Rails',
+    'php': 'PHP', 'swift': 'Swift', 'kotlin': 'Kotlin', 'scala': 'Scala', 'sql': 'SQL',
+    'postgresql': 'PostgreSQL', 'postgres': 'PostgreSQL', 'mysql': 'MySQL', 'mongodb': 'MongoDB',
+    'redis': 'Redis', 'aws': 'AWS', 'gcp': 'GCP', 'azure': 'Azure', 'docker': 'Docker',
+    'kubernetes': 'Kubernetes', 'k8s': 'Kubernetes', 'terraform': 'Terraform',
+    'django': 'Django', 'flask': 'Flask', 'fastapi': 'FastAPI', 'spring': 'Spring',
+    'pytorch': 'PyTorch', 'tensorflow': 'TensorFlow', 'langchain': 'LangChain', 'rag': 'RAG',
+    'llm': 'LLMs', 'llms': 'LLMs', 'nlp': 'NLP', 'machine learning': 'Machine Learning',
+    'ml': 'Machine Learning', 'deep learning': 'Deep Learning', 'data science': 'Data Science',
+    'computer vision': 'Computer Vision', 'pandas': 'Pandas', 'numpy': 'NumPy',
+    'spark': 'Spark', 'hadoop': 'Hadoop', 'graphql': 'GraphQL', 'git': 'Git',
+    'linux': 'Linux', 'html': 'HTML', 'css': 'CSS',
+}
+
+# Known locations: lowercase alias -> canonical name
+KNOWN_LOCATIONS = {
+    'berlin': 'Berlin', 'munich': 'Munich', 'london': 'London', 'paris': 'Paris',
+    'amsterdam': 'Amsterdam', 'dublin': 'Dublin', 'new york': 'New York', 'nyc': 'New York',
+    'san francisco': 'San Francisco', 'sf': 'San Francisco', 'seattle': 'Seattle',
+    'austin': 'Austin', 'boston': 'Boston', 'chicago': 'Chicago', 'los angeles': 'Los Angeles',
+    'toronto': 'Toronto', 'vancouver': 'Vancouver', 'bangalore': 'Bangalore',
+    'bengaluru': 'Bangalore', 'mumbai': 'Mumbai', 'delhi': 'Delhi', 'hyderabad': 'Hyderabad',
+    'pune': 'Pune', 'chennai': 'Chennai', 'singapore': 'Singapore', 'sydney': 'Sydney',
+    'tokyo': 'Tokyo', 'india': 'India', 'germany': 'Germany', 'usa': 'USA',
+    'united states': 'USA', 'uk': 'UK', 'united kingdom': 'UK', 'canada': 'Canada',
+    'remote': 'Remote',
+}
+
+# Known job titles: lowercase phrase -> canonical title
+KNOWN_TITLES = {
+    'software engineer': 'Software Engineer', 'backend engineer': 'Backend Engineer',
+    'backend developer': 'Backend Developer', 'frontend engineer': 'Frontend Engineer',
+    'frontend developer': 'Frontend Developer', 'full stack developer': 'Full Stack Developer',
+    'fullstack developer': 'Full Stack Developer', 'data scientist': 'Data Scientist',
+    'data engineer': 'Data Engineer', 'ml engineer': 'ML Engineer',
+    'devops engineer': 'DevOps Engineer', 'product manager': 'Product Manager',
+}
+
+# Words that carry no filter information and don't lower confidence
+FILLER_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'with', 'in', 'at', 'of', 'for', 'from', 'who', 'is',
+    'looking', 'need', 'want', 'find', 'hire', 'hiring', 'someone', 'people', 'candidates',
+    'candidate', 'dev', 'devs', 'developer', 'developers', 'engineer', 'engineers',
+    'experience', 'experienced', 'exp', 'knows', 'knowing', 'skilled', 'based', 'located',
+    'least', 'min', 'minimum', 'plus', 'more', 'than', 'over', '+',
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+# "5 years", "5+ yrs", and ranges like "3-5 years" or "3 to 5 years" (the lower bound is the minimum)
+_YEARS_RE = re.compile(r"\b(?:(\d{1,2})\s*(?:-|–|to)\s*)?(\d{1,2})\s*\+?\s*(?:years?|yrs?|yoe)\b")
+# Words before "N years" that make N a maximum, which the filter format can't express
+_MAX_YEARS_RE = re.compile(r"(?:\b(?:under|below|less than|fewer than|up to|at most|max|maximum|no more than)|<)\s*$")
+
+
+def tokenize_query(query: str) -> List[str]:
+    """
+    Split a query into lowercase tokens, keeping skill punctuation like C++, C# and Node.js.
+    Args:
+        query (str): Free-text search query
+    Returns:
+        List[str]: Tokens
+    """
+    return [t.rstrip('.') for t in _TOKEN_RE.findall(query.lower())]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Fold case, whitespace and word order so equivalent queries share a cache key.
+    Numbers keep their order, after the sorted words, so "3 to 5 years" and
+    "5 to 3 years" stay apart.
+    Args:
+        query (str): Free-text search query
+    Returns:
+        str: Normalized query
+    """
+    tokens = tokenize_query(query)
+    numbers = [t for t in tokens if any(c.isdigit() for c in t)]
+    words = [t for t in tokens if not any(c.isdigit() for c in t)]
+    return ' '.join(sorted(words) + numbers)
+
+
+def _match_phrases(tokens: List[str], phrases: Dict[str, str], used: List[bool]) -> List[str]:
+    """Greedily match two-word then one-word phrases, marking matched tokens as used."""
+    matches = []
+    for size in (2, 1):
+        for i in range(len(tokens) - size + 1):
+            if any(used[i:i + size]):
+                continue
+            phrase = ' '.join(tokens[i:i + size])
+            if phrase in phrases:
+                matches.append(phrases[phrase])
+                for j in range(i, i + size):
+                    used[j] = True
+    return matches
+
+
+def parse_query_locally(query: str) -> Tuple[Dict, float]:
+    """
+    Deterministically parse common recruiter queries ("python 5+ years berlin").
+
+    Recognizes known skills, known locations, known job titles and "N years"
+    or "N-M years" experience requirements. Upper bounds ("under 5 years")
+    are left to the LLM. Confidence is the share of meaningful tokens that
+    were recognized, so anything the parser doesn't understand pushes the
+    query to the LLM.
+    Args:
+        query (str): Free-text search query
+    Returns:
+        Tuple[Dict, float]: (structured filter in the interpret_search_query format, confidence 0-1)
+    """
+    lowered = query.lower()
+    min_experience_years = None
+    max_years = False
+    years_match = _YEARS_RE.search(lowered)
+    if years_match:
+        max_years = bool(_MAX_YEARS_RE.search(lowered[:years_match.start()]))
+        if not max_years:
+            min_experience_years = int(years_match.group(1) or years_match.group(2))
+        lowered = lowered[:years_match.start()] + ' ' + lowered[years_match.end():]
+
+    tokens = tokenize_query(lowered)
+    used = [False] * len(tokens)
+    titles = _match_phrases(tokens, KNOWN_TITLES, used)
+    locations = _match_phrases(tokens, KNOWN_LOCATIONS, used)
+    skills = _match_phrases(tokens, KNOWN_SKILLS, used)
+
+    filters = {
+        'skills': list(dict.fromkeys(skills)),
+        'min_experience_years': min_experience_years,
+        'location': locations[0] if locations else '',
+        'job_title': titles[0] if titles else '',
+        'industry': ''
+    }
+
+    # Several locations, or an experience maximum ("under 5 years"), can't be expressed as filters
+    if len(set(locations)) > 1 or max_years:
+        return filters, 0.0
+
+    meaningful = [i for i, t in enumerate(tokens) if used[i] or t not in FILLER_WORDS]
+    recognized = sum(1 for i in meaningful if used[i]) + (1 if years_match else 0)
+    total = len(meaningful) + (1 if years_match else 0)
+    if recognized == 0:
+        return filters, 0.0
+    return filters, recognized / total
@@ -1,23 +1,247 @@
-from typing import List, Dict
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from utils.metrics import timed
 
+# Size of the hashed feature vectors
+EMBEDDING_DIM = int(os.getenv('RANKER_EMBEDDING_DIM', '128'))
+# Weight of query similarity vs. background score in the blended rank score
+SIMILARITY_WEIGHT = float(os.getenv('RANKER_SIMILARITY_WEIGHT', '0.7'))
+
+# Relative weight of each candidate field in the candidate vector
+FIELD_WEIGHTS = {
+    'skills': 2.0,
+    'current_location': 1.0,
+    'education': 0.5,
+}
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def _features(text: str) -> List[str]:
+    """Lowercase unigrams and bigrams of a piece of text."""
+    words = [w.rstrip('.') for w in _WORD_RE.findall(text.lower())]
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def _add_features(vector: np.ndarray, features: Iterable[str], weight: float):
+    """Feature-hash tokens into `vector`, using one hash bit for the sign."""
+    dim = vector.shape[0]
+    for feature in features:
+        h = zlib.crc32(feature.encode('utf-8'))
+        vector[h % dim] += weight if (h >> 31) & 1 else -weight
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_query(query: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Embed a search query into a unit-length hashed feature vector.
+
+    Args:
+        query (str): The search query
+        dim (int): Vector size
+
+    Returns:
+        np.ndarray: float32 vector of length `dim`
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    _add_features(vector, _features(query), 1.0)
+    return _normalize(vector)
+
+
+def embed_candidate(candidate: Dict, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Embed a candidate's skills, education and location into a unit-length hashed feature vector.
+
+    Args:
+        candidate (Dict): Candidate row
+        dim (int): Vector size
+
+    Returns:
+        np.ndarray: float32 vector of length `dim`
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for skill in candidate.get('skills') or []:
+        _add_features(vector, _features(str(skill)), FIELD_WEIGHTS['skills'])
+    for field in ('current_location', 'education'):
+        if candidate.get(field):
+            _add_features(vector, _features(str(candidate[field])), FIELD_WEIGHTS[field])
+    return _normalize(vector)
+
+
+class CandidateVectorIndex:
+    """
+    Precomputed, L2-normalized candidate matrix for cosine-similarity ranking.
+
+    Rows are added or replaced incrementally as candidates are saved, and the
+    matrix grows by doubling so upserts are amortized O(dim).
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._background = np.zeros(capacity, dtype=np.float32)
+        self._ids = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self._rows
+
+    def upsert(self, candidate: Dict):
+        """
+        Add or replace a candidate's vector.
+
+        Args:
+            candidate (Dict): Candidate row, must include 'id'
+        """
+        candidate_id = candidate.get('id')
+        if candidate_id is None:
+            return
+        vector = embed_candidate(candidate, self.dim)
+        with self._lock:
+            row = self._rows.get(candidate_id)
+            if row is None:
+                row = len(self._ids)
+                if row == self._matrix.shape[0]:
+                    self._grow()
+                self._ids.append(candidate_id)
+                self._rows[candidate_id] = row
+            self._matrix[row] = vector
+            if candidate.get('background_score') is not None:
+                self._background[row] = candidate['background_score'] / 100.0
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] * 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        background = np.zeros(capacity, dtype=np.float32)
+        background[:len(self._ids)] = self._background[:len(self._ids)]
+        self._matrix, self._background = matrix, background
+
+    def similarities(self, query: str, candidate_ids: List) -> np.ndarray:
+        """
+        Cosine similarity between a query and the given candidates.
+
+        Args:
+            query (str): The search query
+            candidate_ids (List): Candidate ids, ids not in the index score 0
+
+        Returns:
+            np.ndarray: float32 similarities in the order of `candidate_ids`
+        """
+        query_vector = embed_query(query, self.dim)
+        similarity = np.zeros(len(candidate_ids), dtype=np.float32)
+        with self._lock:
+            positions = [(i, self._rows[c]) for i, c in enumerate(candidate_ids) if c in self._rows]
+            if positions:
+                index, rows = map(list, zip(*positions))
+                similarity[index] = self._matrix[rows] @ query_vector
+        return similarity
+
+    def top_k(self, query: str, k: int = 50, candidate_ids: Optional[List] = None,
+              after: Optional[Tuple[float, str]] = None) -> List[Tuple[object, float]]:
+        """
+        Return the k best candidates for a query by blended similarity and background score.
+
+        Ties are broken by candidate id, so the order is total and pages can be
+        keyed on the (score, id) of the last result.
+
+        Args:
+            query (str): The search query
+            k (int): Number of results
+            candidate_ids (List, optional): Restrict ranking to these ids (e.g. the filtered result set)
+            after (Tuple[float, str], optional): (score, str(id)) of the last result of the
+                previous page; only candidates ranked after it are returned
+
+        Returns:
+            List[Tuple[object, float]]: (candidate_id, blended score 0-1), best first
+        """
+        query_vector = embed_query(query, self.dim)
+        with self._lock:
+            if candidate_ids is None:
+                # Slice rather than fancy-index so the matrix isn't copied
+                count = len(self._ids)
+                rows = np.arange(count)
+                matrix, background = self._matrix[:count], self._background[:count]
+            else:
+                rows = np.array([self._rows[i] for i in candidate_ids if i in self._rows], dtype=np.int64)
+                matrix, background = self._matrix[rows], self._background[rows]
+            if rows.size == 0:
+                return []
+            blended = matrix @ query_vector
+            blended *= SIMILARITY_WEIGHT
+            blended += (1 - SIMILARITY_WEIGHT) * background
+            ids = self._ids
+
+        if after is None:
+            selected = np.arange(rows.size)
+        else:
+            score, last_id = np.float32(after[0]), after[1]
+            keep = blended < score
+            for i in np.flatnonzero(blended == score):
+                keep[i] = str(ids[rows[i]]) > last_id
+            selected = np.flatnonzero(keep)
+        if selected.size == 0:
+            return []
+        k = min(k, selected.size)
+        kth = blended[selected[np.argpartition(-blended[selected], k - 1)[k - 1]]]
+        # Every candidate tied with the k-th score competes on id, not on partition order
+        top = selected[blended[selected] >= kth]
+        top = sorted(top, key=lambda i: (-blended[i], str(ids[rows[i]])))[:k]
+        return [(ids[rows[i]], float(blended[i])) for i in top]
+
+
+# Process-wide index, kept up to date by utils.supabase_client.save_candidate
+candidate_vector_index = CandidateVectorIndex()
+
+
+@timed()
 def rank_candidates(query: str, candidates: List[Dict]) -> List[Dict]:
     """
     Rank candidates based on their match to the search query.
-    
-    TODO: Implement proper ranking using:
-    - sentence-transformers for skill vector comparison
-    - RAG-style matching logic
-    - Real embedding ranking (optional with Weaviate / Pinecone)
-    
+
+    The rank score blends the cosine similarity between the hashed query vector
+    and each candidate's precomputed vector with the candidate's background score.
+    Candidates missing from the vector index are embedded and added on the fly.
+
     Args:
         query (str): The original search query
         candidates (List[Dict]): List of candidate dictionaries from Supabase
-        
+
     Returns:
-        List[Dict]: Ranked list of candidates with rank_score added
+        List[Dict]: Ranked list of candidates with rank_score (0-100) added
     """
-    # Placeholder for future RAG + embedding-based ranking
-    # For now, return candidates in original order with dummy rank
-    for i, c in enumerate(candidates):
-        c["rank_score"] = 100 - i  # Dummy decreasing score
-    return candidates 
\ No newline at end of file
+    if not candidates:
+        return candidates
+
+    for c in candidates:
+        if c.get('id') is not None and c['id'] not in candidate_vector_index:
+            candidate_vector_index.upsert(c)
+    similarity = candidate_vector_index.similarities(query, [c.get('id') for c in candidates])
+
+    # Candidates without an id can't be indexed, embed them directly
+    unindexed = [i for i, c in enumerate(candidates) if c.get('id') is None]
+    if unindexed:
+        query_vector = embed_query(query)
+        for i in unindexed:
+            similarity[i] = embed_candidate(candidates[i]) @ query_vector
+
+    background = np.array([(c.get('background_score') or 0) / 100.0 for c in candidates], dtype=np.float32)
+    blended = SIMILARITY_WEIGHT * similarity + (1 - SIMILARITY_WEIGHT) * background
+
+    for c, score in zip(candidates, blended):
+        c["rank_score"] = int(round(max(float(score), 0.0) * 100))
+    return sorted(candidates, key=lambda c: c["rank_score"], reverse=True)
@@ -0,0 +1,150 @@
+import itertools
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+from utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Set RESUME_COMPACTION=false to send resume text to Gemini as extracted
+RESUME_COMPACTION = os.getenv('RESUME_COMPACTION', 'true').lower() == 'true'
+# Estimated tokens of resume text sent to Gemini, about ten dense pages; longer resumes are cut
+# at a line boundary and the cut is logged. 0 for no limit
+RESUME_TOKEN_BUDGET = int(os.getenv('RESUME_TOKEN_BUDGET', '8000'))
+# Lines at the top and bottom of each page checked for repeated headers and footers
+HEADER_FOOTER_LINES = 2
+
+# Rough stand-in for Gemini's tokenizer: word pieces of up to 4 characters, punctuation,
+# and runs of whitespace (a single space is part of the next word)
+_TOKEN_RE = re.compile(r'\w{1,4}|[^\w\s]|\s{2,}')
+_SPACES_RE = re.compile(r'[ \t\u00a0\u200b\r\v]+')
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0e-\x1f\x7f]')
+_DIGITS_RE = re.compile(r'\d+')
+# Page numbers at the top or bottom of a page: "3", "- 3 -", "Page 3", "Page 3 of 4", "3/4"
+_PAGE_NUMBER_RE = re.compile(r'^[-–\s]*(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?[-–\s]*$', re.IGNORECASE)
+
+_stats = {'resumes': 0, 'tokens_before': 0, 'tokens_after': 0, 'chars_before': 0, 'chars_after': 0,
+          'header_footer_lines_dropped': 0, 'truncated': 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens Gemini counts for a text, without calling the API.
+    Args:
+        text (str): Any text
+    Returns:
+        int: Estimated token count
+    """
+    return len(_TOKEN_RE.findall(text))
+
+
+def _line_key(line: str) -> str:
+    """Lines that differ only in page numbers or case compare equal."""
+    return _DIGITS_RE.sub('#', line.lower())
+
+
+def _repeated_page_lines(pages: List[List[str]]) -> set:
+    """Keys of lines found at the top or bottom of at least half the pages (and at least 2)."""
+    if len(pages) < 2:
+        return set()
+    seen = Counter()
+    for lines in pages:
+        edges = lines[:HEADER_FOOTER_LINES] + lines[-HEADER_FOOTER_LINES:]
+        seen.update({_line_key(line) for line in edges})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in seen.items() if count >= threshold}
+
+
+def compact_resume_text(text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> Tuple[str, Dict]:
+    """
+    Shrink resume text before it is sent to Gemini.
+
+    - Whitespace is normalized: runs of spaces collapse to one, lines are
+      stripped and runs of blank lines collapse to one.
+    - Page headers and footers repeated across pages are kept only where they
+      first appear, and page numbers at the top or bottom of a page are dropped.
+      Only the first and last lines of each page are checked, so repeated lines
+      in the body (e.g. the same bullet under two jobs) are kept. Pages are
+      separated by form feeds, as extract_text_from_pdf() returns them.
+    - The text is cut where it reaches `token_budget` estimated tokens. Cuts
+      are logged as warnings and counted in compaction_stats().
+    Args:
+        text (str): Extracted resume text
+        token_budget (int): Maximum estimated tokens, 0 for no limit
+    Returns:
+        Tuple[str, Dict]: Compacted text, and a report with tokens_before, tokens_after,
+            chars_before, chars_after, header_footer_lines_dropped and truncated
+    """
+    text = _CONTROL_RE.sub('', text)
+    pages = [[_SPACES_RE.sub(' ', line).strip() for line in page.split('\n')] for page in text.split('\f')]
+    repeated = _repeated_page_lines([[line for line in lines if line] for lines in pages])
+
+    compacted = []
+    seen_repeated = set()
+    dropped = 0
+    for lines in pages:
+        count = sum(1 for line in lines if line)
+        position = 0
+        for line in lines:
+            if line:
+                key = _line_key(line)
+                edge = position < HEADER_FOOTER_LINES or position >= count - HEADER_FOOTER_LINES
+                position += 1
+                if edge and (_PAGE_NUMBER_RE.match(line) or key in seen_repeated):
+                    dropped += 1
+                    continue
+                if edge and key in repeated:
+                    seen_repeated.add(key)
+            # Keep single blank lines; they separate resume sections
+            if line or (compacted and compacted[-1]):
+                compacted.append(line)
+        if compacted and compacted[-1]:
+            compacted.append('')
+
+    truncated = False
+    if token_budget > 0:
+        tokens = 0
+        for i, line in enumerate(compacted):
+            # A blank line is a paragraph break, one token
+            line_tokens = estimate_tokens(line) if line else 1
+            if tokens + line_tokens > token_budget:
+                # Keep the part of this line that still fits
+                pieces = list(itertools.islice(_TOKEN_RE.finditer(line), token_budget - tokens))
+                compacted = compacted[:i] + ([line[:pieces[-1].end()]] if pieces else [])
+                truncated = True
+                break
+            tokens += line_tokens
+    result = '\n'.join(compacted).strip()
+
+    report = {
+        'tokens_before': estimate_tokens(text),
+        'tokens_after': estimate_tokens(result),
+        'chars_before': len(text),
+        'chars_after': len(result),
+        'header_footer_lines_dropped': dropped,
+        'truncated': truncated,
+    }
+    if truncated:
+        logger.warning('Resume text cut to the %d token budget: %d -> %d estimated tokens',
+                       token_budget, report['tokens_before'], report['tokens_after'])
+    _stats['resumes'] += 1
+    for key in ('tokens_before', 'tokens_after', 'chars_before', 'chars_after', 'header_footer_lines_dropped'):
+        _stats[key] += report[key]
+    _stats['truncated'] += truncated
+    return result, report
+
+
+def compaction_stats() -> Dict[str, int]:
+    """
+    Return totals over every compacted resume, for the tokens (and so cost and latency) saved.
+    Returns:
+        Dict[str, int]: resumes, tokens_before, tokens_after, chars_before, chars_after,
+            header_footer_lines_dropped and truncated (resumes cut to the token budget)
+    """
+    return dict(_stats)
+
+
+register_collector('hireai_resume_compaction', 'Resume text compaction before Gemini, totals', compaction_stats,
+                   kind='counter')
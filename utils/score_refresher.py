@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from utils.background_quality import background_score_fields, iter_background_scores
+from utils.github_client import PRIORITY_BACKGROUND
+from utils.candidate_repository import get_repository
+from utils.metrics import register_collector
+from utils.supabase_client import update_candidate_scores
+
+# Set BACKGROUND_SCORE_REFRESH=true to start the refresher inside the app process; only for a
+# single-process server. Under gunicorn run it once, as `python -m utils.score_refresher`.
+BACKGROUND_SCORE_REFRESH = os.getenv('BACKGROUND_SCORE_REFRESH', 'false').lower() == 'true'
+# Stored scores older than this are recomputed, in seconds
+BACKGROUND_SCORE_MAX_AGE = float(os.getenv('BACKGROUND_SCORE_MAX_AGE', str(7 * 24 * 3600)))
+# Seconds between refresh runs when nothing is waiting
+BACKGROUND_SCORE_REFRESH_INTERVAL = float(os.getenv('BACKGROUND_SCORE_REFRESH_INTERVAL', '600'))
+# Candidates scored per run, and the time allowed for their lookups
+BACKGROUND_SCORE_REFRESH_BATCH = int(os.getenv('BACKGROUND_SCORE_REFRESH_BATCH', '100'))
+BACKGROUND_SCORE_REFRESH_DEADLINE = float(os.getenv('BACKGROUND_SCORE_REFRESH_DEADLINE', '60'))
+# Lookup threads for refreshes, separate from the search pool so a refresh never delays a search
+BACKGROUND_SCORE_REFRESH_WORKERS = int(os.getenv('BACKGROUND_SCORE_REFRESH_WORKERS', '4'))
+
+# Columns needed to score a candidate
+SCORE_COLUMNS = 'id,name,github,linkedin'
+
+
+class BackgroundScoreRefresher:
+    """
+    Keeps the background scores stored on candidate rows fresh.
+
+    Each run scores one batch of candidates and writes the scores back in bulk.
+    Candidates are taken in priority order:
+    1. Candidates that were shown in a search before they had a score (see request()).
+    2. Candidates that have never been scored or whose score is older than
+       `max_age`: those never attempted first (e.g. after a bulk import), then
+       the least recently attempted. Candidates whose lookups were deferred
+       are marked as attempted, so they can't hold the front of the queue.
+    Runs happen every `interval` seconds, immediately when a search requests a
+    candidate, and back to back while full batches of due candidates remain.
+
+    Run it in one process only; every running refresher repeats the same lookups.
+    `python -m utils.score_refresher` runs it as its own process. Web workers
+    then don't run it, so request() is a no-op there and candidates shown
+    unscored are picked up as due (2.) instead.
+    """
+
+    def __init__(self, interval: float = BACKGROUND_SCORE_REFRESH_INTERVAL,
+                 max_age: float = BACKGROUND_SCORE_MAX_AGE, batch_size: int = BACKGROUND_SCORE_REFRESH_BATCH,
+                 deadline: float = BACKGROUND_SCORE_REFRESH_DEADLINE):
+        """
+        Args:
+            interval (float): Seconds between runs when nothing is waiting
+            max_age (float): Seconds after which a stored score is recomputed
+            batch_size (int): Maximum candidates scored per run
+            deadline (float): Seconds allowed for one run's lookups
+        """
+        self.interval = interval
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self._requested = {}  # candidate id -> None, in request order
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._executor = None
+        self._stats = {'runs': 0, 'scored': 0, 'deferred': 0, 'requested': 0, 'errors': 0, 'last_run_seconds': 0.0}
+
+    def request(self, candidate_ids: Iterable[str]):
+        """Score these candidates in the next run, ahead of everything else. No-op unless started."""
+        with self._cond:
+            if self._thread is None:
+                return
+            for candidate_id in candidate_ids:
+                if candidate_id is not None and str(candidate_id) not in self._requested:
+                    self._requested[str(candidate_id)] = None
+                    self._stats['requested'] += 1
+            self._cond.notify()
+
+    def _due(self) -> List[Dict]:
+        with self._cond:
+            ids = list(self._requested)[:self.batch_size]
+            for candidate_id in ids:
+                del self._requested[candidate_id]
+        repository = get_repository()
+        candidates = repository.get_many(ids, columns=SCORE_COLUMNS) if ids else []
+        if len(candidates) < self.batch_size:
+            cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.max_age)).isoformat()
+            seen = {str(c['id']) for c in candidates}
+            candidates += [c for c in repository.due_for_scoring(cutoff, self.batch_size - len(candidates),
+                                                                 columns=SCORE_COLUMNS)
+                           if str(c['id']) not in seen]
+        return candidates
+
+    def refresh_once(self) -> int:
+        """
+        Score one batch of due candidates and store the scores.
+
+        Returns:
+            int: Number of candidates scored (a full batch means more may be due)
+        """
+        start = time.perf_counter()
+        candidates = self._due()
+        updates = []
+        deferred = 0
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=BACKGROUND_SCORE_REFRESH_WORKERS,
+                                                thread_name_prefix='background-score-refresh')
+        attempted_at = datetime.now(timezone.utc).isoformat()
+        for candidate, score, pending, components in iter_background_scores(
+                candidates, os.getenv('GITHUB_TOKEN'), self.deadline,
+                priority=PRIORITY_BACKGROUND, executor=self._executor,
+                max_in_flight=BACKGROUND_SCORE_REFRESH_WORKERS):
+            if pending:
+                # Missed the deadline or deferred by the GitHub rate limit: left unscored, and
+                # marked as attempted so it goes behind candidates not tried yet
+                deferred += 1
+                updates.append({'id': candidate['id'], 'background_score_attempted_at': attempted_at})
+                continue
+            updates.append({'id': candidate['id'], 'background_score_attempted_at': attempted_at,
+                            **background_score_fields(score, components)})
+        # Updates by id, so a candidate deleted since it was picked isn't recreated
+        if updates:
+            update_candidate_scores(updates)
+        with self._cond:
+            self._stats['runs'] += 1
+            self._stats['scored'] += len(updates) - deferred
+            self._stats['deferred'] += deferred
+            self._stats['last_run_seconds'] = time.perf_counter() - start
+        return len(updates) - deferred
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                # Catch up on a backlog in consecutive runs
+                while self.refresh_once() >= self.batch_size and not self._stopping:
+                    pass
+            except Exception as e:
+                print(f"Error refreshing background scores: {str(e)}")
+                with self._cond:
+                    self._stats['errors'] += 1
+            with self._cond:
+                if not self._requested and not self._stopping:
+                    self._cond.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Start the refresher thread; the first run happens right away."""
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._requested = {}
+                self._thread = threading.Thread(target=self._run, name='background-score-refresher', daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def stop(self):
+        """Stop the refresher thread after its current run."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> Dict:
+        """
+        Return refresher counters.
+
+        Returns:
+            Dict: runs, scored, deferred (missed the deadline or the GitHub rate limit), requested
+                (by searches), errors, waiting (requested but not yet run) and last_run_seconds
+        """
+        with self._cond:
+            return dict(self._stats, waiting=len(self._requested))
+
+
+background_score_refresher = BackgroundScoreRefresher()
+register_collector('hireai_background_score_refresher', 'Background score refresher counters',
+                   background_score_refresher.stats)
+
+
+def start_score_refresher() -> threading.Thread:
+    """Start the process-wide background score refresher."""
+    return background_score_refresher.start()
+
+
+def iter_search_scores(candidates: List[Dict], github_token: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Iterator[Tuple[Dict, int, bool]]:
+    """
+    Background scores for search results, read from the candidate rows.
+
+    Only candidates that have never been scored are looked up inline, under
+    `deadline`; they are also queued for the refresher so the score gets stored.
+    Args:
+        candidates (List[Dict]): Candidate rows, with 'background_score' and 'background_scored_at'
+        github_token (str, optional): GitHub personal access token for higher rate limits
+        deadline (float, optional): Seconds to wait for inline lookups, defaults to BACKGROUND_SCORE_DEADLINE
+    Yields:
+        Tuple[Dict, int, bool]: (candidate, background score, pending); stored scores come first
+    """
+    unscored = []
+    for candidate in candidates:
+        if candidate.get('background_scored_at') and candidate.get('background_score') is not None:
+            yield candidate, candidate['background_score'], False
+        else:
+            unscored.append(candidate)
+    if unscored:
+        background_score_refresher.request(c.get('id') for c in unscored)
+        for candidate, score, pending, _ in iter_background_scores(unscored, github_token, deadline):
+            yield candidate, score, pending
+
+
+def score_search_results(candidates: List[Dict], github_token: Optional[str] = None,
+                         deadline: Optional[float] = None) -> List[Dict]:
+    """
+    Set 'background_score' and 'background_score_pending' on search results. See iter_search_scores().
+    Returns:
+        List[Dict]: The same candidates
+    """
+    for candidate, score, pending in iter_search_scores(candidates, github_token, deadline):
+        candidate['background_score'] = score
+        candidate['background_score_pending'] = pending
+    return candidates
+
+
+def main():
+    """Run the refresher in the foreground until interrupted, as a process of its own."""
+    print(f"Refreshing background scores every {BACKGROUND_SCORE_REFRESH_INTERVAL:.0f} s, "
+          f"{BACKGROUND_SCORE_REFRESH_BATCH} candidates per run")
+    thread = background_score_refresher.start()
+    try:
+        while thread.is_alive():
+            thread.join(1.0)
+    except KeyboardInterrupt:
+        background_score_refresher.stop()
+
+
+if __name__ == '__main__':
+    main()
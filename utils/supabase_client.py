@@ -1,16 +1,202 @@
+import json
+import math
 import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from utils.ranker import candidate_vector_index
+from utils.candidate_index import candidate_index, normalize_skills
+from utils.fingerprint import FINGERPRINT_FIELDS, fingerprint_index
+from utils.candidate_repository import SCORE_UPDATE_FIELDS, CandidateRepository, get_repository
+from utils.background_quality import BACKGROUND_SCORE_FIELDS, score_candidate
+from utils.metrics import timed
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
-supabase: Client = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_KEY')
-)
+_supabase = None
+_supabase_lock = threading.Lock()
+
+def get_supabase():
+    """
+    Return the process-wide Supabase client, creating it on first use.
+    
+    The SDK is imported here rather than at module level so importing the app
+    stays fast and doesn't need Supabase credentials.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(
+                    os.getenv('SUPABASE_URL'),
+                    os.getenv('SUPABASE_KEY')
+                )
+    return _supabase
+
+# Columns written by save_candidate and save_candidates
+CANDIDATE_FIELDS = ('name', 'email', 'phone', 'skills', 'experience_years', 'education',
+                    'current_location', 'linkedin', 'github') + FINGERPRINT_FIELDS + BACKGROUND_SCORE_FIELDS
+
+# Integer columns; fractional values (e.g. 5.5 years of experience) are rounded half up before writing
+INTEGER_FIELDS = ('experience_years', 'background_score', 'github_score', 'linkedin_score', 'public_presence_score')
+
+def _round_integer_fields(candidate: Dict) -> Dict:
+    """Round fractional values of integer columns, as the upsert_candidate function does."""
+    rounded = dict(candidate)
+    for field in INTEGER_FIELDS:
+        if isinstance(rounded.get(field), float):
+            rounded[field] = math.floor(rounded[field] + 0.5)
+    return rounded
+
+# Error codes for an RPC function that doesn't exist: PostgREST's schema cache miss, and Postgres undefined_function
+MISSING_FUNCTION_ERRORS = ('PGRST202', '42883')
+
+class SupabaseCandidateRepository(CandidateRepository):
+    """
+    Candidate storage in the Supabase 'candidates' table, through PostgREST.
+    
+    Skills containment uses the jsonb contains operator on skills_normalized, a
+    generated column holding normalize_skills(skills) (see supabase/normalized_skills.sql),
+    so it matches skills the way the in-memory index does.
+    """
+    
+    def get(self, candidate_id: str, columns: str = '*') -> Optional[Dict]:
+        response = get_supabase().table('candidates').select(columns).eq('id', candidate_id).execute()
+        return response.data[0] if response.data else None
+    
+    def get_by_email(self, email: str, columns: str = '*') -> Optional[Dict]:
+        response = get_supabase().table('candidates').select(columns).eq('email', email).execute()
+        return response.data[0] if response.data else None
+    
+    def get_many(self, candidate_ids: List[str], columns: str = '*') -> List[Dict]:
+        if not candidate_ids:
+            return []
+        response = get_supabase().table('candidates').select(columns).in_('id', candidate_ids).order('id').execute()
+        return response.data or []
+    
+    @staticmethod
+    def _filtered(columns: str, skills: Optional[List[str]], min_experience_years: Optional[float],
+                  location: Optional[str]):
+        query = get_supabase().table('candidates').select(columns)
+        skills = normalize_skills(skills)
+        if skills:
+            query = query.filter('skills_normalized', 'cs', json.dumps(skills))
+        if min_experience_years:
+            query = query.gte('experience_years', min_experience_years)
+        if location:
+            query = query.ilike('current_location', f"%{location}%")
+        return query
+    
+    def search(self, skills: Optional[List[str]] = None, min_experience_years: Optional[float] = None,
+               location: Optional[str] = None, cursor: Optional[str] = None, limit: int = 20,
+               columns: str = '*') -> List[Dict]:
+        query = self._filtered(columns, skills, min_experience_years, location)
+        if cursor:
+            query = query.gt('id', cursor)
+        return query.order('id').limit(limit).execute().data or []
+    
+    def search_by_background_score(self, skills: Optional[List[str]] = None,
+                                   min_experience_years: Optional[float] = None, location: Optional[str] = None,
+                                   after: Optional[Tuple[Optional[int], str]] = None, limit: int = 20,
+                                   columns: str = '*') -> List[Dict]:
+        query = self._filtered(columns, skills, min_experience_years, location)
+        if after:
+            # Both values are spliced into the filter string, so only numbers and UUIDs get through
+            score, candidate_id = after
+            candidate_id = str(candidate_id)
+            candidate_id = int(candidate_id) if candidate_id.isdigit() else uuid.UUID(candidate_id)
+            if score is None:
+                query = query.is_('background_score', 'null').gt('id', candidate_id)
+            else:
+                score = int(score)
+                query = query.or_(f'background_score.lt.{score},'
+                                  f'and(background_score.eq.{score},id.gt.{candidate_id}),'
+                                  'background_score.is.null')
+        # One order parameter with both keys; Postgres puts NULLs first in a descending sort by default
+        return query.order('background_score.desc.nullslast,id').limit(limit).execute().data or []
+    
+    def due_for_scoring(self, scored_before: str, limit: int = 100, columns: str = '*') -> List[Dict]:
+        query = get_supabase().table('candidates').select(columns).or_(
+            f'background_scored_at.is.null,background_scored_at.lt."{scored_before}"')
+        return query.order('background_score_attempted_at.asc.nullsfirst,id').limit(limit).execute().data or []
+    
+    def changed_since(self, since: str, after: Optional[Tuple[str, str]] = None, limit: int = 1000,
+                      columns: str = '*') -> List[Dict]:
+        # updated_at is set by a trigger on every write (see supabase/candidate_updated_at.sql)
+        query = get_supabase().table('candidates').select(columns).gte('updated_at', since)
+        if after:
+            updated_at, candidate_id = after
+            query = query.or_(f'updated_at.gt."{updated_at}",'
+                              f'and(updated_at.eq."{updated_at}",id.gt."{candidate_id}")')
+        return query.order('updated_at').order('id').limit(limit).execute().data or []
+    
+    def upsert(self, candidate: Dict) -> Tuple[Optional[Dict], bool]:
+        # Insert or update in one round trip (see supabase/upsert_candidate.sql)
+        try:
+            response = get_supabase().rpc('upsert_candidate', {'candidate': candidate}).execute()
+        except Exception as e:
+            # Only a missing function falls back; constraint, auth and other errors are raised
+            if getattr(e, 'code', None) not in MISSING_FUNCTION_ERRORS:
+                raise
+            print(f"upsert_candidate function not installed, falling back to select + write: {str(e)}")
+            return self._upsert_two_step(_round_integer_fields(candidate))
+        
+        if response.data and len(response.data) > 0:
+            return response.data[0]['row_data'], response.data[0]['inserted']
+        return None, False
+    
+    def _upsert_two_step(self, candidate: Dict) -> Tuple[Optional[Dict], bool]:
+        """
+        Save a candidate with a lookup followed by an update or insert.
+        Used when the upsert_candidate function isn't installed in the database.
+        """
+        # Check if email exists
+        if self.get_by_email(candidate['email'], columns='id'):
+            # Update existing record
+            response = get_supabase().table('candidates').update(candidate).eq('email', candidate['email']).execute()
+            inserted = False
+        else:
+            # Insert new record
+            response = get_supabase().table('candidates').insert(candidate).execute()
+            inserted = True
+        
+        if response.data and len(response.data) > 0:
+            return response.data[0], inserted
+        return None, False
+    
+    def update_scores(self, updates: List[Dict]) -> List[Dict]:
+        # Every row in one round trip (see supabase/update_candidate_scores.sql)
+        updates = [_round_integer_fields({k: v for k, v in update.items() if k == 'id' or k in SCORE_UPDATE_FIELDS})
+                   for update in updates]
+        try:
+            return get_supabase().rpc('update_candidate_scores', {'updates': updates}).execute().data or []
+        except Exception as e:
+            if getattr(e, 'code', None) not in MISSING_FUNCTION_ERRORS:
+                raise
+            print(f"update_candidate_scores function not installed, updating one row at a time: {str(e)}")
+        rows = []
+        for update in updates:
+            fields = {k: v for k, v in update.items() if k != 'id' and v is not None}
+            response = get_supabase().table('candidates').update(fields).eq('id', update['id']).execute()
+            rows.extend(response.data or [])
+        return rows
+    
+    def upsert_many(self, candidates: List[Dict]) -> List[Dict]:
+        # PostgREST needs every row in a request to have the same columns, so rows
+        # are grouped by their set of fields; missing fields are left unchanged.
+        groups = {}
+        for candidate in candidates:
+            groups.setdefault(tuple(sorted(candidate)), []).append(_round_integer_fields(candidate))
+        saved = []
+        for group in groups.values():
+            response = get_supabase().table('candidates').upsert(group, on_conflict='email').execute()
+            saved.extend(response.data or [])
+        return saved
 
 def get_candidate_by_email(email: str) -> Optional[Dict]:
     """
@@ -23,17 +209,35 @@ def get_candidate_by_email(email: str) -> Optional[Dict]:
         Optional[Dict]: Candidate data if found, None if not found
     """
     try:
-        response = supabase.table('candidates').select('*').eq('email', email).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-        return None
+        return get_repository().get_by_email(email)
     except Exception as e:
         print(f"Error checking candidate email: {str(e)}")
         return None
 
+def get_candidate_by_id(candidate_id: str) -> Optional[Dict]:
+    """
+    Fetch a candidate by id.
+    
+    Args:
+        candidate_id (str): Candidate UUID
+        
+    Returns:
+        Optional[Dict]: Candidate data if found, None if not found
+    """
+    try:
+        return get_repository().get(candidate_id)
+    except Exception as e:
+        print(f"Error fetching candidate: {str(e)}")
+        return None
+
+@timed()
 def save_candidate(parsed_data: Dict) -> Tuple[Optional[str], bool]:
     """
-    Save or update candidate data in Supabase candidates table.
+    Save or update candidate data in the candidates table.
+    
+    With the Supabase store this is a single round trip through the
+    upsert_candidate database function, keyed on email, with no race between
+    checking and writing.
     
     Args:
         parsed_data (dict): Dictionary containing candidate data from Gemini parser
@@ -47,6 +251,12 @@ def save_candidate(parsed_data: Dict) -> Tuple[Optional[str], bool]:
             - current_location (optional)
             - linkedin (optional)
             - github (optional)
+            - resume_sha256, resume_text_sha256, resume_minhash (optional, see utils.fingerprint)
+    
+    The background score and its components are computed here (under the
+    background scoring deadline) and stored on the row, so searches don't have
+    to look them up. If a lookup misses the deadline the row is saved unscored
+    and utils.score_refresher scores it later.
     
     Returns:
         Tuple[Optional[str], bool]: (candidate_id, is_update)
@@ -55,41 +265,204 @@ def save_candidate(parsed_data: Dict) -> Tuple[Optional[str], bool]:
     """
     try:
         # Prepare data for insertion/update
-        candidate_data = {
-            'name': parsed_data.get('name'),
-            'email': parsed_data.get('email'),
-            'phone': parsed_data.get('phone'),
-            'skills': parsed_data.get('skills', []),  # Default to empty list if not provided
-            'experience_years': parsed_data.get('experience_years'),
-            'education': parsed_data.get('education'),
-            'current_location': parsed_data.get('current_location'),
-            'linkedin': parsed_data.get('linkedin'),
-            'github': parsed_data.get('github')
-        }
+        candidate_data = {k: parsed_data.get(k) for k in CANDIDATE_FIELDS}
+        candidate_data['skills'] = parsed_data.get('skills', [])  # Default to empty list if not provided
         
         # Remove None values to avoid inserting nulls for optional fields
         candidate_data = {k: v for k, v in candidate_data.items() if v is not None}
+        if 'background_scored_at' not in candidate_data and candidate_data.get('name'):
+            candidate_data.update(score_candidate(candidate_data, github_token=os.getenv('GITHUB_TOKEN')))
         
-        # Check if email exists
-        existing_candidate = get_candidate_by_email(candidate_data['email'])
-        
-        if existing_candidate:
-            # Update existing record
-            response = supabase.table('candidates').update(candidate_data).eq('email', candidate_data['email']).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]['id'], True
-        else:
-            # Insert new record
-            response = supabase.table('candidates').insert(candidate_data).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]['id'], False
+        row, inserted = get_repository().upsert(candidate_data)
+        if row:
+            _index_candidate(row)
+            return row['id'], not inserted
                 
         return None, False
         
     except Exception as e:
-        print(f"Error saving candidate to Supabase: {str(e)}")
+        print(f"Error saving candidate: {str(e)}")
         return None, False
 
+def _index_candidate(row: Dict):
+    """Keep the in-memory search and fingerprint indexes in sync with a saved row."""
+    candidate_vector_index.upsert(row)
+    candidate_index.upsert(row)
+    if row.get('email') and row.get('resume_sha256'):
+        fingerprint_index.add(row['email'], row, candidate_id=row['id'])
+
+# Maximum number of rows sent in one bulk upsert request
+SAVE_BATCH_SIZE = int(os.getenv('SAVE_BATCH_SIZE', '500'))
+
+def save_candidates(batch: List[Dict]) -> List[str]:
+    """
+    Insert or update many candidates, keyed on email, in as few requests as possible.
+    
+    Rows with the same email are collapsed (last one wins). Missing fields are
+    left unchanged on existing rows.
+    
+    Args:
+        batch (List[Dict]): Candidate dictionaries in the save_candidate format
+        
+    Returns:
+        List[str]: Ids of the saved candidates
+    """
+    rows = {}
+    for parsed_data in batch:
+        row = {k: parsed_data.get(k) for k in CANDIDATE_FIELDS}
+        row = {k: v for k, v in row.items() if v is not None}
+        if row.get('email'):
+            rows[row['email']] = row
+    rows = list(rows.values())
+    
+    saved_ids = []
+    for start in range(0, len(rows), SAVE_BATCH_SIZE):
+        chunk = rows[start:start + SAVE_BATCH_SIZE]
+        try:
+            for saved in get_repository().upsert_many(chunk):
+                _index_candidate(saved)
+                saved_ids.append(saved['id'])
+        except Exception as e:
+            print(f"Error saving batch of {len(chunk)} candidates: {str(e)}")
+    return saved_ids
+
+def update_candidate_scores(updates: List[Dict]) -> List[str]:
+    """
+    Store background scores on existing candidates by id, in batches. Candidates
+    deleted in the meantime are skipped rather than recreated, unlike save_candidates.
+    
+    Args:
+        updates (List[Dict]): Rows with 'id' and any of SCORE_UPDATE_FIELDS
+        
+    Returns:
+        List[str]: Ids of the updated candidates
+    """
+    updated_ids = []
+    for start in range(0, len(updates), SAVE_BATCH_SIZE):
+        chunk = updates[start:start + SAVE_BATCH_SIZE]
+        try:
+            for row in get_repository().update_scores(chunk):
+                _index_candidate(row)
+                updated_ids.append(row['id'])
+        except Exception as e:
+            print(f"Error updating batch of {len(chunk)} candidates: {str(e)}")
+    return updated_ids
+
+# Columns needed to build the in-memory search and fingerprint indexes
+INDEX_COLUMNS = ('id,email,skills,experience_years,current_location,education,background_score,'
+                 + ','.join(FINGERPRINT_FIELDS))
+
+def warm_candidate_indexes(page_size: int = 1000) -> int:
+    """
+    Load every candidate into the in-memory filter, ranking and fingerprint indexes.
+    
+    Args:
+        page_size (int): Number of rows fetched per request
+        
+    Returns:
+        int: Number of candidates loaded
+    """
+    loaded = 0
+    try:
+        for rows in get_repository().scan(INDEX_COLUMNS, page_size=page_size):
+            candidate_index.add_many(rows)
+            for row in rows:
+                candidate_vector_index.upsert(row)
+            fingerprint_index.add_many((row['email'], row, row['id']) for row in rows
+                                       if row.get('email') and row.get('resume_sha256'))
+            loaded += len(rows)
+        candidate_index.load()
+    except Exception as e:
+        print(f"Error warming candidate indexes: {str(e)}")
+    return loaded
+
+# Seconds between syncs of the in-memory indexes with rows changed in the candidate store,
+# 0 to only load them once (searches then use the store once the index is stale)
+CANDIDATE_INDEX_SYNC_INTERVAL = float(os.getenv('CANDIDATE_INDEX_SYNC_INTERVAL', '30'))
+# Each sync also re-reads rows written this many seconds before the previous one started,
+# for clock skew and transactions that committed late
+CANDIDATE_INDEX_SYNC_OVERLAP = float(os.getenv('CANDIDATE_INDEX_SYNC_OVERLAP', '60'))
+
+def _sync_start() -> str:
+    """The `since` timestamp for the sync after one starting now."""
+    started = datetime.now(timezone.utc) - timedelta(seconds=CANDIDATE_INDEX_SYNC_OVERLAP)
+    return started.isoformat(timespec='microseconds')
+
+def sync_candidate_indexes(since: str, page_size: int = 1000) -> int:
+    """
+    Apply candidates written since `since` to the in-memory indexes.
+    
+    Picks up rows saved by other worker processes, bulk imports and the score
+    refresher. Marks the candidate index as synced when every page was read.
+    
+    Args:
+        since (str): ISO 8601 timestamp, e.g. from the start of the previous sync
+        page_size (int): Number of rows fetched per request
+        
+    Returns:
+        int: Number of candidates applied
+    """
+    repository = get_repository()
+    applied = 0
+    after = None
+    while True:
+        rows = repository.changed_since(since, after=after, limit=page_size,
+                                        columns=INDEX_COLUMNS + ',updated_at')
+        candidate_index.add_many(rows)
+        for row in rows:
+            candidate_vector_index.upsert(row)
+            if row.get('email') and row.get('resume_sha256'):
+                fingerprint_index.add(row['email'], row, candidate_id=row['id'])
+        applied += len(rows)
+        if len(rows) < page_size:
+            break
+        after = (rows[-1]['updated_at'], rows[-1]['id'])
+    candidate_index.mark_synced()
+    return applied
+
+def _warm_and_sync():
+    """Warm the indexes, then keep applying changes from the store every CANDIDATE_INDEX_SYNC_INTERVAL."""
+    since = _sync_start()
+    warm_candidate_indexes()
+    while CANDIDATE_INDEX_SYNC_INTERVAL > 0:
+        time.sleep(CANDIDATE_INDEX_SYNC_INTERVAL)
+        started = _sync_start()
+        try:
+            if not candidate_index.ready:
+                warm_candidate_indexes()
+            else:
+                sync_candidate_indexes(since)
+            since = started
+        except Exception as e:
+            print(f"Error syncing candidate indexes: {str(e)}")
+
+_warmup_pid = None
+_warmup_lock = threading.Lock()
+
+def start_index_warmup():
+    """
+    Warm the candidate indexes on a background thread so startup isn't blocked,
+    then keep them in sync with the candidate store on the same thread.
+    Searches fall back to querying the candidate store directly until the index
+    is ready, and whenever its last sync is too old (see CandidateIndex.fresh).
+
+    The indexes live in each process's memory, so every worker warms and syncs
+    its own. Only the first call in a process starts the thread; call it from
+    the worker (e.g. on its first request), not at import time, since a thread
+    started in a gunicorn --preload master is not carried over the fork.
+
+    Returns:
+        threading.Thread: The warm-up thread, or None if this process already started one
+    """
+    global _warmup_pid
+    with _warmup_lock:
+        if _warmup_pid == os.getpid():
+            return None
+        _warmup_pid = os.getpid()
+    thread = threading.Thread(target=_warm_and_sync, name='candidate-index-warmup', daemon=True)
+    thread.start()
+    return thread
+
 def test_save_candidate():
     """
     Test function to verify the save_candidate function is working.